@@ -0,0 +1,68 @@
+"""`AncestorFilter` を用いた場合と用いない場合の `SelectorSet.match` の処理時間と、フィルターの偽陽性率を計測します。
+
+実際のページに近い深さ 20〜40 のスタックに対し、末尾の要素名が共通で祖先要素のクラス名だけが異なる多数のセレクターを判定します。
+偽陽性率は、祖先要素に求める特徴が実際には揃っていない候補のうち、フィルターが除外できなかった割合です。
+
+  python benchmark/bench_ancestor_filter.py
+"""
+
+import random
+import time
+import cssselector
+from cssselector.ancestor_filter import _element_features
+
+_TAGS = ["div", "section", "article", "ul", "li", "span", "p", "nav", "main"]
+
+def _stacks (count:int) -> list[list[tuple[str, dict[str, str]]]]:
+  rng = random.Random(0)
+  stacks = []
+  for _ in range(count):
+    stack = [("html", {}), ("body", {"class": "page"})]
+    for _ in range(rng.randint(18, 38)):
+      attrs = {"class": " ".join("c{:d}".format(rng.randrange(2000)) for _ in range(rng.randint(0, 3)))} if rng.random() < 0.7 else {}
+      stack.append((rng.choice(_TAGS), attrs))
+    stack.append(("a", {"href": "/"}))
+    stacks.append(stack)
+  return stacks
+
+def _false_positive_rate (selector_set:cssselector.SelectorSet, stacks:list, bits:int) -> float:
+  ancestors = cssselector.AncestorFilter(bits)
+  passed = 0
+  missing = 0
+  for stack in stacks:
+    for tag, attrs in stack:
+      ancestors.push(tag, attrs)
+    present = set(feature for tag, attrs in stack for feature in _element_features(tag, attrs))
+    for _, _, features in selector_set._candidates(stack[-1]):
+      if not present.issuperset(features):
+        missing += 1
+        passed += ancestors.may_contain(features)
+    for _ in stack:
+      ancestors.pop()
+  return passed / missing if missing else 0.0
+
+def _measure (selector_set:cssselector.SelectorSet, stacks:list, ancestors:cssselector.AncestorFilter | None) -> float:
+  start = time.perf_counter()
+  for stack in stacks:
+    if ancestors is not None:
+      for tag, attrs in stack:
+        ancestors.push(tag, attrs)
+    selector_set.match(stack, ancestor_filter=ancestors)
+    if ancestors is not None:
+      for _ in stack:
+        ancestors.pop()
+  return (time.perf_counter() - start) / len(stacks)
+
+def main ():
+  stacks = _stacks(300)
+  print("{:>6s} {:>6s} {:>12s} {:>12s} {:>8s} {:>10s}".format("rules", "bits", "plain", "filter", "speedup", "false pos"))
+  for rules in (50, 500):
+    selector_set = cssselector.SelectorSet((cssselector.parse_selector("div.c{0:d} a, nav.c{0:d} > ul a".format(i)), i) for i in range(rules))
+    plain = _measure(selector_set, stacks, None)
+    for bits in (8, 12):
+      filtered = _measure(selector_set, stacks, cssselector.AncestorFilter(bits))
+      rate = _false_positive_rate(selector_set, stacks, bits)
+      print("{:6d} {:6d} {:9.1f} us {:9.1f} us {:7.1f}x {:9.2f}%".format(rules, bits, plain * 1e6, filtered * 1e6, plain / filtered, rate * 100))
+
+if __name__ == "__main__":
+  main()
@@ -0,0 +1,36 @@
+"""`BatchRunner` のプロセス数を変えながら、合成したHTML文書群の処理量を計測します。
+
+  python benchmark/bench_batch.py [FILES]
+"""
+
+import os
+import sys
+import tempfile
+import cssselector
+
+def _write_corpus (directory:str, count:int):
+  body = "".join("<div class='c{:d}'><p>text <a href='/x{:d}'>link</a></p><br></div>".format(i % 7, i) for i in range(400))
+  for i in range(count):
+    with open(os.path.join(directory, "{:05d}.html".format(i)), "w", encoding="utf-8") as file:
+      file.write("<html><head><title>{:d}</title></head><body>{:s}</body></html>".format(i, body))
+
+def main ():
+  count = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+  sel = cssselector.parse_selector("div.c3 p > a[href]")
+  with tempfile.TemporaryDirectory() as directory:
+    _write_corpus(directory, count)
+    paths = list(cssselector.walk_paths([directory]))
+    print("{:>8s} {:>10s} {:>10s} {:>8s}".format("workers", "files/s", "MB/s", "speedup"))
+    base = None
+    workers = 1
+    while workers <= (os.cpu_count() or 1):
+      runner = cssselector.BatchRunner(sel, max_workers=workers, chunksize=8)
+      for _ in runner.run(paths):
+        pass
+      stats = runner.stats
+      base = base or stats.files_per_second
+      print("{:8d} {:10.1f} {:10.2f} {:7.2f}x".format(workers, stats.files_per_second, stats.megabytes_per_second, stats.files_per_second / base))
+      workers *= 2
+
+if __name__ == "__main__":
+  main()
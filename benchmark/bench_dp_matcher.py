@@ -0,0 +1,41 @@
+
+"""`ISelector.match` と `DPMatcher.match` の実行時間を比較します。
+
+子孫結合子が連続するセレクターを、一致しない深いスタックに対して判定させます。
+`ISelector.match` はスタックが深くなるにつれて指数的に遅くなりますが、
+`DPMatcher.match` はスタックの深さに比例した時間で判定を終えます。
+
+  python benchmark/bench_dp_matcher.py
+"""
+
+import time
+import cssselector
+
+SOURCE = "div div div div span"
+NAIVE_TIME_LIMIT = 5.0
+
+def _measure (sel:cssselector.ISelector, stack:list[cssselector.Element], repeat:int) -> float:
+  start = time.perf_counter()
+  for _ in range(repeat):
+    sel.match(stack)
+  return (time.perf_counter() - start) / repeat
+
+def main ():
+  sel = cssselector.parse_selector(SOURCE)
+  dp_sel = cssselector.DPMatcher(sel)
+  print("selector: {:s}".format(repr(SOURCE)))
+  print("{:>6s} {:>14s} {:>14s}".format("depth", "naive [ms]", "dp [ms]"))
+  naive_enabled = True
+  for depth in (5, 10, 20, 30, 40, 50, 100, 200, 400, 800):
+    stack = [("div", {})] * depth + [("p", {})]
+    if naive_enabled:
+      naive_time = _measure(sel, stack, 1)
+      naive_text = "{:14.3f}".format(naive_time * 1000)
+      naive_enabled = naive_time < NAIVE_TIME_LIMIT / 10
+    else:
+      naive_text = "{:>14s}".format("skipped")
+    dp_time = _measure(dp_sel, stack, 20)
+    print("{:6d} {:s} {:14.3f}".format(depth, naive_text, dp_time * 1000))
+
+if __name__ == "__main__":
+  main()
@@ -0,0 +1,50 @@
+"""10万要素を超える文書に対して、 `select_all` と要素ごとの `ISelector.match` の処理時間を比較します。
+
+`select_all` は複合セレクターごとに一致する要素の集合を求め、結合子に従って文書全体に伝播させます。
+`ISelector.match` は要素ごとにスタックを作成し、祖先要素をたどって判定します。
+索引の作成時間は最初に別に出力し、疑似クラスを含むセレクターの時間には位置の計算が含まれます。
+
+  python benchmark/bench_flat_document.py
+"""
+
+import random
+import time
+import cssselector
+
+def _document (sections:int) -> cssselector.FlatDocument:
+  rng = random.Random(0)
+  document = cssselector.FlatDocument()
+  body = document.append("body", {})
+  for i in range(sections):
+    section = document.append("div", {"class": "section" if i % 10 else "section main"}, body)
+    ul = document.append("ul", {"class": "list"}, section)
+    for j in range(10):
+      li = document.append("li", {"class": "item odd" if j % 2 else "item"}, ul)
+      document.append("a", {"href": "/{:d}/{:d}".format(i, j)} if rng.random() < 0.5 else {}, li)
+      document.append("span", {}, li)
+  return document
+
+def main ():
+  document = _document(5000)
+  start = time.perf_counter()
+  document._index()
+  print("{:d} elements, index built in {:.1f} ms".format(len(document), (time.perf_counter() - start) * 1e3))
+  sources = ["div.main li > a[href]", "ul.list > li.odd a", "div li + li span", "body a", "li:last-child > a"]
+  print("{:>24s} {:>8s} {:>14s} {:>14s} {:>8s}".format("selector", "matched", "select_all", "match", "speedup"))
+  for source in sources:
+    selector = cssselector.parse_selector(source)
+    start = time.perf_counter()
+    found = cssselector.select_all(selector, document)
+    flat = time.perf_counter() - start
+    if "+" in source or ":" in source:
+      #兄弟結合子と疑似クラスは ISelector.match で判定できないため、比較を省略します
+      print("{:>24s} {:8d} {:11.1f} ms {:>14s} {:>8s}".format(source, len(found), flat * 1e3, "-", "-"))
+      continue
+    start = time.perf_counter()
+    expected = [index for index in range(len(document)) if selector.match(document.element_stack(index), match_children=False)]
+    each = time.perf_counter() - start
+    assert found == expected
+    print("{:>24s} {:8d} {:11.1f} ms {:11.1f} ms {:7.1f}x".format(source, len(found), flat * 1e3, each * 1e3, each / flat))
+
+if __name__ == "__main__":
+  main()
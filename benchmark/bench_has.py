@@ -0,0 +1,46 @@
+"""`:has()` ・ `:not()` を含むセレクターと含まないセレクターで `StreamMatcher` の1イベントあたりの処理時間を計測します。
+
+疑似クラスを含まないセレクターでは要素の位置の追跡や `:has()` の記録を一切行わないため、
+疑似クラスに対応する前と同じ時間で処理できます。
+`:has()` を含むセレクターでは、要素ごとに条件を満たすかを判定する分だけ時間が増えます。
+
+  python benchmark/bench_has.py
+"""
+
+import time
+import cssselector
+
+def _events (count:int) -> list[tuple[str, dict[str, str]] | None]:
+  events = []
+  for i in range(count):
+    events.append(("div", {"class": "item"}))
+    events.append(("p", {}))
+    events.append(None)
+    if i % 3 == 0:
+      events.append(("img", {"src": "x.png"}))
+      events.append(None)
+    events.append(None)
+  return events
+
+def _measure (source:str, events:list[tuple[str, dict[str, str]] | None]) -> float:
+  matcher = cssselector.StreamMatcher(cssselector.parse_selector(source))
+  start = time.perf_counter()
+  for event in events:
+    if event is None:
+      matcher.pop()
+    else:
+      matcher.push(*event)
+      try:
+        matcher.matches()
+      except cssselector.UndecidedError:
+        pass
+  return (time.perf_counter() - start) / len(events)
+
+def main ():
+  events = _events(20000)
+  for source in ["div.item > p", "div.item:not(.ad) > p", "div.item:has(> img) > p", "div.item:has(img) > p"]:
+    times = [_measure(source, events) for _ in range(5)]
+    print("{:28s} {:8.3f} us/event".format(source, min(times) * 1e6))
+
+if __name__ == "__main__":
+  main()
@@ -0,0 +1,46 @@
+"""`SelectorInternTable` による部分木の共有が、メモリ使用量と複数セレクターの評価時間に与える効果を計測します。
+
+  python benchmark/bench_interning.py
+"""
+
+import gc
+import time
+import tracemalloc
+import cssselector
+
+_PARENTS = ["div.content", "article", "section.body", "main#top", "ul.nav"]
+_CHILDREN = ["p", "a[href]", "li.item", "span.note", "img[src]"]
+
+def _sources (count:int) -> list[str]:
+  return [
+    "{:s}.r{:d} > {:s} {:s}".format(_PARENTS[i % 5], i % 400, _CHILDREN[i // 5 % 5], _CHILDREN[i // 25 % 5])
+    for i in range(count)
+  ]
+
+def _parse (sources:list[str], table) -> tuple[list, int]:
+  gc.collect()
+  tracemalloc.start()
+  selectors = [cssselector.parse_selector(source, intern_table=table) for source in sources]
+  used = tracemalloc.get_traced_memory()[0]
+  tracemalloc.stop()
+  return selectors, used
+
+def main ():
+  sources = _sources(2000)
+  stack = [("html", {}), ("body", {}), ("div", {"class": "content"}), ("ul", {"class": "nav"}), ("li", {"class": "item"}), ("a", {"href": "/"}), ("span", {"class": "note"})]
+  for name, table in (("plain", None), ("interned", cssselector.SelectorInternTable())):
+    selectors, used = _parse(sources, table)
+    start = time.perf_counter()
+    for _ in range(5):
+      separate = [cssselector.DPMatcher(sel).match(stack) for sel in selectors]
+    separate_time = (time.perf_counter() - start) / 5
+    start = time.perf_counter()
+    for _ in range(5):
+      shared = cssselector.match_each(selectors, stack)
+    shared_time = (time.perf_counter() - start) / 5
+    assert separate == shared
+    print("{:>9s} {:8.1f} B/rule  separate {:8.2f} ms  match_each {:8.2f} ms".format(name, used / len(selectors), separate_time * 1000, shared_time * 1000))
+    del selectors
+
+if __name__ == "__main__":
+  main()
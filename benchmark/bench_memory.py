@@ -0,0 +1,28 @@
+"""`parse_selector` で作成したセレクター1つあたりのメモリ使用量を `tracemalloc` で計測します。
+
+  python benchmark/bench_memory.py
+"""
+
+import gc
+import tracemalloc
+import cssselector
+
+def _sources (count:int) -> list[str]:
+  return ["div#r{:d}.item.c{:d} > a[href^=\"/p{:d}\"]".format(i, i % 100, i) for i in range(count)]
+
+def main ():
+  print("{:>8s} {:>12s} {:>16s}".format("rules", "total [KiB]", "per rule [B]"))
+  for count in (1000, 10000, 100000):
+    sources = _sources(count)
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    selectors = [cssselector.parse_selector(source) for source in sources]
+    gc.collect()
+    used = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    print("{:8d} {:12.1f} {:16.1f}".format(count, used / 1024, used / len(selectors)))
+    del selectors
+
+if __name__ == "__main__":
+  main()
@@ -0,0 +1,49 @@
+"""多数の `[href*="..."]` ・ `[src^="..."]` を含む `SelectorSet` の判定時間を、パターンの数を変えながら計測します。
+
+`AttributePatternIndex` によって、判定時間はパターンの数にほとんど依存しなくなります。
+比較として、全てのセレクターを個別に判定した場合の時間も出力します。
+
+  python benchmark/bench_multipattern.py
+"""
+
+import time
+import random
+import cssselector
+
+def _sources (count:int, rng:random.Random) -> list[str]:
+  sources = []
+  for i in range(count):
+    token = "".join(rng.choice("abcdefghijklmnopqrstuvwxyz") for _ in range(6)) + str(i)
+    if i % 3 == 0:
+      sources.append("a[href*=\"/{:s}/\"]".format(token))
+    elif i % 3 == 1:
+      sources.append("img[src^=\"https://{:s}.example\"]".format(token))
+    else:
+      sources.append("[href$=\".{:s}\"]".format(token))
+  return sources
+
+def main ():
+  rng = random.Random(0)
+  stacks = [
+    [("html", {}), ("body", {}), ("a", {"href": "https://news.example.com/articles/2024/05/some-long-article-title.html?ref=home"})],
+    [("html", {}), ("body", {}), ("img", {"src": "https://static.example.net/images/banner-728x90.png", "alt": "banner"})],
+  ]
+  print("{:>8s} {:>16s} {:>16s}".format("patterns", "SelectorSet [us]", "naive [us]"))
+  for count in (100, 1000, 10000):
+    selectors = [cssselector.parse_selector(source) for source in _sources(count, rng)]
+    selector_set = cssselector.SelectorSet((sel, i) for i, sel in enumerate(selectors))
+    for stack in stacks:
+      selector_set.match(stack)
+    start = time.perf_counter()
+    for _ in range(100):
+      for stack in stacks:
+        selector_set.match(stack)
+    indexed = (time.perf_counter() - start) / 100 / len(stacks)
+    start = time.perf_counter()
+    for stack in stacks:
+      [i for i, sel in enumerate(selectors) if sel.match(stack, match_children=False)]
+    naive = (time.perf_counter() - start) / len(stacks)
+    print("{:8d} {:16.1f} {:16.1f}".format(count, indexed * 1e6, naive * 1e6))
+
+if __name__ == "__main__":
+  main()
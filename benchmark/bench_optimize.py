@@ -0,0 +1,40 @@
+"""`optimize_selector` による組み替えの前後で、セレクターリストの判定時間を比較します。
+
+  python benchmark/bench_optimize.py
+"""
+
+import time
+import cssselector
+
+def _source (count:int) -> str:
+  sections = ["main", "article", "aside", "nav"]
+  return ", ".join(
+    "body div.{:s} ul li > a[data-track*=\"item{:d}\"].link{:d}".format(sections[i % 4], i, i % 10)
+    for i in range(count)
+  )
+
+def _measure (selector:cssselector.ISelector, stacks:list, repeat:int) -> float:
+  start = time.perf_counter()
+  for _ in range(repeat):
+    for stack in stacks:
+      selector.match(stack)
+  return (time.perf_counter() - start) / repeat / len(stacks)
+
+def main ():
+  stacks = [
+    [("html", {}), ("body", {}), ("div", {"class": "main"}), ("ul", {}), ("li", {}), ("a", {"class": "link3", "data-track": "item3"})],
+    [("html", {}), ("body", {}), ("div", {"class": "footer"}), ("p", {}), ("a", {"class": "link3", "data-track": "item3"})],
+    [("html", {}), ("body", {}), ("div", {"class": "aside"}), ("ul", {}), ("li", {}), ("a", {"class": "link9", "data-track": "none"})],
+  ]
+  print("{:>8s} {:>14s} {:>14s} {:>8s}".format("branches", "original [us]", "optimized [us]", "speedup"))
+  for count in (10, 100, 400):
+    original = cssselector.parse_selector(_source(count))
+    optimized = cssselector.optimize_selector(original)
+    assert [original.match(stack) for stack in stacks] == [optimized.match(stack) for stack in stacks]
+    repeat = max(1, 2000 // count)
+    before = _measure(original, stacks, repeat)
+    after = _measure(optimized, stacks, repeat)
+    print("{:8d} {:14.1f} {:14.1f} {:7.1f}x".format(count, before * 1e6, after * 1e6, before / after))
+
+if __name__ == "__main__":
+  main()
@@ -0,0 +1,24 @@
+"""`parse_selector` の処理速度を、セレクターリストの長さを変えながら計測します。
+
+セレクター1つあたりの処理時間がリストの長さによらず一定であれば、パースは線形時間で行われています。
+
+  python benchmark/bench_parse.py
+"""
+
+import time
+import cssselector
+
+def _source (count:int) -> str:
+  return ", ".join("div.c{:d} > a[href^=\"/p{:d}\"]".format(i, i) for i in range(count))
+
+def main ():
+  print("{:>8s} {:>10s} {:>12s} {:>16s}".format("branches", "KiB", "total [ms]", "per branch [us]"))
+  for count in (100, 500, 1000, 2000, 4000):
+    source = _source(count)
+    start = time.perf_counter()
+    cssselector.parse_selector(source)
+    elapsed = time.perf_counter() - start
+    print("{:8d} {:10.1f} {:12.3f} {:16.3f}".format(count, len(source) / 1024, elapsed * 1000, elapsed / count * 1e6))
+
+if __name__ == "__main__":
+  main()
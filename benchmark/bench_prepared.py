@@ -0,0 +1,22 @@
+"""クラスセレクターを多数判定する場合に、`Element` と `PreparedElement` の実行時間を比較します。
+
+  python benchmark/bench_prepared.py
+"""
+
+import time
+import cssselector
+
+def main ():
+  sels = [cssselector.AttributeSelector_ContainsWithSeparator("class", "c{:d}".format(i)) for i in range(500)]
+  attrs = {"class": " ".join("c{:d}".format(i) for i in range(0, 1000, 7)), "id": "main"}
+  plain = ("div", attrs)
+  prepared = cssselector.PreparedElement.prepare("div", attrs)
+  for name, element in (("Element", plain), ("PreparedElement", prepared)):
+    start = time.perf_counter()
+    for _ in range(20):
+      count = sum(1 for sel in sels if sel.match(element[1]))
+    elapsed = (time.perf_counter() - start) / 20
+    print("{:>16s} {:10.3f} ms / {:d} selectors (matched {:d})".format(name, elapsed * 1000, len(sels), count))
+
+if __name__ == "__main__":
+  main()
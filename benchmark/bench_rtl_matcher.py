@@ -0,0 +1,35 @@
+"""`ISelector.match` と `RightToLeftMatcher.match` の実行時間を比較します。
+
+終端の要素が一致しない、典型的な `handle_data` 呼び出しを想定したスタックで判定させます。
+
+  python benchmark/bench_rtl_matcher.py
+"""
+
+import time
+import cssselector
+
+SOURCES = [
+  "p > a.read-more",
+  "article div p a[href]",
+  "div.content > ul li > a",
+]
+
+def _measure (sel:cssselector.ISelector, stack:list[cssselector.Element], repeat:int) -> float:
+  start = time.perf_counter()
+  for _ in range(repeat):
+    sel.match(stack)
+  return (time.perf_counter() - start) / repeat
+
+def main ():
+  print("{:>28s} {:>6s} {:>14s} {:>14s}".format("selector", "depth", "naive [us]", "rtl [us]"))
+  for source in SOURCES:
+    sel = cssselector.parse_selector(source)
+    rtl_sel = cssselector.RightToLeftMatcher(sel)
+    for depth in (10, 50, 200):
+      stack = [("div", {"class": "content"})] * depth + [("span", {})]
+      naive_time = _measure(sel, stack, 200)
+      rtl_time = _measure(rtl_sel, stack, 2000)
+      print("{:>28s} {:6d} {:14.3f} {:14.3f}".format(source, depth, naive_time * 1e6, rtl_time * 1e6))
+
+if __name__ == "__main__":
+  main()
@@ -0,0 +1,38 @@
+"""50,000 個のセレクターについて、 `parse_selector` と規則パックの読み込みに要する時間を比較します。
+
+  python benchmark/bench_rulepack.py
+"""
+
+import os
+import time
+import tempfile
+import cssselector
+
+def _sources (count:int) -> list[str]:
+  parents = ["div.content", "article", "section.body", "main#top", "ul.nav > li", "header .menu"]
+  return [
+    "{:s} a.r{:d}[href^=\"/p{:d}\"], {:s} > p span.note".format(parents[i % 6], i, i % 1000, parents[i // 6 % 6])
+    for i in range(count)
+  ]
+
+def main ():
+  sources = _sources(50000)
+  start = time.perf_counter()
+  rules = [(cssselector.parse_selector(source), {"id": i}) for i, source in enumerate(sources)]
+  parse_time = time.perf_counter() - start
+  with tempfile.TemporaryDirectory() as directory:
+    path = os.path.join(directory, "rules.pack")
+    start = time.perf_counter()
+    cssselector.save_rule_pack(path, rules)
+    save_time = time.perf_counter() - start
+    start = time.perf_counter()
+    loaded = cssselector.load_rule_pack(path)
+    load_time = time.perf_counter() - start
+    size = os.path.getsize(path)
+  assert loaded == rules
+  print("parse_selector  {:8.3f} s".format(parse_time))
+  print("save_rule_pack  {:8.3f} s ({:.1f} MiB)".format(save_time, size / 1024 / 1024))
+  print("load_rule_pack  {:8.3f} s ({:.1f}x faster than parsing)".format(load_time, parse_time / load_time))
+
+if __name__ == "__main__":
+  main()
@@ -0,0 +1,41 @@
+"""多数のセレクターを個別に判定した場合と `SelectorSet` でまとめて判定した場合の実行時間を比較します。
+
+  python benchmark/bench_selector_set.py
+"""
+
+import time
+import random
+import cssselector
+
+def _sources (count:int) -> list[str]:
+  rand = random.Random(0)
+  tags = ["div", "p", "a", "span", "li", "ul", "section", "article"]
+  sources = []
+  for i in range(count):
+    match i % 3:
+      case 0:
+        sources.append("{:s} > {:s}.c{:d}".format(rand.choice(tags), rand.choice(tags), i))
+      case 1:
+        sources.append("{:s} #i{:d}".format(rand.choice(tags), i))
+      case _:
+        sources.append("{:s} {:s}[data-r{:d}]".format(rand.choice(tags), rand.choice(tags), i))
+  return sources
+
+def main ():
+  stack = [("html", {}), ("body", {}), ("div", {"class": "c3 c6"}), ("p", {"id": "i4"}), ("a", {"class": "c9", "href": "#"})]
+  print("{:>8s} {:>14s} {:>14s}".format("rules", "naive [ms]", "set [ms]"))
+  for count in (100, 1000, 5000):
+    sels = [cssselector.parse_selector(source) for source in _sources(count)]
+    selector_set = cssselector.SelectorSet((sel, i) for i, sel in enumerate(sels))
+    start = time.perf_counter()
+    expected = [i for i, sel in enumerate(sels) if sel.match(stack)]
+    naive_time = time.perf_counter() - start
+    start = time.perf_counter()
+    for _ in range(100):
+      actual = selector_set.match(stack)
+    set_time = (time.perf_counter() - start) / 100
+    assert actual == expected
+    print("{:8d} {:14.3f} {:14.3f}".format(count, naive_time * 1000, set_time * 1000))
+
+if __name__ == "__main__":
+  main()
@@ -0,0 +1,31 @@
+"""兄弟結合子を含むセレクターで `StreamMatcher` の1イベントあたりの処理時間を、兄弟要素の数を変えながら計測します。
+
+兄弟要素の情報は階層ごとのビット列として保持されるため、処理時間は兄弟要素の数に依存しません。
+比較として、兄弟結合子を含まないセレクターの処理時間も出力します。
+
+  python benchmark/bench_sibling.py
+"""
+
+import time
+import cssselector
+
+def _measure (selector:cssselector.ISelector, siblings:int) -> float:
+  matcher = cssselector.StreamMatcher(selector)
+  start = time.perf_counter()
+  matcher.push("ul", {})
+  for i in range(siblings):
+    matcher.push("li", {"class": "item"} if i % 2 else {})
+    matcher.matches()
+    matcher.pop()
+  matcher.pop()
+  return (time.perf_counter() - start) / (siblings * 2 + 2)
+
+def main ():
+  sources = ["ul > li + li.item", "ul > li ~ li.item", "ul > li.item"]
+  print("{:>8s}".format("siblings") + "".join(" {:>20s}".format(source) for source in sources))
+  for siblings in (100, 10000, 100000):
+    times = [_measure(cssselector.parse_selector(source), siblings) for source in sources]
+    print("{:8d}".format(siblings) + "".join(" {:17.2f} us".format(t * 1e6) for t in times))
+
+if __name__ == "__main__":
+  main()
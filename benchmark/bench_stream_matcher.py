@@ -0,0 +1,66 @@
+"""README の `TextExtractor` と同じ判定を `ISelector.match` と `StreamMatcher` で行い、実行時間を比較します。
+
+深さの異なる要素の開始・終了とテキストの出現を模したイベント列を再生します。
+
+  python benchmark/bench_stream_matcher.py
+"""
+
+import time
+import cssselector
+
+SOURCE = "article div.content p > a[href], nav li a"
+
+def _events (depth:int, count:int) -> list[tuple[str, str, dict[str, str]]]:
+  events = []
+  for _ in range(count):
+    for i in range(depth):
+      events.append(("start", "div", {"class": "content"} if i % 3 == 0 else {}))
+      events.append(("data", "", {}))
+    events.append(("start", "a", {"href": "#"}))
+    events.append(("data", "", {}))
+    events.append(("end", "", {}))
+    for i in range(depth):
+      events.append(("end", "", {}))
+  return events
+
+def _run_naive (sel:cssselector.ISelector, events) -> int:
+  count = 0
+  stack = []
+  for kind, tag, attrs in events:
+    if kind == "start":
+      stack.append((tag, attrs))
+    elif kind == "end":
+      stack.pop()
+    elif sel.match(stack):
+      count += 1
+  return count
+
+def _run_stream (sel:cssselector.ISelector, events) -> int:
+  count = 0
+  matcher = cssselector.StreamMatcher(sel)
+  for kind, tag, attrs in events:
+    if kind == "start":
+      matcher.push(tag, attrs)
+    elif kind == "end":
+      matcher.pop()
+    elif matcher.matches():
+      count += 1
+  return count
+
+def main ():
+  sel = cssselector.parse_selector(SOURCE)
+  print("selector: {:s}".format(repr(SOURCE)))
+  print("{:>6s} {:>14s} {:>14s}".format("depth", "naive [ms]", "stream [ms]"))
+  for depth in (5, 20, 50, 100):
+    events = _events(depth, 20)
+    start = time.perf_counter()
+    naive_count = _run_naive(sel, events)
+    naive_time = time.perf_counter() - start
+    start = time.perf_counter()
+    stream_count = _run_stream(sel, events)
+    stream_time = time.perf_counter() - start
+    assert naive_count == stream_count
+    print("{:6d} {:14.3f} {:14.3f}".format(depth, naive_time * 1000, stream_time * 1000))
+
+if __name__ == "__main__":
+  main()
@@ -0,0 +1,36 @@
+"""`SymbolTable` で要素名と属性名を共有した場合と、しなかった場合の `ISelector.match` の処理時間を比較します。
+
+共有された名前は同一性の確認だけで比較されるため、文字列の内容の比較と属性名のハッシュ計算が省かれます。
+
+  python benchmark/bench_symbols.py
+"""
+
+import time
+import cssselector
+
+def _elements (depth:int) -> list[tuple[str, dict[str, str]]]:
+  #HTMLParser から受け取る名前と同様に、内容は等しくても別のインスタンスの文字列を作成します
+  elements = [("".join(["h", "tml"]), {}), ("".join(["b", "ody"]), {})]
+  for i in range(depth):
+    elements.append(("".join(["d", "iv"]), {"".join(["c", "lass"]): "section level{:d}".format(i), "".join(["d", "ata-x"]): str(i)}))
+  elements.append(("".join(["a"]), {"".join(["h", "ref"]): "/x", "".join(["c", "lass"]): "link"}))
+  return elements
+
+def _measure (selector:cssselector.ISelector, stack:list, repeat:int) -> float:
+  start = time.perf_counter()
+  for _ in range(repeat):
+    selector.match(stack)
+  return (time.perf_counter() - start) / repeat
+
+def main ():
+  sources = ["html body div[data-x] div.section > a[href].link", "div.missing a", "body > div[data-x=\"0\"] a"]
+  print("{:>50s} {:>12s} {:>12s}".format("selector", "plain", "symbols"))
+  for source in sources:
+    table = cssselector.SymbolTable()
+    elements = _elements(30)
+    plain = _measure(cssselector.parse_selector(source), [cssselector.PreparedElement.prepare(tag, attrs) for tag, attrs in elements], 2000)
+    interned = _measure(cssselector.parse_selector(source, symbol_table=table), table.stack(elements), 2000)
+    print("{:>50s} {:9.2f} us {:9.2f} us".format(source, plain * 1e6, interned * 1e6))
+
+if __name__ == "__main__":
+  main()
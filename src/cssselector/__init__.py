@@ -1,4 +1,24 @@
 
-from .exception import ParseError
+from .exception import ParseError, RulePackError, UndecidedError
 from .attribute_selector import IAttributeSelector, AttributeSelector_HasName, AttributeSelector_Equal, AttributeSelector_StartsWith, AttributeSelector_EndsWith, AttributeSelector_ContainsAnywhere, AttributeSelector_ContainsWithSeparator, parse_attribute_selector
-from .selector import Element, ISelector, IGeneratableFromStack, Selector_Element, Selector_Children, Selector_Son, Selector_MatchAnywhere, Selector_MatchLast, Selector_Or, parse_selector
+from .pseudo_class import IPseudoClass, PseudoClass_NthChild, PseudoClass_NthLastChild, ElementPosition, SiblingCounter, parse_pseudo_class
+from .selector import Element, PositionedElement, ISelector, IGeneratableFromStack, PseudoClass_Is, PseudoClass_Not, PseudoClass_Has, Selector_Element, Selector_Children, Selector_Son, Selector_NextSibling, Selector_SubsequentSibling, Selector_MatchAnywhere, Selector_MatchLast, Selector_Or, parse_selector
+from .dp_matcher import DPMatcher, match_each
+from .chain import Chain, flatten_selector
+from .rtl_matcher import RightToLeftMatcher
+from .stream_matcher import StreamMatcher
+from .multipattern import AhoCorasick, AttributePatternIndex
+from .ancestor_filter import AncestorFilter, ancestor_features, chain_ancestor_features
+from .selector_set import SelectorSet
+from .cache import CacheInfo, SelectorCache, default_cache, parse_selector_cached
+from .compiler import CompiledSelector, compile_selector
+from .prepared import PreparedAttributes, PreparedElement
+from .extractor import VOID_ELEMENTS, Extraction, StreamExtractor, extract
+from .batch import BatchRunner, BatchStats, FileResult, walk_paths
+from .instrument import InstrumentedAttributeSelector, InstrumentedSelector, NodeStats, instrument, report
+from .interning import InternInfo, SelectorInternTable
+from .symbols import SymbolTable
+from .optimize import ATTRIBUTE_SELECTOR_COSTS, optimize_selector
+from .rulepack import FORMAT_VERSION as RULE_PACK_VERSION, dumps_rule_pack, load_rule_pack, loads_rule_pack, save_rule_pack
+from .async_extractor import aextract
+from .flat_document import FlatDocument, select_all
@@ -0,0 +1,200 @@
+
+import zlib
+from array import array
+from .attribute_selector import AttributeSelector_Equal, AttributeSelector_ContainsWithSeparator
+from .prepared import PreparedAttributes, _split_whitespace
+from .selector import ISelector, Selector_Element, Selector_Son, Selector_Children
+from .chain import Chain, flatten_selector
+
+#要素名・ID・クラス名のハッシュ値が重ならないように混ぜる値です
+_ID_SALT = 0x5bd1e995
+_CLASS_SALT = 0x1b873593
+
+def _hash (value:str) -> int:
+  #特徴は SelectorSet とともに別のプロセスへ渡されるため、 PYTHONHASHSEED に依存しないハッシュ値を用います
+  return zlib.crc32(value.encode("utf-8", "surrogatepass"))
+
+def _element_features (tag:str, attrs:dict[str, str]) -> list[int]:
+  features = [_hash(tag)] if tag else []
+  if "id" in attrs:
+    features.append(_hash(attrs["id"]) ^ _ID_SALT)
+  if "class" in attrs:
+    classes = attrs.classes if type(attrs) is PreparedAttributes else _split_whitespace(attrs["class"])
+    features.extend(_hash(class_) ^ _CLASS_SALT for class_ in classes)
+  return features
+
+def _compound_features (compound:Selector_Element) -> list[int]:
+  features = [_hash(compound.tag)] if compound.tag else []
+  for sel in compound.attribute_selectors:
+    if type(sel) is AttributeSelector_Equal and sel.name == "id":
+      features.append(_hash(sel.value) ^ _ID_SALT)
+    elif type(sel) is AttributeSelector_ContainsWithSeparator and sel.name == "class":
+      features.append(_hash(sel.value) ^ _CLASS_SALT)
+  return features
+
+def chain_ancestor_features (chain:Chain) -> tuple[int, ...]:
+
+  """判定する要素の祖先要素が必ずもつ特徴のハッシュ値を返します。
+
+  `>` または子孫結合子の左にある複合セレクターは、兄弟結合子を挟んでいても判定する要素の祖先要素に一致します。
+  それらの要素名・ID・クラス名が特徴として集められます。
+
+  Parameters
+  ----------
+  chain : Chain
+    特徴を求めるセレクターです。
+
+  Returns
+  -------
+  tuple[int, ...]
+    重複を除いた特徴のハッシュ値のタプルです。
+  """
+
+  features = []
+  for compound, combinator in zip(chain.compounds, chain.combinators):
+    if combinator is Selector_Son or combinator is Selector_Children:
+      features.extend(_compound_features(compound))
+  return tuple(dict.fromkeys(features))
+
+def ancestor_features (selector:ISelector) -> tuple[tuple[int, ...], ...] | None:
+
+  """セレクターに一致する要素の祖先要素が必ずもつ特徴を、セレクターリストの各セレクターごとに返します。
+
+  Parameters
+  ----------
+  selector : ISelector
+    特徴を求めるセレクターです。
+
+  Returns
+  -------
+  tuple[tuple[int, ...], ...] | None
+    各セレクターの `chain_ancestor_features` のタプルです。
+    `parse_selector` 関数が作成する形式ではない木構造が与えられたならば `None` を返します。
+  """
+
+  chains = flatten_selector(selector, siblings=True)
+  if chains is None:
+    return None
+  return tuple(chain_ancestor_features(chain) for chain in chains)
+
+class AncestorFilter:
+
+  """スタックの要素がもつ要素名・ID・クラス名を記録する計数ブルームフィルターです。
+
+  ブラウザと同様に、要素の開始・終了に合わせて特徴を追加・削除し、
+  セレクターが祖先要素に求める特徴のいずれかが記録されていなければ、スタックをたどらずに不一致と判定します。
+  特徴のハッシュ値はプロセスに依存しないため、 `SelectorSet` を別のプロセスへ渡しても同じ判定になります。
+  各特徴は2つのカウンターに記録されるため、判定は特徴の数のみに比例し、スタックの深さに依存しません。
+  偽陽性（記録されていない特徴を記録されていると判定すること）は起こりえますが、偽陰性は起こりません。
+
+  Examples
+  --------
+  >>> ancestors = AncestorFilter()
+  >>> ancestors.push("div", {"class": "main"})
+  >>> ancestors.push("a", {})
+  >>> ancestors.may_match(ancestor_features(parse_selector("div.main a")))
+  True
+  >>> ancestors.may_match(ancestor_features(parse_selector("ul a")))
+  False
+
+  Notes
+  -----
+  記録はスタックの終端の要素も含むため、判定する要素自身の特徴によって偽陽性となることがあります。
+
+  Parameters
+  ----------
+  bits : int
+    カウンターの数の2を底とする対数です。 `1` 以上 `16` 以下で指定します。
+  """
+
+  def __init__ (self, bits:int=12):
+    if not 1 <= bits <= 16:
+      raise ValueError("Bits must be between 1 and 16: {:d}".format(bits))
+    self.bits = bits
+    self._mask = (1 << bits) -1
+    self._counts = array("I", bytes(4 << bits))
+    self._pushed = []
+
+  def __len__ (self) -> int:
+    return len(self._pushed)
+
+  def push (self, tag:str, attrs:dict[str, str]):
+
+    """要素を開始し、その特徴を記録します。
+
+    Parameters
+    ----------
+    tag : str
+      要素名です。
+    attrs : dict[str, str]
+      要素に設定された属性の集合です。
+    """
+
+    counts = self._counts
+    mask = self._mask
+    bits = self.bits
+    positions = []
+    for feature in _element_features(tag, attrs):
+      positions.append(feature & mask)
+      positions.append((feature >> bits) & mask)
+    for position in positions:
+      counts[position] += 1
+    self._pushed.append(positions)
+
+  def pop (self):
+
+    """最後に開始した要素を終了し、その特徴を削除します。"""
+
+    counts = self._counts
+    for position in self._pushed.pop():
+      counts[position] -= 1
+
+  def clear (self):
+
+    """全ての記録を削除します。"""
+
+    self._counts = array("I", bytes(4 << self.bits))
+    self._pushed.clear()
+
+  def may_contain (self, features:tuple[int, ...]) -> bool:
+
+    """全ての特徴が記録されている可能性があるかを判定します。
+
+    Parameters
+    ----------
+    features : tuple[int, ...]
+      `chain_ancestor_features` が返した特徴です。
+
+    Returns
+    -------
+    bool
+      全ての特徴が記録されている可能性があるならば `True` を返します。
+      `False` を返したならば、いずれかの特徴は確実に記録されていません。
+    """
+
+    counts = self._counts
+    mask = self._mask
+    bits = self.bits
+    for feature in features:
+      if not counts[feature & mask] or not counts[(feature >> bits) & mask]:
+        return False
+    return True
+
+  def may_match (self, features:tuple[tuple[int, ...], ...] | None) -> bool:
+
+    """セレクターリストのいずれかのセレクターに一致する可能性があるかを判定します。
+
+    Parameters
+    ----------
+    features : tuple[tuple[int, ...], ...] | None
+      `ancestor_features` が返した特徴です。
+      `None` ならば常に `True` を返します。
+
+    Returns
+    -------
+    bool
+      一致する可能性があるならば `True` を返します。
+      `False` を返したならば、セレクターは現在のスタックに確実に一致しません。
+    """
+
+    return features is None or any(self.may_contain(branch) for branch in features)
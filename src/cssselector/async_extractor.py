@@ -0,0 +1,103 @@
+
+import codecs
+import asyncio
+from concurrent.futures import Executor
+from typing import AsyncIterable, AsyncIterator, NamedTuple
+from .selector import ISelector
+from .selector_set import SelectorSet
+from .extractor import Extraction, StreamExtractor
+
+class _Failure (NamedTuple):
+
+  error:BaseException
+
+_END = object()
+
+async def _produce (chunks:AsyncIterable[str | bytes], queue:asyncio.Queue):
+  try:
+    async for chunk in chunks:
+      await queue.put(chunk)
+  except Exception as error:
+    await queue.put(_Failure(error))
+  else:
+    await queue.put(_END)
+
+def _feed (extractor:StreamExtractor, decoder:codecs.IncrementalDecoder, chunk:str | bytes | object) -> list[Extraction]:
+  if chunk is _END:
+    extractor.feed(decoder.decode(b"", final=True))
+    extractor.close()
+  elif isinstance(chunk, str):
+    extractor.feed(chunk)
+  else:
+    extractor.feed(decoder.decode(chunk))
+  return list(extractor.drain())
+
+async def aextract (selector:ISelector | SelectorSet, chunks:AsyncIterable[str | bytes], *, encoding:str="utf-8", errors:str="replace", match_anywhere:bool=True, match_children:bool=False, executor:Executor | None=None, max_pending:int=8, max_deferred:int=1024) -> AsyncIterator[Extraction]:
+
+  """非同期に届くHTML文書の断片を順に読み込み、セレクターに一致した要素のテキストを非同期に返します。
+
+  断片の読み込みと解析は並行して行われます。
+  解析と判定は `executor` 上で実行されるため、イベントループを長時間止めることはありません。
+  未解析の断片が `max_pending` 個たまると断片の読み込みを待たせるため、
+  返されたテキストの消費が遅ければ `chunks` からの読み込みも遅くなります。
+
+  Examples
+  --------
+  >>> async def main (response):
+  ...   async for extraction in aextract(parse_selector("p > a[href]"), response.content.iter_chunked(65536)):
+  ...     print(extraction.data)
+
+  Notes
+  -----
+  解析器の状態は呼び出し元のプロセスに保持されるため、 `executor` にはスレッドを用いるものを指定してください。
+
+  Parameters
+  ----------
+  selector : ISelector | SelectorSet
+    抽出に用いるセレクター、またはセレクターの集合です。
+  chunks : AsyncIterable[str | bytes]
+    HTML文書の断片を返す非同期イテレーターです。
+    `bytes` が与えられたならば、引数 `encoding` に従って逐次デコードされます。
+  encoding : str
+    `bytes` をデコードする際の文字コードです。
+  errors : str
+    デコードに失敗した際の処理方法です。
+  match_anywhere : bool
+    `ISelector.match` の同名の引数と同じ意味をもちます。
+  match_children : bool
+    `ISelector.match` の同名の引数と同じ意味をもちます。
+  executor : Executor | None
+    解析と判定を実行する `concurrent.futures.Executor` です。
+    `None` が指定されたならばイベントループの既定の `Executor` が使われます。
+  max_pending : int
+    読み込んだまま解析されていない断片の最大数です。
+  max_deferred : int
+    `StreamExtractor` の同名の引数と同じ意味をもちます。
+
+  Returns
+  -------
+  AsyncIterator[Extraction]
+    抽出されたテキストを出現順に返す非同期イテレーターです。
+  """
+
+  if max_pending < 1:
+    raise ValueError("Argument `max_pending` must be positive: {:d}".format(max_pending))
+  loop = asyncio.get_running_loop()
+  extractor = StreamExtractor(selector, match_anywhere=match_anywhere, match_children=match_children, max_deferred=max_deferred)
+  decoder = codecs.getincrementaldecoder(encoding)(errors)
+  queue = asyncio.Queue(max_pending)
+  producer = asyncio.create_task(_produce(chunks, queue))
+  try:
+    while True:
+      chunk = await queue.get()
+      if chunk is _END:
+        break
+      elif type(chunk) is _Failure:
+        raise chunk.error
+      for extraction in await loop.run_in_executor(executor, _feed, extractor, decoder, chunk):
+        yield extraction
+    for extraction in await loop.run_in_executor(executor, _feed, extractor, decoder, _END):
+      yield extraction
+  finally:
+    producer.cancel()
+    await asyncio.gather(producer, return_exceptions=True)
@@ -3,11 +3,14 @@ import html
 from abc import ABC, abstractmethod
 from dataclasses import dataclass
 from .exception import ParseError
+from .prepared import PreparedAttributes, _split_whitespace
 
 class IAttributeSelector (ABC):
 
   """属性セレクターを表現するインターフェイスです。"""
 
+  __slots__ = ()
+
   @abstractmethod
   def match (self, attrs:dict[str, str]) -> bool:
 
@@ -26,7 +29,7 @@ class IAttributeSelector (ABC):
 
     pass
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class AttributeSelector_HasName (IAttributeSelector):
 
   """指定属性名が存在していればマッチする属性セレクターです。
@@ -42,7 +45,7 @@ class AttributeSelector_HasName (IAttributeSelector):
   def match (self, attrs:dict[str, str]) -> bool:
     return self.name in attrs
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class AttributeSelector_Equal (IAttributeSelector):
 
   """指定属性名が指定値と一致するならばマッチする属性セレクターです。
@@ -61,7 +64,7 @@ class AttributeSelector_Equal (IAttributeSelector):
   def match (self, attrs:dict[str, str]) -> bool:
     return self.name in attrs and attrs[self.name] == self.value
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class AttributeSelector_StartsWith (IAttributeSelector):
 
   """指定属性名が指定値と一致するならばマッチする属性セレクターです。
@@ -80,7 +83,7 @@ class AttributeSelector_StartsWith (IAttributeSelector):
   def match (self, attrs:dict[str, str]) -> bool:
     return self.name in attrs and attrs[self.name].startswith(self.value)
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class AttributeSelector_EndsWith (IAttributeSelector):
 
   """指定属性値の先頭が指定値で始まるならばマッチする属性セレクターです。
@@ -99,7 +102,7 @@ class AttributeSelector_EndsWith (IAttributeSelector):
   def match (self, attrs:dict[str, str]) -> bool:
     return self.name in attrs and attrs[self.name].endswith(self.value)
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class AttributeSelector_ContainsAnywhere (IAttributeSelector):
 
   """指定属性値の末尾が指定値で終わるならばマッチする属性セレクターです。
@@ -118,11 +121,14 @@ class AttributeSelector_ContainsAnywhere (IAttributeSelector):
   def match (self, attrs:dict[str, str]) -> bool:
     return self.name in attrs and self.value in attrs[self.name]
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class AttributeSelector_ContainsWithSeparator (IAttributeSelector):
 
   """指定値が空白文字で区切られた指定属性値のリストに存在していればマッチする属性セレクターです。
 
+  属性値は HTML の空白文字（スペース・タブ・改行など）で区切られます。
+  `PreparedAttributes` が与えられたならば、事前に計算されたトークン集合を参照します。
+
   Examples
   --------
   >>> sel = AttributeSelector_ContainsWithSeparator("a", "b")
@@ -141,7 +147,13 @@ class AttributeSelector_ContainsWithSeparator (IAttributeSelector):
   value:str
 
   def match (self, attrs:dict[str, str]) -> bool:
-    return self.name in attrs and self.value in attrs[self.name].split(" ")
+    if self.name in attrs:
+      if type(attrs) is PreparedAttributes:
+        return self.value in attrs.tokens(self.name)
+      else:
+        return self.value in _split_whitespace(attrs[self.name])
+    else:
+      return False
 
 #parser
 
@@ -151,12 +163,10 @@ ATTRIBUTE_NAME_CHARS:set[str] = set("-.0123456789:ABCDEFGHIJKLMNOPQRSTUVWXYZ_abc
 def _read_attribute_name (source:str, start:int, end:int) -> tuple[str, int]:
   if start < end:
     if source[start] in ATTRIBUTE_NAME_START_CHARS:
-      tmp = source[start]
       index = start +1
       while index < end and source[index] in ATTRIBUTE_NAME_CHARS:
-        tmp += source[index]
         index += 1
-      return tmp, index
+      return source[start:index], index
     else:
       raise ParseError.at("Read an invalid character to start of attribute name: {:s}".format(repr(source[start])), (source, start))
   else:
@@ -165,11 +175,10 @@ def _read_attribute_name (source:str, start:int, end:int) -> tuple[str, int]:
 def _read_attribute_value (source:str, start:int, end:int) -> tuple[str, int]:
   if start < end:
     if source[start] == "\"":
-      tmp = ""
-      index = start +1
-      while index < end and source[index] != "\"":
-        tmp += source[index]
-        index += 1
+      index = source.find("\"", start +1, end)
+      if index < 0:
+        index = end
+      value = source[start +1:index]
       if index < end:
         if source[index] == "\"":
           index += 1
@@ -184,7 +193,7 @@ def _read_attribute_value (source:str, start:int, end:int) -> tuple[str, int]:
           raise ParseError.at("Could not read '[' after '\"' to end of attribute value: {:s}".format(repr(source[start])), (source, start))
       else:
         raise ParseError.at("Reached end of data on parsing.", (source, start))
-      return html.unescape(tmp), index
+      return html.unescape(value), index
     else:
       raise ParseError.at("Could not read '\"' to start of attribute value: {:s}".format(repr(source[start])), (source, start))
   else:
@@ -215,21 +224,21 @@ def parse_attribute_selector (source:str, start:int, end:int) -> tuple[IAttribut
     if source[start] == "[":
       index = start +1
       name, index = _read_attribute_name(source, index, end)
-      if source[index:].startswith("]"):
+      if source.startswith("]", index):
         return AttributeSelector_HasName(name), index +1
-      elif source[index:].startswith("^="):
+      elif source.startswith("^=", index):
         value, index = _read_attribute_value(source, index +2, end)
         return AttributeSelector_StartsWith(name, value), index
-      elif source[index:].startswith("$="):
+      elif source.startswith("$=", index):
         value, index = _read_attribute_value(source, index +2, end)
         return AttributeSelector_EndsWith(name, value), index
-      elif source[index:].startswith("*="):
+      elif source.startswith("*=", index):
         value, index = _read_attribute_value(source, index +2, end)
         return AttributeSelector_ContainsAnywhere(name, value), index
-      elif source[index:].startswith("~="):
+      elif source.startswith("~=", index):
         value, index = _read_attribute_value(source, index +2, end)
         return AttributeSelector_ContainsWithSeparator(name, value), index
-      elif source[index:].startswith("="):
+      elif source.startswith("=", index):
         value, index = _read_attribute_value(source, index +1, end)
         return AttributeSelector_Equal(name, value), index
       else:
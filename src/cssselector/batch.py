@@ -0,0 +1,295 @@
+
+import os
+import sys
+import time
+import argparse
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from typing import Iterable, Iterator, NamedTuple
+from .exception import ParseError, UndecidedError
+from .selector import ISelector, parse_selector
+from .selector_set import SelectorSet
+from .extractor import Extraction, extract
+
+READ_SIZE:int = 65536
+
+#1つのファイルの処理で発生しても、他のファイルの処理を続ける例外です
+_FILE_ERRORS:tuple[type, ...] = (OSError, ValueError, ParseError, UndecidedError)
+
+class FileResult (NamedTuple):
+
+  """1つのファイルから抽出された結果を表現するクラスです。
+
+  Attributes
+  ----------
+  path : str
+    読み込んだファイルのパスです。
+  size : int
+    読み込んだバイト数です。
+  extractions : list[Extraction]
+    抽出されたテキストのリストです。
+  error : str | None
+    ファイルの読み込みや判定に失敗した場合のエラーメッセージです。
+    成功した場合は `None` が設定されます。
+  """
+
+  path:str
+  size:int
+  extractions:list[Extraction]
+  error:str | None
+
+class BatchStats (NamedTuple):
+
+  """`BatchRunner` の処理量を表現するクラスです。
+
+  Attributes
+  ----------
+  files : int
+    処理したファイルの数です。
+  bytes : int
+    読み込んだバイト数の合計です。
+  errors : int
+    読み込みや判定に失敗したファイルの数です。
+  seconds : float
+    処理の開始から経過した秒数です。
+  """
+
+  files:int
+  bytes:int
+  errors:int
+  seconds:float
+
+  @property
+  def files_per_second (self) -> float:
+
+    """1秒あたりに処理したファイルの数です。"""
+
+    return self.files / self.seconds if self.seconds else 0.0
+
+  @property
+  def megabytes_per_second (self) -> float:
+
+    """1秒あたりに読み込んだメガバイト数です。"""
+
+    return self.bytes / 1_000_000 / self.seconds if self.seconds else 0.0
+
+_worker_selector = None
+_worker_with_stack = False
+
+def _init_worker (selector:ISelector | SelectorSet, with_stack:bool):
+  global _worker_selector, _worker_with_stack
+  _worker_selector = selector
+  _worker_with_stack = with_stack
+
+def _scan_file (path:str) -> FileResult:
+  size = 0
+  extractions = []
+
+  def read_chunks (file) -> Iterator[bytes]:
+    nonlocal size
+    while chunk := file.read(READ_SIZE):
+      size += len(chunk)
+      yield chunk
+
+  try:
+    with open(path, "rb") as file:
+      for extraction in extract(_worker_selector, read_chunks(file)):
+        if isinstance(_worker_selector, ISelector):
+          extraction = extraction._replace(selector=None)
+        if not _worker_with_stack:
+          extraction = extraction._replace(element_stack=())
+        extractions.append(extraction)
+  except _FILE_ERRORS as error:
+    return FileResult(path, size, [], str(error))
+  return FileResult(path, size, extractions, None)
+
+def _scan_files (paths:list[str]) -> list[FileResult]:
+  return [_scan_file(path) for path in paths]
+
+def _chunked (paths:Iterable[str], chunksize:int) -> Iterator[list[str]]:
+  chunk = []
+  for path in paths:
+    chunk.append(path)
+    if len(chunk) >= chunksize:
+      yield chunk
+      chunk = []
+  if chunk:
+    yield chunk
+
+class BatchRunner:
+
+  """複数のファイルからセレクターに一致したテキストを、複数のプロセスで並列に抽出するクラスです。
+
+  セレクターは各プロセスの起動時に一度だけ転送されます。
+  ファイルは `chunksize` 個ずつまとめて各プロセスに割り当てられ、結果もまとめて返されます。
+
+  Examples
+  --------
+  >>> runner = BatchRunner(parse_selector("title"), max_workers=4)
+  >>> for result in runner.run(["a.html", "b.html"]):
+  ...   print(result.path, [e.data for e in result.extractions])
+  >>> print(runner.stats.files_per_second)
+
+  Parameters
+  ----------
+  selector : ISelector | SelectorSet
+    抽出に用いるセレクター、またはセレクターの集合です。
+  max_workers : int | None
+    起動するプロセスの数です。
+    `None` が指定されたならば CPU の数が設定されます。
+  chunksize : int
+    1つのプロセスにまとめて割り当てるファイルの数です。
+  ordered : bool
+    `True` ならば結果を与えられたパスの順番で返します。
+    `False` ならば処理が終わった順番で返します。
+  with_stack : bool
+    `True` ならば `Extraction.element_stack` を結果に含めます。
+    `False` ならばプロセス間の転送量を減らすため空のタプルに置き換えます。
+  """
+
+  def __init__ (self, selector:ISelector | SelectorSet, *, max_workers:int | None=None, chunksize:int=16, ordered:bool=True, with_stack:bool=False):
+    if chunksize < 1:
+      raise ValueError("Argument `chunksize` must be positive: {:d}".format(chunksize))
+    self.selector = selector
+    self.max_workers = max_workers or os.cpu_count() or 1
+    self.chunksize = chunksize
+    self.ordered = ordered
+    self.with_stack = with_stack
+    self._files = 0
+    self._bytes = 0
+    self._errors = 0
+    self._started = None
+    self._finished = None
+
+  @property
+  def stats (self) -> BatchStats:
+
+    """最後に呼び出した `run` の処理量です。"""
+
+    if self._started is None:
+      return BatchStats(0, 0, 0, 0.0)
+    finished = self._finished if self._finished is not None else time.perf_counter()
+    return BatchStats(self._files, self._bytes, self._errors, finished - self._started)
+
+  def _account (self, results:list[FileResult]) -> Iterator[FileResult]:
+    for result in results:
+      self._files += 1
+      self._bytes += result.size
+      if result.error is not None:
+        self._errors += 1
+      if isinstance(self.selector, ISelector):
+        result.extractions[:] = [extraction._replace(selector=self.selector) for extraction in result.extractions]
+      yield result
+
+  def run (self, paths:Iterable[str]) -> Iterator[FileResult]:
+
+    """ファイルを読み込み、抽出された結果を逐次返します。
+
+    Parameters
+    ----------
+    paths : Iterable[str]
+      読み込むファイルのパスの列です。
+      同時に処理中となるファイルの数は `max_workers * chunksize` の数倍に制限されます。
+
+    Returns
+    -------
+    Iterator[FileResult]
+      ファイルごとの結果を返すイテレーターです。
+    """
+
+    self._files = 0
+    self._bytes = 0
+    self._errors = 0
+    self._started = time.perf_counter()
+    self._finished = None
+    window = self.max_workers * 4
+    with ProcessPoolExecutor(self.max_workers, initializer=_init_worker, initargs=(self.selector, self.with_stack)) as executor:
+      pending = deque()
+      for chunk in _chunked(paths, self.chunksize):
+        pending.append(executor.submit(_scan_files, chunk))
+        while len(pending) >= window:
+          yield from self._account(self._next_result(pending))
+      while pending:
+        yield from self._account(self._next_result(pending))
+    self._finished = time.perf_counter()
+
+  def _next_result (self, pending:deque[Future]) -> list[FileResult]:
+    if self.ordered:
+      return pending.popleft().result()
+    else:
+      while True:
+        for future in pending:
+          if future.done():
+            pending.remove(future)
+            return future.result()
+        wait(pending, return_when=FIRST_COMPLETED)
+
+def walk_paths (paths:Iterable[str], *, recursive:bool=True) -> Iterator[str]:
+
+  """パスの列に含まれるディレクトリを展開し、ファイルのパスのみを返します。
+
+  Parameters
+  ----------
+  paths : Iterable[str]
+    ファイルまたはディレクトリのパスの列です。
+  recursive : bool
+    `True` ならばディレクトリを再帰的に展開します。
+    `False` ならばディレクトリは無視されます。
+
+  Returns
+  -------
+  Iterator[str]
+    ファイルのパスを返すイテレーターです。
+  """
+
+  for path in paths:
+    if os.path.isdir(path):
+      if recursive:
+        for dirpath, dirnames, filenames in os.walk(path):
+          dirnames.sort()
+          for filename in sorted(filenames):
+            yield os.path.join(dirpath, filename)
+    else:
+      yield path
+
+def main (argv:list[str] | None=None) -> int:
+
+  """複数のファイルを並列に処理するコマンドラインツールです。
+
+  `cssselector-batch SELECTOR PATH...` の形式で実行します。
+  抽出されたテキストを `パス:テキスト` の形式で標準出力に、処理量を標準エラー出力に書き出します。
+
+  Parameters
+  ----------
+  argv : list[str] | None
+    コマンドライン引数です。
+    `None` が指定されたならば `sys.argv[1:]` が使われます。
+
+  Returns
+  -------
+  int
+    終了コードです。
+  """
+
+  parser = argparse.ArgumentParser(prog="cssselector-batch", description="Extract text matched by a CSS selector from many HTML files in parallel.")
+  parser.add_argument("selector", help="CSS selector to match.")
+  parser.add_argument("paths", nargs="+", help="HTML files or directories (walked recursively).")
+  parser.add_argument("-j", "--jobs", type=int, default=None, help="number of worker processes (default: CPU count).")
+  parser.add_argument("--chunksize", type=int, default=16, help="files handed to a worker per task (default: 16).")
+  parser.add_argument("--unordered", action="store_true", help="print results as soon as they are ready.")
+  args = parser.parse_args(argv)
+
+  try:
+    selector = parse_selector(args.selector)
+  except ParseError as error:
+    print("cssselector-batch: {:s}".format(str(error)), file=sys.stderr)
+    return 2
+  runner = BatchRunner(selector, max_workers=args.jobs, chunksize=args.chunksize, ordered=not args.unordered)
+  for result in runner.run(walk_paths(args.paths)):
+    if result.error is not None:
+      print("{:s}: {:s}".format(result.path, result.error), file=sys.stderr)
+    for extraction in result.extractions:
+      print("{:s}:{:s}".format(result.path, extraction.data))
+  stats = runner.stats
+  print("{:d} files, {:.1f} MB in {:.2f} s ({:.1f} files/s, {:.2f} MB/s)".format(stats.files, stats.bytes / 1_000_000, stats.seconds, stats.files_per_second, stats.megabytes_per_second), file=sys.stderr)
+  return 1 if stats.errors else 0
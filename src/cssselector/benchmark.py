@@ -0,0 +1,206 @@
+
+import sys
+import json
+import time
+import timeit
+import platform
+import argparse
+from typing import Callable, NamedTuple
+from .selector import ISelector, Selector_Element, Selector_Son, Selector_Or, parse_selector
+from .attribute_selector import AttributeSelector_HasName, AttributeSelector_Equal, AttributeSelector_StartsWith, AttributeSelector_EndsWith, AttributeSelector_ContainsAnywhere, AttributeSelector_ContainsWithSeparator
+
+FORMAT_VERSION:int = 1
+
+class BenchmarkCase (NamedTuple):
+
+  """ベンチマークの計測対象を表現するクラスです。
+
+  Attributes
+  ----------
+  name : str
+    計測対象の名前です。
+  setup : Callable[[], Callable[[], object]]
+    計測する関数を作成する関数です。
+    準備に要する時間は計測に含まれません。
+  """
+
+  name:str
+  setup:Callable[[], Callable[[], object]]
+
+class BenchmarkResult (NamedTuple):
+
+  """ベンチマークの計測結果を表現するクラスです。
+
+  Attributes
+  ----------
+  name : str
+    計測対象の名前です。
+  seconds : float
+    1回の呼び出しに要した時間の最小値です。
+  number : int
+    1回の計測で呼び出した回数です。
+  repeat : int
+    計測を繰り返した回数です。
+  """
+
+  name:str
+  seconds:float
+  number:int
+  repeat:int
+
+def _parse (source:str) -> Callable[[], Callable[[], object]]:
+  return lambda: lambda: parse_selector(source)
+
+def _match (selector_factory:Callable[[], ISelector], stack:list) -> Callable[[], Callable[[], object]]:
+  def setup ():
+    selector = selector_factory()
+    return lambda: selector.match(stack)
+  return setup
+
+def _deep_chain (combinator:type, depth:int) -> ISelector:
+  selector = Selector_Element("span", [])
+  for _ in range(depth):
+    selector = combinator(Selector_Element("div", []), selector)
+  return selector
+
+_ATTRIBUTES = {"id": "main", "class": "a b c d e", "href": "/path/to/page.html", "data-x": "alpha beta gamma"}
+
+CASES:list[BenchmarkCase] = [
+  BenchmarkCase("parse/short", _parse("p > a")),
+  BenchmarkCase("parse/long", _parse("html body div#main.content.wide > article section.body p > a[href^=\"/\"][data-x*=\"beta\"]")),
+  BenchmarkCase("parse/many_branches", _parse(", ".join("div.c{:d} > a[href]".format(i) for i in range(500)))),
+  BenchmarkCase("element/attribute_checks", _match(lambda: Selector_Element("a", [
+    AttributeSelector_HasName("href"),
+    AttributeSelector_Equal("id", "main"),
+    AttributeSelector_StartsWith("href", "/path"),
+    AttributeSelector_EndsWith("href", ".html"),
+    AttributeSelector_ContainsAnywhere("data-x", "beta"),
+    AttributeSelector_ContainsWithSeparator("class", "d"),
+  ]), [("a", _ATTRIBUTES)])),
+  BenchmarkCase("children/deep_stack", _match(lambda: parse_selector("html div span"), [("html", {})] + [("div", {})] * 200 + [("span", {})])),
+  BenchmarkCase("son/deep_stack", _match(lambda: _deep_chain(Selector_Son, 100), [("div", {})] * 100 + [("span", {})])),
+  BenchmarkCase("or/wide", _match(lambda: Selector_Or([parse_selector("div.c{:d} > a".format(i)) for i in range(200)]), [("html", {}), ("div", {"class": "c199"}), ("a", {})])),
+  BenchmarkCase("children/adversarial", _match(lambda: parse_selector("div div div div span"), [("div", {})] * 24 + [("p", {})])),
+]
+
+def run_benchmarks (cases:list[BenchmarkCase]=CASES, *, repeat:int=5, min_time:float=0.2) -> list[BenchmarkResult]:
+
+  """ベンチマークを計測します。
+
+  Parameters
+  ----------
+  cases : list[BenchmarkCase]
+    計測対象のリストです。
+  repeat : int
+    計測を繰り返す回数です。結果にはその最小値が採用されます。
+  min_time : float
+    1回の計測に要する時間の下限です。
+    呼び出し回数はこの時間を超えるように自動で決定されます。
+
+  Returns
+  -------
+  list[BenchmarkResult]
+    計測結果のリストです。
+  """
+
+  results = []
+  for case in cases:
+    timer = timeit.Timer(case.setup(), timer=time.perf_counter)
+    number = 1
+    while True:
+      elapsed = timer.timeit(number)
+      if min_time <= elapsed or 1_000_000 <= number:
+        break
+      number = max(number * 2, int(number * min_time / max(elapsed, 1e-9) * 1.1))
+    best = min(timer.repeat(repeat, number)) / number
+    results.append(BenchmarkResult(case.name, best, number, repeat))
+  return results
+
+def results_to_json (results:list[BenchmarkResult]) -> dict:
+
+  """計測結果を JSON として書き出せる辞書に変換します。"""
+
+  return {
+    "format": FORMAT_VERSION,
+    "python": platform.python_version(),
+    "implementation": platform.python_implementation(),
+    "results": {result.name: {"seconds": result.seconds, "number": result.number, "repeat": result.repeat} for result in results},
+  }
+
+def compare (current:dict, baseline:dict, *, threshold:float=0.2) -> list[tuple[str, float, bool]]:
+
+  """計測結果を基準となる結果と比較します。
+
+  Parameters
+  ----------
+  current : dict
+    `results_to_json` が作成した、今回の計測結果です。
+  baseline : dict
+    `results_to_json` が作成した、基準となる計測結果です。
+  threshold : float
+    許容する速度低下の割合です。
+    `0.2` ならば基準より 20% 以上遅い計測対象を速度低下として扱います。
+
+  Returns
+  -------
+  list[tuple[str, float, bool]]
+    両方に含まれる計測対象ごとの、名前・基準に対する所要時間の比・速度低下の有無の組のリストです。
+  """
+
+  if baseline.get("format") != FORMAT_VERSION:
+    raise ValueError("Unsupported baseline format: {:s}".format(repr(baseline.get("format"))))
+  comparisons = []
+  for name, result in current["results"].items():
+    if name in baseline["results"]:
+      ratio = result["seconds"] / baseline["results"][name]["seconds"]
+      comparisons.append((name, ratio, 1 + threshold < ratio))
+  return comparisons
+
+def main (argv:list[str] | None=None) -> int:
+
+  """ベンチマークを計測するコマンドラインツールです。
+
+  `cssselector-benchmark` または `python -m cssselector.benchmark` の形式で実行します。
+  `--baseline` を指定した場合、速度低下した計測対象があれば `1` を返します。
+
+  Parameters
+  ----------
+  argv : list[str] | None
+    コマンドライン引数です。
+    `None` が指定されたならば `sys.argv[1:]` が使われます。
+
+  Returns
+  -------
+  int
+    終了コードです。
+  """
+
+  parser = argparse.ArgumentParser(prog="cssselector-benchmark", description="Measure parsing and matching speed and compare it against a saved baseline.")
+  parser.add_argument("-o", "--output", help="write the results as JSON to OUTPUT.")
+  parser.add_argument("-b", "--baseline", help="compare against a JSON file written by --output.")
+  parser.add_argument("-t", "--threshold", type=float, default=0.2, help="allowed slowdown ratio before failing (default: 0.2).")
+  parser.add_argument("-k", "--filter", default="", help="run only the cases whose name contains FILTER.")
+  parser.add_argument("--repeat", type=int, default=5, help="number of measurements per case (default: 5).")
+  parser.add_argument("--min-time", type=float, default=0.2, help="minimum seconds per measurement (default: 0.2).")
+  args = parser.parse_args(argv)
+
+  cases = [case for case in CASES if args.filter in case.name]
+  results = run_benchmarks(cases, repeat=args.repeat, min_time=args.min_time)
+  current = results_to_json(results)
+  for result in results:
+    print("{:<28s} {:14.3f} us".format(result.name, result.seconds * 1e6))
+  if args.output:
+    with open(args.output, "w", encoding="utf-8") as file:
+      json.dump(current, file, indent=2)
+  if args.baseline:
+    with open(args.baseline, encoding="utf-8") as file:
+      baseline = json.load(file)
+    comparisons = compare(current, baseline, threshold=args.threshold)
+    for name, ratio, regressed in comparisons:
+      print("{:<28s} {:8.2f}x {:s}".format(name, ratio, "REGRESSION" if regressed else "ok"))
+    if any(regressed for _, _, regressed in comparisons):
+      return 1
+  return 0
+
+if __name__ == "__main__":
+  sys.exit(main())
@@ -0,0 +1,162 @@
+
+import threading
+from collections import OrderedDict
+from typing import NamedTuple
+from .selector import ISelector, parse_selector
+
+class CacheInfo (NamedTuple):
+
+  """`SelectorCache` の統計情報を表現するクラスです。
+
+  Attributes
+  ----------
+  hits : int
+    キャッシュに一致した回数です。
+  misses : int
+    キャッシュに一致せず `parse_selector` を呼び出した回数です。
+  evictions : int
+    容量を超えたために破棄された項目の数です。
+  maxsize : int
+    保持できる項目の最大数です。
+  currsize : int
+    現在保持している項目の数です。
+  """
+
+  hits:int
+  misses:int
+  evictions:int
+  maxsize:int
+  currsize:int
+
+class SelectorCache:
+
+  """`parse_selector` の結果を保持する LRU キャッシュです。
+
+  同じコードが繰り返し与えられた場合、パースし直さずに以前作成したインスタンスを返します。
+  返されるインスタンスは呼び出し元の間で共有されます。
+  各メソッドはスレッドセーフです。
+
+  Examples
+  --------
+  >>> cache = SelectorCache(maxsize=2)
+  >>> cache.parse("p > a") is cache.parse("p > a")
+  True
+  >>> cache.info()
+  CacheInfo(hits=1, misses=1, evictions=0, maxsize=2, currsize=1)
+
+  Parameters
+  ----------
+  maxsize : int
+    保持できる項目の最大数です。
+    `0` が指定されたならば何も保持しません。
+  """
+
+  def __init__ (self, maxsize:int=1024):
+    if maxsize < 0:
+      raise ValueError("Argument `maxsize` must be zero or positive: {:d}".format(maxsize))
+    self._maxsize = maxsize
+    self._entries = OrderedDict()
+    self._lock = threading.Lock()
+    self._hits = 0
+    self._misses = 0
+    self._evictions = 0
+
+  def __len__ (self) -> int:
+    return len(self._entries)
+
+  def _evict (self):
+    while len(self._entries) > self._maxsize:
+      self._entries.popitem(last=False)
+      self._evictions += 1
+
+  def parse (self, source:str) -> ISelector:
+
+    """CSSセレクターをパースし、その結果を保持します。
+
+    Parameters
+    ----------
+    source : str
+      解析するコードが記述された文字列です。
+
+    Returns
+    -------
+    ISelector
+      パースされた `ISelector` インスタンスです。
+    """
+
+    with self._lock:
+      selector = self._entries.get(source)
+      if selector is not None:
+        self._entries.move_to_end(source)
+        self._hits += 1
+        return selector
+      self._misses += 1
+    selector = parse_selector(source)
+    with self._lock:
+      if source in self._entries:
+        self._entries.move_to_end(source)
+        return self._entries[source]
+      elif self._maxsize:
+        self._entries[source] = selector
+        self._evict()
+    return selector
+
+  def resize (self, maxsize:int):
+
+    """保持できる項目の最大数を変更します。
+
+    Parameters
+    ----------
+    maxsize : int
+      新しい最大数です。
+      現在の項目数がこれを超えるならば、古い順に破棄されます。
+    """
+
+    if maxsize < 0:
+      raise ValueError("Argument `maxsize` must be zero or positive: {:d}".format(maxsize))
+    with self._lock:
+      self._maxsize = maxsize
+      self._evict()
+
+  def clear (self):
+
+    """保持している全ての項目と統計情報を破棄します。"""
+
+    with self._lock:
+      self._entries.clear()
+      self._hits = 0
+      self._misses = 0
+      self._evictions = 0
+
+  def info (self) -> CacheInfo:
+
+    """統計情報を返します。
+
+    Returns
+    -------
+    CacheInfo
+      現在の統計情報です。
+    """
+
+    with self._lock:
+      return CacheInfo(self._hits, self._misses, self._evictions, self._maxsize, len(self._entries))
+
+default_cache:SelectorCache = SelectorCache()
+
+def parse_selector_cached (source:str) -> ISelector:
+
+  """`default_cache` を経由して CSSセレクターをパースします。
+
+  Parameters
+  ----------
+  source : str
+    解析するコードが記述された文字列です。
+
+  Returns
+  -------
+  ISelector
+    パースされた `ISelector` インスタンスです。
+    同じコードに対しては同じインスタンスが返される可能性があります。
+  """
+
+  return default_cache.parse(source)
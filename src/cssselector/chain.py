@@ -0,0 +1,72 @@
+
+from typing import NamedTuple, Type
+from .selector import ISelector, Selector_Element, Selector_Children, Selector_Son, Selector_NextSibling, Selector_SubsequentSibling, Selector_MatchAnywhere, Selector_MatchLast, Selector_Or
+
+class Chain (NamedTuple):
+
+  """結合子で連結された複合セレクターの列を表現するクラスです。
+
+  Attributes
+  ----------
+  compounds : list[Selector_Element]
+    左から順に並べた複合セレクターのリストです。
+    末尾の要素が判定対象となる要素に一致させる複合セレクターです。
+  combinators : list[Type[ISelector]]
+    隣り合う複合セレクターを連結する結合子の型のリストです。
+    `combinators[i]` は `compounds[i]` と `compounds[i +1]` の関係を表します。
+  """
+
+  compounds:list[Selector_Element]
+  combinators:list[Type[ISelector]]
+
+_COMBINATORS:tuple[type, ...] = (Selector_Son, Selector_Children)
+_SIBLING_COMBINATORS:tuple[type, ...] = (Selector_Son, Selector_Children, Selector_NextSibling, Selector_SubsequentSibling)
+
+def _flatten_chain (selector:ISelector, siblings:bool) -> Chain | None:
+  compounds = []
+  combinators = []
+  accepted = _SIBLING_COMBINATORS if siblings else _COMBINATORS
+  while type(selector) in accepted:
+    if isinstance(selector.cur_selector, Selector_Element):
+      compounds.append(selector.cur_selector)
+      combinators.append(type(selector))
+      selector = selector.next_selector
+    else:
+      return None
+  if type(selector) is Selector_MatchLast and combinators and combinators[-1] is Selector_Son:
+    return Chain(compounds, combinators[:-1])
+  else:
+    return None
+
+def flatten_selector (selector:ISelector, *, siblings:bool=False) -> list[Chain] | None:
+
+  """`parse_selector` 関数が作成した木構造を `Chain` のリストに展開します。
+
+  Parameters
+  ----------
+  selector : ISelector
+    展開するセレクターです。
+  siblings : bool
+    `True` ならば兄弟結合子（ `Selector_NextSibling` と `Selector_SubsequentSibling` ）も展開します。
+    `False` ならば兄弟結合子を含むセレクターに対して `None` を返します。
+
+  Returns
+  -------
+  list[Chain] | None
+    セレクターリストの各セレクターに対応する `Chain` のリストです。
+    `parse_selector` 関数が作成する形式ではない木構造が与えられたならば `None` を返します。
+  """
+
+  if type(selector) is Selector_Or:
+    chains = []
+    for sel in selector.selectors:
+      sub_chains = flatten_selector(sel, siblings=siblings)
+      if sub_chains is None:
+        return None
+      chains.extend(sub_chains)
+    return chains
+  elif type(selector) is Selector_MatchAnywhere:
+    chain = _flatten_chain(selector.selector, siblings)
+    return None if chain is None else [chain]
+  else:
+    return None
@@ -0,0 +1,150 @@
+
+import os
+import sys
+import json
+import codecs
+import mmap
+import stat
+import argparse
+from typing import BinaryIO, Iterator
+from .exception import ParseError, UndecidedError
+from .selector import Element, ISelector, Selector_Or, parse_selector
+from .extractor import Extraction, extract
+from .batch import walk_paths
+
+READ_SIZE:int = 65536
+
+def _read_mmap (file:BinaryIO) -> Iterator[bytes]:
+  status = os.fstat(file.fileno())
+  #パイプやプロセス置換は大きさが 0 と報告されるため、通常のファイルのみ mmap で読み込みます
+  if not stat.S_ISREG(status.st_mode):
+    yield from _read_stream(file)
+  elif status.st_size:
+    with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+      for start in range(0, status.st_size, READ_SIZE):
+        yield mapped[start:start +READ_SIZE]
+
+def _read_stream (file:BinaryIO) -> Iterator[bytes]:
+  while chunk := file.read(READ_SIZE):
+    yield chunk
+
+def _format_path (element_stack:tuple[Element, ...]) -> str:
+  return " > ".join(element.tag for element in element_stack)
+
+def _format (extraction:Extraction, output:str) -> str | None:
+  if output == "text":
+    data = extraction.data.strip()
+    return data if data else None
+  elif output == "attrs":
+    return json.dumps(extraction.element_stack[-1].attrs, ensure_ascii=False) if extraction.element_stack else "{}"
+  else:
+    return _format_path(extraction.element_stack)
+
+def _load_selector (args:argparse.Namespace) -> ISelector:
+  if args.file is None:
+    return parse_selector(args.selector)
+  selectors = []
+  with open(args.file, encoding="utf-8") as file:
+    for line in file:
+      line = line.strip()
+      if line:
+        selectors.append(parse_selector(line))
+  if not selectors:
+    raise ParseError("Could not read any selector from file: {:s}".format(repr(args.file)))
+  return selectors[0] if len(selectors) == 1 else Selector_Or(selectors)
+
+def _build_parser () -> argparse.ArgumentParser:
+  parser = argparse.ArgumentParser(prog="cssselector", description="Print the text of HTML elements that match a CSS selector, like grep for HTML.")
+  parser.add_argument("selector", nargs="?", help="CSS selector to match (omit when -f is given).")
+  parser.add_argument("paths", nargs="*", help="HTML files or directories; '-' or nothing reads standard input.")
+  parser.add_argument("-f", "--file", help="read selectors from FILE, one per line.")
+  parser.add_argument("-o", "--output", choices=["text", "attrs", "path"], default="text", help="print matched text (default), the attributes of the matched element as JSON, or its stack path.")
+  parser.add_argument("-c", "--count", action="store_true", help="print only the number of matches per input.")
+  parser.add_argument("--first", action="store_true", help="stop reading an input after its first match.")
+  parser.add_argument("-r", "--recursive", action="store_true", help="walk directories recursively.")
+  parser.add_argument("-H", "--with-filename", action="store_true", default=None, help="prefix each line with the input name (default when there are several inputs).")
+  parser.add_argument("--encoding", default="utf-8", help="encoding of the inputs (default: utf-8).")
+  return parser
+
+def main (argv:list[str] | None=None) -> int:
+
+  """HTML文書からセレクターに一致した要素を検索するコマンドラインツールです。
+
+  `cssselector SELECTOR [PATH...]` の形式で実行します。
+  ファイルは `mmap` を通じて断片ごとに読み込まれ、文書全体が1つの文字列に複製されることはありません。
+
+  Parameters
+  ----------
+  argv : list[str] | None
+    コマンドライン引数です。
+    `None` が指定されたならば `sys.argv[1:]` が使われます。
+
+  Returns
+  -------
+  int
+    一致する要素が見つかれば `0` 、見つからなければ `1` 、エラーが発生したならば `2` を返します。
+  """
+
+  parser = _build_parser()
+  args = parser.parse_args(argv)
+  if args.file is not None and args.selector is not None:
+    args.paths.insert(0, args.selector)
+    args.selector = None
+  elif args.file is None and args.selector is None:
+    parser.error("a selector or -f FILE is required.")
+  try:
+    codecs.lookup(args.encoding)
+  except LookupError:
+    parser.error("unknown encoding: {:s}".format(args.encoding))
+
+  try:
+    selector = _load_selector(args)
+  except (OSError, ParseError, UndecidedError) as error:
+    print("cssselector: {:s}".format(str(error)), file=sys.stderr)
+    return 2
+
+  #walk_paths は -r がなければディレクトリを無視するため、そのまま渡してエラーとして報告します
+  paths = list(walk_paths(args.paths or ["-"])) if args.recursive else args.paths or ["-"]
+  with_filename = args.with_filename if args.with_filename is not None else len(paths) > 1 or args.recursive
+  found = False
+  failed = False
+  for path in paths:
+    name = "(standard input)" if path == "-" else path
+    count = 0
+    if path != "-" and os.path.isdir(path):
+      print("cssselector: {:s}: Is a directory (use -r to search it)".format(path), file=sys.stderr)
+      failed = True
+      continue
+    try:
+      if path == "-":
+        chunks = _read_stream(sys.stdin.buffer)
+        file = None
+      else:
+        file = open(path, "rb")
+        chunks = _read_mmap(file)
+      try:
+        extractions = extract(selector, chunks, encoding=args.encoding)
+        for extraction in extractions:
+          line = _format(extraction, args.output)
+          if line is None:
+            continue
+          count += 1
+          if not args.count:
+            print("{:s}:{:s}".format(name, line) if with_filename else line)
+          if args.first:
+            break
+        extractions.close()
+      finally:
+        chunks.close()
+        if file is not None:
+          file.close()
+    except (OSError, UndecidedError) as error:
+      print("cssselector: {:s}".format(str(error)), file=sys.stderr)
+      failed = True
+      continue
+    if args.count:
+      print("{:s}:{:d}".format(name, count) if with_filename else str(count))
+    found = found or 0 < count
+  if failed:
+    return 2
+  return 0 if found else 1
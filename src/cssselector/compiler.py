@@ -0,0 +1,210 @@
+
+from dataclasses import dataclass, field
+from typing import Any, Callable
+from .attribute_selector import IAttributeSelector, AttributeSelector_HasName, AttributeSelector_Equal, AttributeSelector_StartsWith, AttributeSelector_EndsWith, AttributeSelector_ContainsAnywhere, AttributeSelector_ContainsWithSeparator
+from .prepared import PreparedAttributes, _split_whitespace
+from .selector import Element, ISelector, Selector_Element, Selector_Children, Selector_Son, Selector_MatchAnywhere, Selector_MatchLast, Selector_Or, _reject_sibling_combinators
+
+def _format_index (index:tuple[str | None, int]) -> str:
+  var, offset = index
+  if var is None:
+    return str(offset)
+  elif offset:
+    return "{:s} +{:d}".format(var, offset)
+  else:
+    return var
+
+class _Generator:
+
+  def __init__ (self, match_anywhere:bool, match_children:bool):
+    self.match_anywhere = match_anywhere
+    self.match_children = match_children
+    self.lines = []
+    self.namespace = {}
+    self.count = 0
+
+  def name (self, prefix:str) -> str:
+    self.count += 1
+    return "_{:s}{:d}".format(prefix, self.count)
+
+  def constant (self, value:Any) -> str:
+    name = self.name("k")
+    self.namespace[name] = value
+    return name
+
+  def attribute_expr (self, selector:IAttributeSelector, attrs:str) -> str:
+    selector_type = type(selector)
+    if selector_type is AttributeSelector_HasName:
+      return "{!r} in {:s}".format(selector.name, attrs)
+    elif selector_type is AttributeSelector_Equal:
+      return "({0!r} in {1:s} and {1:s}[{0!r}] == {2!r})".format(selector.name, attrs, selector.value)
+    elif selector_type is AttributeSelector_StartsWith:
+      return "({0!r} in {1:s} and {1:s}[{0!r}].startswith({2!r}))".format(selector.name, attrs, selector.value)
+    elif selector_type is AttributeSelector_EndsWith:
+      return "({0!r} in {1:s} and {1:s}[{0!r}].endswith({2!r}))".format(selector.name, attrs, selector.value)
+    elif selector_type is AttributeSelector_ContainsAnywhere:
+      return "({0!r} in {1:s} and {2!r} in {1:s}[{0!r}])".format(selector.name, attrs, selector.value)
+    elif selector_type is AttributeSelector_ContainsWithSeparator:
+      return "({0!r} in {1:s} and {2!r} in ({1:s}.tokens({0!r}) if type({1:s}) is {3:s} else {4:s}({1:s}[{0!r}])))".format(selector.name, attrs, selector.value, self.constant(PreparedAttributes), self.constant(_split_whitespace))
+    else:
+      return "{:s}.match({:s})".format(self.constant(selector), attrs)
+
+  def expr (self, selector:ISelector, index:tuple[str | None, int]) -> str:
+    i = _format_index(index)
+    selector_type = type(selector)
+    if selector_type is Selector_Element and not selector.pseudo_classes:
+      if not selector.attribute_selectors:
+        if selector.tag:
+          return "({0:s} < n and s[{0:s}][0] == {1!r})".format(i, selector.tag)
+        else:
+          return "({:s} < n)".format(i)
+      name = self.name("e")
+      conditions = ["t == {!r}".format(selector.tag)] if selector.tag else []
+      conditions.extend(self.attribute_expr(sel, "a") for sel in selector.attribute_selectors)
+      self.lines.extend([
+        "def {:s} (s, i, n):".format(name),
+        "  if i < n:",
+        "    t, a = s[i]",
+        "    return {:s}".format(" and ".join(conditions)),
+        "  return False",
+      ])
+      return "{:s}(s, {:s}, n)".format(name, i)
+    elif selector_type is Selector_Son:
+      var, offset = index
+      cur = self.expr(selector.cur_selector, index)
+      nxt = self.expr(selector.next_selector, (var, offset +1))
+      return "({:s} and {:s})".format(cur, nxt)
+    elif selector_type is Selector_Children:
+      name = self.name("c")
+      cur = self.expr(selector.cur_selector, ("i", 0))
+      nxt = self.expr(selector.next_selector, ("j", 0))
+      self.lines.extend([
+        "def {:s} (s, i, n):".format(name),
+        "  if {:s}:".format(cur),
+        "    for j in range(i +1, n):",
+        "      if {:s}:".format(nxt),
+        "        return True",
+        "  return False",
+      ])
+      return "{:s}(s, {:s}, n)".format(name, i)
+    elif selector_type is Selector_MatchAnywhere:
+      if self.match_anywhere:
+        name = self.name("m")
+        inner = self.expr(selector.selector, ("i", 0))
+        self.lines.extend([
+          "def {:s} (s, n):".format(name),
+          "  for i in range(n):",
+          "    if {:s}:".format(inner),
+          "      return True",
+          "  return False",
+        ])
+        return "{:s}(s, n)".format(name)
+      else:
+        return self.expr(selector.selector, (None, 0))
+    elif selector_type is Selector_MatchLast:
+      return "True" if self.match_children else "({:s} == n)".format(i)
+    elif selector_type is Selector_Or:
+      if selector.selectors:
+        return "({:s})".format(" or ".join(self.expr(sel, index) for sel in selector.selectors))
+      else:
+        return "False"
+    else:
+      return "{:s}.match(s, {:s}, match_anywhere={!r}, match_children={!r})".format(self.constant(selector), i, self.match_anywhere, self.match_children)
+
+  def generate (self, selector:ISelector) -> str:
+    body = self.expr(selector, ("i", 0))
+    self.lines.extend([
+      "def _match (s, i):",
+      "  n = len(s)",
+      "  return bool({:s})".format(body),
+    ])
+    return "\n".join(self.lines) + "\n"
+
+def _compile_variant (selector:ISelector, match_anywhere:bool, match_children:bool) -> tuple[Callable[[list[Element], int], bool], str]:
+  generator = _Generator(match_anywhere, match_children)
+  source = generator.generate(selector)
+  namespace = generator.namespace
+  exec(compile(source, "<cssselector.compiler>", "exec"), namespace)
+  return namespace["_match"], source
+
+@dataclass
+class CompiledSelector (ISelector):
+
+  """セレクターの木構造を専用のPython関数に変換して判定するセレクターです。
+
+  定数や属性セレクターの判定を展開したソースコードを生成し、`exec` で関数を作成します。
+  関数は引数 `match_anywhere` `match_children` の組み合わせごとに、初めて使われた時点で作成されます。
+  判定結果は包んでいるセレクターの `match` と常に一致します。
+
+  Attributes
+  ----------
+  selector : ISelector
+    変換元のセレクターです。
+
+  Raises
+  ------
+  ValueError
+    兄弟結合子を含むセレクターが与えられた場合に送出されます。
+  """
+
+  selector:ISelector
+  _variants:dict[tuple[bool, bool], tuple[Callable[[list[Element], int], bool], str]] = field(init=False, repr=False, compare=False, default_factory=dict)
+
+  def __post_init__ (self):
+    _reject_sibling_combinators(self.selector, "CompiledSelector")
+
+  def _variant (self, match_anywhere:bool, match_children:bool) -> tuple[Callable[[list[Element], int], bool], str]:
+    key = (bool(match_anywhere), bool(match_children))
+    variant = self._variants.get(key)
+    if variant is None:
+      variant = self._variants[key] = _compile_variant(self.selector, *key)
+    return variant
+
+  def match (self, element_stack:list[Element], index:int=0, *, match_anywhere:bool=True, match_children:bool=False) -> bool:
+    func, _ = self._variant(match_anywhere, match_children)
+    return func(element_stack, index)
+
+  def source_code (self, *, match_anywhere:bool=True, match_children:bool=False) -> str:
+
+    """判定に用いる関数のソースコードを返します。
+
+    Parameters
+    ----------
+    match_anywhere : bool
+      `ISelector.match` の同名の引数と同じ意味をもちます。
+    match_children : bool
+      `ISelector.match` の同名の引数と同じ意味をもちます。
+
+    Returns
+    -------
+    str
+      生成されたソースコードです。
+    """
+
+    _, source = self._variant(match_anywhere, match_children)
+    return source
+
+def compile_selector (selector:ISelector) -> CompiledSelector:
+
+  """セレクターの木構造を専用のPython関数に変換します。
+
+  Examples
+  --------
+  >>> sel = compile_selector(parse_selector("p > a[href]"))
+  >>> sel.match([("p", {}), ("a", {"href": "..."})])
+  True
+
+  Parameters
+  ----------
+  selector : ISelector
+    変換するセレクターです。
+
+  Returns
+  -------
+  CompiledSelector
+    `ISelector.match` と同じ引数で呼び出せる、変換されたセレクターです。
+  """
+
+  compiled = CompiledSelector(selector)
+  compiled._variant(True, False)
+  return compiled
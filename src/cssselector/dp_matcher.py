@@ -0,0 +1,141 @@
+
+from dataclasses import dataclass
+from .selector import Element, ISelector, Selector_Element, Selector_Children, Selector_Son, Selector_MatchAnywhere, Selector_MatchLast, Selector_Or, _reject_sibling_combinators
+
+def _evaluate (selector:ISelector, element_stack:list[Element], match_anywhere:bool, match_children:bool, memo:dict[int, list[bool]] | None=None) -> list[bool]:
+  if memo is None:
+    return _evaluate_node(selector, element_stack, match_anywhere, match_children, {})
+  table = memo.get(id(selector))
+  if table is None:
+    table = memo[id(selector)] = _evaluate_node(selector, element_stack, match_anywhere, match_children, memo)
+  return table
+
+def _evaluate_node (selector:ISelector, element_stack:list[Element], match_anywhere:bool, match_children:bool, memo:dict[int, list[bool]]) -> list[bool]:
+
+  """セレクターの判定結果をスタックの全ての位置について表にまとめます。
+
+  Notes
+  -----
+  返される表の長さは `len(element_stack) +2` です。
+  末尾の要素はスタックの範囲を超えた全ての位置での判定結果を表します。
+  `ISelector.match` の判定結果はスタックの範囲を超えた位置では位置に依存しないため、これで全ての位置を網羅できます。
+  引数 `memo` には1回の評価の間に作成された表が節点のインスタンスごとに保持されます。
+  そのため複数の箇所から共有された節点の表は一度だけ計算されます。
+  """
+
+  size = len(element_stack)
+  if isinstance(selector, Selector_Element):
+    table = [selector.match(element_stack, i) for i in range(size)]
+    table.append(False)
+    table.append(False)
+    return table
+  elif isinstance(selector, Selector_MatchLast):
+    table = [match_children] * (size +2)
+    table[size] = True
+    return table
+  elif isinstance(selector, Selector_Son):
+    cur_table = _evaluate(selector.cur_selector, element_stack, match_anywhere, match_children, memo)
+    next_table = _evaluate(selector.next_selector, element_stack, match_anywhere, match_children, memo)
+    return [cur_table[i] and next_table[min(i +1, size +1)] for i in range(size +2)]
+  elif isinstance(selector, Selector_Children):
+    cur_table = _evaluate(selector.cur_selector, element_stack, match_anywhere, match_children, memo)
+    next_table = _evaluate(selector.next_selector, element_stack, match_anywhere, match_children, memo)
+    table = [False] * (size +2)
+    found = False
+    for i in range(size -1, -1, -1):
+      table[i] = cur_table[i] and found
+      found = found or next_table[i]
+    return table
+  elif isinstance(selector, Selector_MatchAnywhere):
+    table = _evaluate(selector.selector, element_stack, match_anywhere, match_children, memo)
+    if match_anywhere:
+      value = any(table[:size])
+    else:
+      value = table[0]
+    return [value] * (size +2)
+  elif isinstance(selector, Selector_Or):
+    tables = [_evaluate(sel, element_stack, match_anywhere, match_children, memo) for sel in selector.selectors]
+    return [any(values) for values in zip(*tables)] if tables else [False] * (size +2)
+  else:
+    return [selector.match(element_stack, i, match_anywhere=match_anywhere, match_children=match_children) for i in range(size +2)]
+
+@dataclass
+class DPMatcher (ISelector):
+
+  """動的計画法によって `ISelector` の木構造を評価するセレクターです。
+
+  各節点の判定結果をスタックの全ての位置について一度だけ計算し、表として再利用します。
+  そのため判定に要する計算量は、スタックの深さと節点の数の積に比例します。
+  判定結果は包んでいるセレクターの `match` と常に一致します。
+
+  Examples
+  --------
+  >>> sel = DPMatcher(parse_selector("div div span"))
+  >>> sel.match([("div", {}), ("div", {}), ("span", {})])
+  True
+
+  Attributes
+  ----------
+  selector : ISelector
+    評価するセレクターです。
+    通常は `parse_selector` 関数によって作成されたインスタンスを指定します。
+
+  Raises
+  ------
+  ValueError
+    兄弟結合子を含むセレクターが与えられた場合に送出されます。
+  """
+
+  selector:ISelector
+
+  def __post_init__ (self):
+    _reject_sibling_combinators(self.selector, "DPMatcher")
+
+  def match (self, element_stack:list[Element], index:int=0, *, match_anywhere:bool=True, match_children:bool=False) -> bool:
+    if index < 0:
+      return self.selector.match(element_stack, index, match_anywhere=match_anywhere, match_children=match_children)
+    else:
+      table = _evaluate(self.selector, element_stack, match_anywhere, match_children)
+      return table[min(index, len(element_stack) +1)]
+
+def match_each (selectors:list[ISelector], element_stack:list[Element], *, match_anywhere:bool=True, match_children:bool=False) -> list[bool]:
+
+  """複数のセレクターをまとめて評価し、それぞれの判定結果を返します。
+
+  評価の間、各節点の判定結果の表はインスタンスごとに1つだけ作成されます。
+  `SelectorInternTable` を用いてパースされたセレクターのように部分木が共有されている場合、
+  共有された部分木はセレクターの数によらず一度だけ評価されます。
+
+  Examples
+  --------
+  >>> table = SelectorInternTable()
+  >>> selectors = [parse_selector(source, intern_table=table) for source in ("div.content > p", "div.content a")]
+  >>> match_each(selectors, [("div", {"class": "content"}), ("p", {})])
+  [True, False]
+
+  Parameters
+  ----------
+  selectors : list[ISelector]
+    評価するセレクターのリストです。
+  element_stack : list[Element]
+    HTMLの階層に見立てたスタックです。
+  match_anywhere : bool
+    `ISelector.match` の同名の引数と同じ意味をもちます。
+  match_children : bool
+    `ISelector.match` の同名の引数と同じ意味をもちます。
+
+  Returns
+  -------
+  list[bool]
+    セレクターと同じ順番に並んだ判定結果のリストです。
+
+  Raises
+  ------
+  ValueError
+    兄弟結合子を含むセレクターが与えられた場合に送出されます。
+  """
+
+  for selector in selectors:
+    _reject_sibling_combinators(selector, "match_each")
+  memo = {}
+  return [_evaluate(selector, element_stack, match_anywhere, match_children, memo)[0] for selector in selectors]
@@ -7,3 +7,11 @@ class ParseError (Exception):
   def at (cls, message:str, source_and_pos:tuple[str, int]) -> Self:
     source, pos = source_and_pos
     return cls("{:s}: {:s} at {:d}.".format(message, repr(source), pos))
+
+class RulePackError (Exception):
+
+  pass
+
+class UndecidedError (Exception):
+
+  pass
@@ -0,0 +1,268 @@
+
+import codecs
+from collections import deque
+from html.parser import HTMLParser
+from typing import Any, Iterable, Iterator, NamedTuple
+from .exception import UndecidedError
+from .selector import Element, ISelector
+from .selector_set import SelectorSet
+from .ancestor_filter import AncestorFilter
+from .stream_matcher import StreamMatcher, _PositionTracker
+
+VOID_ELEMENTS:frozenset[str] = frozenset([
+  "area", "base", "br", "col", "embed", "hr", "img", "input",
+  "link", "meta", "param", "source", "track", "wbr",
+])
+
+class Extraction (NamedTuple):
+
+  """抽出されたテキストを表現するクラスです。
+
+  Attributes
+  ----------
+  selector : Any
+    一致したセレクターです。
+    `SelectorSet` を用いて抽出した場合は、一致したセレクターに対応する値が設定されます。
+  element_stack : tuple[Element, ...]
+    テキストが出現した時点のスタックの複製です。
+  data : str
+    抽出されたテキストです。
+  """
+
+  selector:Any
+  element_stack:tuple[Element, ...]
+  data:str
+
+class StreamExtractor (HTMLParser):
+
+  """セレクターに一致した要素のテキストを逐次抽出する `html.parser.HTMLParser` です。
+
+  断片の境界などで分割されたテキストは、次のタグが現れた時点で1つに連結してから抽出します。
+  終了タグをもたない空要素（`<br>` や `<img>` など）はスタックに残しません。
+  対応する開始タグがない終了タグは無視し、閉じられていない子孫の要素は親の終了タグでまとめて閉じます。
+
+  `:last-child` や `:has()` のように後続の要素が現れるまで判定できないテキストは、判定できるようになるまで保留します。
+  保留する際は `StreamMatcher.snapshot` で状態を保存し、兄弟結合子を含むセレクターもその状態から判定し直します。
+  保留中のテキストより後に抽出されたテキストも、出現順を保つために合わせて保留します。
+
+  Parameters
+  ----------
+  selector : ISelector | SelectorSet
+    抽出に用いるセレクター、またはセレクターの集合です。
+  match_anywhere : bool
+    `ISelector.match` の同名の引数と同じ意味をもちます。
+  match_children : bool
+    `ISelector.match` の同名の引数と同じ意味をもちます。
+    `SelectorSet` が指定された場合は無視されます。
+  max_deferred : int
+    保留できるテキストの最大数です。
+    これを超えると `UndecidedError` が送出されるため、文書全体を保持することはありません。
+
+  Attributes
+  ----------
+  selector : ISelector | SelectorSet
+    抽出に用いるセレクター、またはセレクターの集合です。
+  element_stack : list[Element]
+    現在開いている要素のスタックです。
+  """
+
+  def __init__ (self, selector:ISelector | SelectorSet, *, match_anywhere:bool=True, match_children:bool=False, max_deferred:int=1024):
+    super().__init__(convert_charrefs=True)
+    self.selector = selector
+    self.match_anywhere = match_anywhere
+    self.match_children = match_children
+    self.max_deferred = max_deferred
+    self._matcher = StreamMatcher(selector, match_anywhere=match_anywhere, match_children=match_children) if isinstance(selector, ISelector) else None
+    self.element_stack = self._matcher.element_stack if self._matcher is not None else []
+    self._positions = _PositionTracker(selector._pseudo_classes) if self._matcher is None and selector._pseudo_classes else None
+    #SelectorSet では祖先要素の特徴を記録し、祖先要素に一致しえない候補の検証を省略します
+    self._ancestors = AncestorFilter() if self._matcher is None else None
+    #SelectorSet の兄弟結合子を含むセレクターは、要素を合わせて与えた StreamMatcher で判定します
+    self._siblings = selector.sibling_matcher(match_anywhere=match_anywhere) if self._matcher is None else None
+    self._extractions = deque()
+    self._deferred = deque()
+    self._pending = None
+    self._pending_data = []
+
+  def _push (self, tag:str, attrs:list[tuple[str, str | None]]):
+    if self._matcher is not None:
+      self._matcher.push(tag, attrs)
+    else:
+      attrs = {name: "" if value is None else value for name, value in attrs}
+      self._ancestors.push(tag, attrs)
+      if self._siblings is not None:
+        self._siblings.push(tag, attrs)
+      if self._positions is None:
+        self.element_stack.append(Element(tag, attrs))
+      else:
+        self._positions.push(self.element_stack, tag, attrs)
+
+  def _pop (self):
+    if self._matcher is not None:
+      self._matcher.pop()
+    else:
+      self.element_stack.pop()
+      self._ancestors.pop()
+      if self._siblings is not None:
+        self._siblings.pop()
+      if self._positions is not None:
+        self._positions.pop()
+    if self._deferred:
+      self._resolve()
+
+  def _snapshot (self) -> Any:
+    if self._matcher is not None:
+      return self._matcher.snapshot()
+    elif self._siblings is not None:
+      return self._siblings.snapshot()
+    else:
+      return None
+
+  def _match (self, element_stack:tuple[Element, ...], snapshot:Any) -> list[Any]:
+    if self._matcher is not None:
+      return [self.selector] if self._matcher.matches(snapshot) else []
+    else:
+      return self.selector.match(list(element_stack), match_anywhere=self.match_anywhere, sibling_matcher=self._siblings, sibling_snapshot=snapshot)
+
+  def _resolve (self):
+    deferred = self._deferred
+    while deferred:
+      selectors, element_stack, snapshot, data = deferred[0]
+      if selectors is None:
+        try:
+          selectors = self._match(element_stack, snapshot)
+        except UndecidedError:
+          break
+      deferred.popleft()
+      for selector in selectors:
+        self._extractions.append(Extraction(selector, element_stack, data))
+
+  def _flush (self):
+    if self._pending is not None:
+      selectors, element_stack, snapshot = self._pending
+      data = "".join(self._pending_data)
+      if selectors is None or self._deferred:
+        if len(self._deferred) >= self.max_deferred:
+          raise UndecidedError("Too many texts are waiting for following elements: {:d}".format(len(self._deferred)))
+        self._deferred.append((selectors, element_stack, snapshot, data))
+      else:
+        for selector in selectors:
+          self._extractions.append(Extraction(selector, element_stack, data))
+      self._pending = None
+      self._pending_data.clear()
+
+  def handle_starttag (self, tag:str, attrs:list[tuple[str, str | None]]):
+    self._flush()
+    self._push(tag, attrs)
+    if tag in VOID_ELEMENTS:
+      self._pop()
+
+  def handle_startendtag (self, tag:str, attrs:list[tuple[str, str | None]]):
+    self._flush()
+    self._push(tag, attrs)
+    self._pop()
+
+  def handle_endtag (self, tag:str):
+    self._flush()
+    if tag not in VOID_ELEMENTS:
+      for i in range(len(self.element_stack) -1, -1, -1):
+        if self.element_stack[i].tag == tag:
+          for _ in range(len(self.element_stack) - i):
+            self._pop()
+          break
+
+  def handle_comment (self, data:str):
+    self._flush()
+
+  def handle_data (self, data:str):
+    if self._pending is not None:
+      self._pending_data.append(data)
+    else:
+      try:
+        if self._matcher is not None:
+          selectors = [self.selector] if self._matcher.matches() else []
+        else:
+          selectors = self.selector.match(self.element_stack, match_anywhere=self.match_anywhere, ancestor_filter=self._ancestors, sibling_matcher=self._siblings)
+      except UndecidedError:
+        selectors = None
+      if selectors is None or selectors:
+        self._pending = (selectors, tuple(self.element_stack), self._snapshot() if selectors is None else None)
+        self._pending_data.append(data)
+
+  def close (self):
+    super().close()
+    self._flush()
+    if self._matcher is not None:
+      self._matcher.close()
+    else:
+      if self._positions is not None:
+        self._positions.close()
+      if self._siblings is not None:
+        self._siblings.close()
+    self._resolve()
+
+  def drain (self) -> Iterator[Extraction]:
+
+    """これまでに抽出されたテキストを取り出します。
+
+    Returns
+    -------
+    Iterator[Extraction]
+      抽出されたテキストを出現順に返すイテレーターです。
+      取り出されたテキストは内部から破棄されます。
+    """
+
+    extractions = self._extractions
+    while extractions:
+      yield extractions.popleft()
+
+def extract (selector:ISelector | SelectorSet, chunks:Iterable[str | bytes], *, encoding:str="utf-8", errors:str="replace", match_anywhere:bool=True, match_children:bool=False, max_deferred:int=1024) -> Iterator[Extraction]:
+
+  """HTML文書の断片を順に読み込み、セレクターに一致した要素のテキストを逐次返します。
+
+  文書全体を保持することはなく、断片を1つ読み込むたびにそれまでに見つかったテキストを返します。
+
+  Examples
+  --------
+  >>> chunks = ["<p><a href=''>Should ", "Extract!</a><a>Never</a></p>"]
+  >>> [e.data for e in extract(parse_selector("p > a[href]"), chunks)]
+  ['Should Extract!']
+
+  Parameters
+  ----------
+  selector : ISelector | SelectorSet
+    抽出に用いるセレクター、またはセレクターの集合です。
+  chunks : Iterable[str | bytes]
+    HTML文書の断片の列です。
+    `bytes` が与えられたならば、引数 `encoding` に従って逐次デコードされます。
+  encoding : str
+    `bytes` をデコードする際の文字コードです。
+  errors : str
+    デコードに失敗した際の処理方法です。
+  match_anywhere : bool
+    `ISelector.match` の同名の引数と同じ意味をもちます。
+  match_children : bool
+    `ISelector.match` の同名の引数と同じ意味をもちます。
+  max_deferred : int
+    `StreamExtractor` の同名の引数と同じ意味をもちます。
+
+  Returns
+  -------
+  Iterator[Extraction]
+    抽出されたテキストを出現順に返すイテレーターです。
+  """
+
+  extractor = StreamExtractor(selector, match_anywhere=match_anywhere, match_children=match_children, max_deferred=max_deferred)
+  decoder = None
+  for chunk in chunks:
+    if isinstance(chunk, str):
+      extractor.feed(chunk)
+    else:
+      if decoder is None:
+        decoder = codecs.getincrementaldecoder(encoding)(errors)
+      extractor.feed(decoder.decode(chunk))
+    yield from extractor.drain()
+  if decoder is not None:
+    extractor.feed(decoder.decode(b"", final=True))
+  extractor.close()
+  yield from extractor.drain()
@@ -0,0 +1,375 @@
+
+from array import array
+from html.parser import HTMLParser
+from typing import Iterable
+from .attribute_selector import AttributeSelector_Equal, AttributeSelector_ContainsWithSeparator
+from .prepared import _split_whitespace
+from .selector import Element, PositionedElement, ISelector, Selector_Element, Selector_Son, Selector_Children, Selector_NextSibling, PseudoClass_Has, _pseudo_classes
+from .pseudo_class import IPseudoClass
+from .chain import Chain, flatten_selector
+from .stream_matcher import _PositionTracker
+from .extractor import VOID_ELEMENTS
+
+class FlatDocument:
+
+  """文書全体の要素を文書順に並べ、各列を `array` に格納した表現です。
+
+  各要素は文書順の番号で識別され、親要素は常に子要素より前に並びます。
+  要素名・ID・クラス名は文書ごとの表で整数に変換して格納されます。
+
+  Examples
+  --------
+  >>> document = FlatDocument.from_html("<ul><li class='x'>1</li><li>2</li></ul>")
+  >>> select_all(parse_selector("ul > li.x"), document)
+  [1]
+
+  Attributes
+  ----------
+  tags : array
+    要素名の番号の列です。
+  parents : array
+    親要素の番号の列です。親要素がなければ `-1` が設定されます。
+  previous : array
+    直前の兄弟要素の番号の列です。兄弟要素がなければ `-1` が設定されます。
+  depths : array
+    要素の深さの列です。最上位の要素の深さは `0` です。
+  ids : array
+    `id` 属性の値の番号の列です。属性がなければ `-1` が設定されます。
+  class_starts : array
+    各要素のクラス名が `classes` のどこから始まるかを表す列です。
+    要素 `i` のクラス名は `classes[class_starts[i]:class_starts[i +1]]` です。
+  classes : array
+    全ての要素のクラス名の番号を連結した列です。
+  attrs : list[dict[str, str]]
+    各要素に設定された属性の集合です。
+    `id` ・ `class` 以外の属性セレクターの判定に用いられます。
+  names : dict[str, int]
+    要素名・ID・クラス名を番号に変換する表です。
+  """
+
+  def __init__ (self):
+    self.tags = array("I")
+    self.parents = array("i")
+    self.previous = array("i")
+    self.depths = array("I")
+    self.ids = array("i")
+    self.class_starts = array("I", [0])
+    self.classes = array("I")
+    self.attrs = []
+    self.names = {}
+    self._strings = []
+    self._last_children = {}
+    self._indexes = None
+    self._positioned = {}
+
+  def __len__ (self) -> int:
+    return len(self.tags)
+
+  def name_id (self, name:str) -> int:
+
+    """文字列に対応する番号を返します。表になければ追加します。
+
+    Parameters
+    ----------
+    name : str
+      番号に変換する文字列です。
+
+    Returns
+    -------
+    int
+      文字列の番号です。
+    """
+
+    index = self.names.get(name)
+    if index is None:
+      index = self.names[name] = len(self._strings)
+      self._strings.append(name)
+    return index
+
+  def append (self, tag:str, attrs:dict[str, str], parent:int=-1) -> int:
+
+    """要素を末尾に追加します。
+
+    Parameters
+    ----------
+    tag : str
+      要素名です。
+    attrs : dict[str, str]
+      要素に設定された属性の集合です。
+    parent : int
+      親要素の番号です。最上位の要素ならば `-1` を指定します。
+      要素は文書順に追加しなければならないため、親要素は最後に追加した要素かその祖先要素でなければなりません。
+
+    Raises
+    ------
+    IndexError
+      親要素が追加済みでない場合に送出されます。
+    ValueError
+      親要素が最後に追加した要素でもその祖先要素でもない場合に送出されます。
+
+    Returns
+    -------
+    int
+      追加した要素の番号です。
+    """
+
+    if not -1 <= parent < len(self.tags):
+      raise IndexError("Parent must be an appended element: {:d}".format(parent))
+    #子孫要素が文書順で連続するように、親要素は最後に追加した要素かその祖先要素に限ります
+    index = len(self.tags)
+    ancestor = index -1
+    while ancestor > parent:
+      ancestor = self.parents[ancestor]
+    if ancestor != parent:
+      raise ValueError("Parent must be the last element or its ancestor: {:d}".format(parent))
+    self.tags.append(self.name_id(tag))
+    self.parents.append(parent)
+    self.previous.append(self._last_children.get(parent, -1))
+    self._last_children[parent] = index
+    self.depths.append(0 if parent < 0 else self.depths[parent] +1)
+    self.ids.append(self.name_id(attrs["id"]) if "id" in attrs else -1)
+    if "class" in attrs:
+      self.classes.extend(self.name_id(class_) for class_ in dict.fromkeys(_split_whitespace(attrs["class"])))
+    self.class_starts.append(len(self.classes))
+    self.attrs.append(attrs)
+    self._indexes = None
+    self._positioned.clear()
+    return index
+
+  def element_stack (self, index:int) -> list[Element]:
+
+    """要素とその祖先要素からなるスタックを作成します。
+
+    Parameters
+    ----------
+    index : int
+      要素の番号です。
+
+    Returns
+    -------
+    list[Element]
+      最上位の要素から順に並べたスタックです。
+    """
+
+    stack = []
+    while index >= 0:
+      stack.append(Element(self._strings[self.tags[index]], self.attrs[index]))
+      index = self.parents[index]
+    stack.reverse()
+    return stack
+
+  def _positioned_elements (self, pseudo_classes:list[IPseudoClass]) -> list[PositionedElement]:
+    #文書全体を StreamMatcher と同じ手順でたどり、兄弟要素の数と :has() の記録が確定した要素を作成します
+    key = tuple(dict.fromkeys(sel for sel in pseudo_classes if type(sel) is PseudoClass_Has))
+    elements = self._positioned.get(key)
+    if elements is None:
+      tracker = _PositionTracker(list(key))
+      stack = []
+      elements = []
+      for index in range(len(self.tags)):
+        while len(stack) > self.depths[index]:
+          stack.pop()
+          tracker.pop()
+        tracker.push(stack, self._strings[self.tags[index]], self.attrs[index])
+        elements.append(stack[-1])
+      while stack:
+        stack.pop()
+        tracker.pop()
+      tracker.close()
+      elements = self._positioned[key] = elements
+    return elements
+
+  def _stack (self, elements:list[Element], index:int) -> list[Element]:
+    stack = []
+    while index >= 0:
+      stack.append(elements[index])
+      index = self.parents[index]
+    stack.reverse()
+    return stack
+
+  def _index (self) -> tuple[dict[int, list[int]], dict[int, list[int]], dict[int, list[int]], array]:
+    if self._indexes is None:
+      by_tag = {}
+      by_id = {}
+      by_class = {}
+      for index, tag in enumerate(self.tags):
+        by_tag.setdefault(tag, []).append(index)
+      for index, id_ in enumerate(self.ids):
+        if id_ >= 0:
+          by_id.setdefault(id_, []).append(index)
+      class_starts = self.class_starts
+      classes = self.classes
+      for index in range(len(self.tags)):
+        for pos in range(class_starts[index], class_starts[index +1]):
+          by_class.setdefault(classes[pos], []).append(index)
+      #子孫要素の範囲の終端です。要素 i の子孫要素は i +1 から ends[i] の手前までに並びます
+      ends = array("I", range(1, len(self.tags) +1))
+      parents = self.parents
+      for index in range(len(self.tags) -1, -1, -1):
+        parent = parents[index]
+        if parent >= 0 and ends[index] > ends[parent]:
+          ends[parent] = ends[index]
+      self._indexes = (by_tag, by_id, by_class, ends)
+    return self._indexes
+
+  @classmethod
+  def from_html (cls, chunks:str | Iterable[str]) -> "FlatDocument":
+
+    """HTML文書を読み込み、作成したインスタンスを返します。
+
+    要素の開閉は `StreamExtractor` と同じ規則で扱われます。
+
+    Parameters
+    ----------
+    chunks : str | Iterable[str]
+      HTML文書、またはその断片の列です。
+
+    Returns
+    -------
+    FlatDocument
+      作成されたインスタンスです。
+    """
+
+    builder = _Builder(cls())
+    for chunk in [chunks] if isinstance(chunks, str) else chunks:
+      builder.feed(chunk)
+    builder.close()
+    return builder.document
+
+class _Builder (HTMLParser):
+
+  def __init__ (self, document:FlatDocument):
+    super().__init__(convert_charrefs=True)
+    self.document = document
+    self.open = []
+    self.open_tags = []
+
+  def handle_starttag (self, tag:str, attrs:list[tuple[str, str | None]]):
+    index = self.document.append(tag, {name: "" if value is None else value for name, value in attrs}, self.open[-1] if self.open else -1)
+    if tag not in VOID_ELEMENTS:
+      self.open.append(index)
+      self.open_tags.append(tag)
+
+  def handle_startendtag (self, tag:str, attrs:list[tuple[str, str | None]]):
+    self.document.append(tag, {name: "" if value is None else value for name, value in attrs}, self.open[-1] if self.open else -1)
+
+  def handle_endtag (self, tag:str):
+    if tag not in VOID_ELEMENTS:
+      for i in range(len(self.open_tags) -1, -1, -1):
+        if self.open_tags[i] == tag:
+          del self.open[i:]
+          del self.open_tags[i:]
+          break
+
+def _select_compound (compound:Selector_Element, document:FlatDocument, elements:list[PositionedElement] | None) -> list[int]:
+  by_tag, by_id, by_class, _ = document._index()
+  names = document.names
+  #索引を引ける条件のうち最も候補の少ないものから候補を求め、残りの条件で絞り込みます
+  options = []
+  for i, sel in enumerate(compound.attribute_selectors):
+    if type(sel) is AttributeSelector_Equal and sel.name == "id":
+      options.append((len(by_id.get(names.get(sel.value, -1), ())), i, by_id.get(names.get(sel.value, -1), ())))
+    elif type(sel) is AttributeSelector_ContainsWithSeparator and sel.name == "class":
+      options.append((len(by_class.get(names.get(sel.value, -1), ())), i, by_class.get(names.get(sel.value, -1), ())))
+  if compound.tag:
+    nodes = by_tag.get(names.get(compound.tag, -1), ())
+    options.append((len(nodes), -1, nodes))
+  if options:
+    _, chosen, candidates = min(options, key=lambda option: option[0])
+  else:
+    chosen, candidates = None, range(len(document))
+  checks = [sel for i, sel in enumerate(compound.attribute_selectors) if i != chosen]
+  tag = names.get(compound.tag, -1) if compound.tag and chosen != -1 else None
+  if checks or tag is not None:
+    tags = document.tags
+    attrs = document.attrs
+    candidates = [index for index in candidates if (tag is None or tags[index] == tag) and all(sel.match(attrs[index]) for sel in checks)]
+  if compound.pseudo_classes:
+    #疑似クラスは索引で絞り込んだ候補のみ、位置をもつ要素のスタックで判定します
+    depths = document.depths
+    return [index for index in candidates if compound.match(document._stack(elements, index), depths[index])]
+  return list(candidates)
+
+def _select_chain (chain:Chain, document:FlatDocument, elements:list[PositionedElement] | None, match_anywhere:bool) -> list[int]:
+  compounds, combinators = chain
+  size = len(document)
+  matched = _select_compound(compounds[0], document, elements)
+  if not match_anywhere:
+    depths = document.depths
+    matched = [index for index in matched if not depths[index]]
+  for compound, combinator in zip(compounds[1:], combinators):
+    if not matched:
+      break
+    reach = bytearray(size)
+    for index in matched:
+      reach[index] = 1
+    matched = _select_compound(compound, document, elements)
+    if combinator is Selector_Son:
+      parents = document.parents
+      matched = [index for index in matched if parents[index] >= 0 and reach[parents[index]]]
+    elif combinator is Selector_NextSibling:
+      previous = document.previous
+      matched = [index for index in matched if previous[index] >= 0 and reach[previous[index]]]
+    elif combinator is Selector_Children:
+      #子孫要素は文書順で連続した範囲を占めるため、範囲ごとにまとめて印を付けます
+      ends = document._index()[3]
+      below = bytearray(size)
+      for index in range(size):
+        if reach[index] and not below[index]:
+          below[index +1:ends[index]] = b"\x01" * (ends[index] - index -1)
+      matched = [index for index in matched if below[index]]
+    else:
+      #直前の兄弟要素は常に前に並ぶため、1回の走査で先行する兄弟要素への到達を伝播できます
+      previous = document.previous
+      below = bytearray(size)
+      for index in range(reach.find(1) +1, size):
+        link = previous[index]
+        if link >= 0 and (reach[link] or below[link]):
+          below[index] = 1
+      matched = [index for index in matched if below[index]]
+  return matched
+
+def select_all (selector:ISelector, document:FlatDocument, *, match_anywhere:bool=True) -> list[int]:
+
+  """文書の中でセレクターに一致する全ての要素の番号を返します。
+
+  各複合セレクターに一致する要素の集合を索引から求め、
+  結合子に従って文書全体を数回走査するだけで一致する要素の集合を伝播します。
+  そのため要素ごとに `ISelector.match` で祖先要素をたどり直す必要がありません。
+
+  疑似クラスを含むセレクターでは、文書全体を1度たどって兄弟要素の数と `:has()` の記録が確定した
+  `PositionedElement` を作成し、索引で絞り込んだ候補のみをそのスタックで判定します。
+
+  Notes
+  -----
+  `parse_selector` 関数が作成する形式ではない木構造が与えられたならば、
+  要素ごとにスタックを作成して `ISelector.match` で判定します。
+
+  Parameters
+  ----------
+  selector : ISelector
+    判定に用いるセレクターです。
+  document : FlatDocument
+    判定する文書です。
+  match_anywhere : bool
+    `ISelector.match` の同名の引数と同じ意味をもちます。
+
+  Returns
+  -------
+  list[int]
+    一致した要素の番号を文書順に並べたリストです。
+  """
+
+  pseudo_classes = _pseudo_classes(selector)
+  elements = document._positioned_elements(pseudo_classes) if pseudo_classes else None
+  chains = flatten_selector(selector, siblings=True)
+  if chains is None:
+    if elements is None:
+      return [index for index in range(len(document)) if selector.match(document.element_stack(index), match_anywhere=match_anywhere, match_children=False)]
+    return [index for index in range(len(document)) if selector.match(document._stack(elements, index), match_anywhere=match_anywhere, match_children=False)]
+  if len(chains) == 1:
+    return _select_chain(chains[0], document, elements, match_anywhere)
+  found = set()
+  for chain in chains:
+    found.update(_select_chain(chain, document, elements, match_anywhere))
+  return sorted(found)
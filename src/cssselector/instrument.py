@@ -0,0 +1,210 @@
+
+import time
+import dataclasses
+from dataclasses import dataclass
+from typing import Any, Iterator
+from .selector import Element, ISelector
+from .attribute_selector import IAttributeSelector
+
+class NodeStats:
+
+  """1つのノードの評価回数と所要時間を表現するクラスです。
+
+  Attributes
+  ----------
+  calls : int
+    `match` が呼び出された回数です。
+  successes : int
+    `match` が `True` を返した回数です。
+  seconds : float
+    `match` に要した時間の累計です。子孫のノードに要した時間を含みます。
+  """
+
+  __slots__ = ("calls", "successes", "seconds")
+
+  def __init__ (self):
+    self.clear()
+
+  def clear (self):
+
+    """計測結果を全て `0` に戻します。"""
+
+    self.calls = 0
+    self.successes = 0
+    self.seconds = 0.0
+
+  def __repr__ (self) -> str:
+    return "NodeStats(calls={:d}, successes={:d}, seconds={:f})".format(self.calls, self.successes, self.seconds)
+
+@dataclass(frozen=True)
+class InstrumentedSelector (ISelector):
+
+  """`match` の呼び出しを計測する `ISelector` のラッパーです。
+
+  インスタンスは関数 `instrument` によって作成されます。
+
+  Attributes
+  ----------
+  selector : ISelector
+    計測対象のノードです。子孫のノードも計測用のラッパーに置き換えられています。
+  stats : NodeStats
+    計測結果です。
+  """
+
+  selector:ISelector
+  stats:NodeStats = dataclasses.field(default_factory=NodeStats, compare=False)
+
+  def match (self, element_stack:list[Element], index:int=0, *, match_anywhere:bool=True, match_children:bool=False) -> bool:
+    stats = self.stats
+    start = time.perf_counter()
+    result = self.selector.match(element_stack, index, match_anywhere=match_anywhere, match_children=match_children)
+    stats.seconds += time.perf_counter() - start
+    stats.calls += 1
+    if result:
+      stats.successes += 1
+    return result
+
+  def reset (self):
+
+    """自身と子孫のノードの計測結果を全て `0` に戻します。"""
+
+    for _, _, node in _walk(self, "0", 0):
+      node.stats.clear()
+
+@dataclass(frozen=True)
+class InstrumentedAttributeSelector (IAttributeSelector):
+
+  """`match` の呼び出しを計測する `IAttributeSelector` のラッパーです。
+
+  Attributes
+  ----------
+  selector : IAttributeSelector
+    計測対象の属性セレクターです。
+  stats : NodeStats
+    計測結果です。
+  """
+
+  selector:IAttributeSelector
+  stats:NodeStats = dataclasses.field(default_factory=NodeStats, compare=False)
+
+  def match (self, attrs:dict[str, str]) -> bool:
+    stats = self.stats
+    start = time.perf_counter()
+    result = self.selector.match(attrs)
+    stats.seconds += time.perf_counter() - start
+    stats.calls += 1
+    if result:
+      stats.successes += 1
+    return result
+
+_Instrumented = InstrumentedSelector | InstrumentedAttributeSelector
+
+def _wrap (value:Any) -> Any:
+  if isinstance(value, ISelector):
+    return InstrumentedSelector(_rebuild(value))
+  elif isinstance(value, IAttributeSelector):
+    return InstrumentedAttributeSelector(value)
+  elif isinstance(value, list) and any(isinstance(item, (ISelector, IAttributeSelector)) for item in value):
+    return [_wrap(item) for item in value]
+  elif isinstance(value, tuple) and any(isinstance(item, (ISelector, IAttributeSelector)) for item in value):
+    return tuple(_wrap(item) for item in value)
+  else:
+    return value
+
+def _rebuild (selector:ISelector) -> ISelector:
+  if not dataclasses.is_dataclass(selector):
+    return selector
+  changes = {}
+  for field in dataclasses.fields(selector):
+    if field.init:
+      value = getattr(selector, field.name)
+      wrapped = _wrap(value)
+      if wrapped is not value:
+        changes[field.name] = wrapped
+  return dataclasses.replace(selector, **changes) if changes else selector
+
+def instrument (selector:ISelector) -> InstrumentedSelector:
+
+  """セレクターの木構造を複製し、全てのノードを計測用のラッパーで包みます。
+
+  元のセレクターは変更されません。
+  計測が不要な場合は元のセレクターをそのまま使えば、計測による負荷は一切かかりません。
+
+  Examples
+  --------
+  >>> selector = instrument(parse_selector("p > a[href]"))
+  >>> selector.match([("p", {}), ("a", {"href": "/"})])
+  True
+  >>> print(report(selector))
+
+  Parameters
+  ----------
+  selector : ISelector
+    計測対象のセレクターです。
+
+  Returns
+  -------
+  InstrumentedSelector
+    計測用のラッパーで包まれたセレクターです。
+    元のセレクターと同じ結果を返します。
+  """
+
+  return _wrap(selector)
+
+def _children (node:_Instrumented) -> Iterator[_Instrumented]:
+  inner = node.selector
+  if dataclasses.is_dataclass(inner):
+    for field in dataclasses.fields(inner):
+      value = getattr(inner, field.name)
+      for item in (value if isinstance(value, (list, tuple)) else [value]):
+        if isinstance(item, (InstrumentedSelector, InstrumentedAttributeSelector)):
+          yield item
+
+def _describe (node:_Instrumented) -> str:
+  inner = node.selector
+  if isinstance(node, InstrumentedAttributeSelector):
+    return repr(inner)
+  elif hasattr(inner, "tag"):
+    return "{:s}({:s})".format(type(inner).__name__, repr(inner.tag or "*"))
+  else:
+    return type(inner).__name__
+
+def _walk (node:_Instrumented, path:str, depth:int) -> Iterator[tuple[str, int, _Instrumented]]:
+  yield path, depth, node
+  for i, child in enumerate(_children(node)):
+    yield from _walk(child, "{:s}.{:d}".format(path, i), depth +1)
+
+def report (selector:InstrumentedSelector, *, format:str="table") -> str | dict[str, dict[str, Any]]:
+
+  """計測結果を書き出します。
+
+  Parameters
+  ----------
+  selector : InstrumentedSelector
+    関数 `instrument` によって作成されたセレクターです。
+  format : str
+    `"table"` ならば木構造を字下げで表した表を文字列で返します。
+    `"dict"` ならばノードの位置を表す `"0.1.0"` のような文字列をキーとする辞書を返します。
+    各値は `node` ・ `depth` ・ `calls` ・ `successes` ・ `seconds` をキーにもつ辞書です。
+
+  Returns
+  -------
+  str | dict[str, dict[str, Any]]
+    計測結果です。
+  """
+
+  nodes = list(_walk(selector, "0", 0))
+  if format == "dict":
+    return {
+      path: {"node": _describe(node), "depth": depth, "calls": node.stats.calls, "successes": node.stats.successes, "seconds": node.stats.seconds}
+      for path, depth, node in nodes
+    }
+  elif format == "table":
+    labels = ["  " * depth + _describe(node) for _, depth, node in nodes]
+    width = max(len("node"), *(len(label) for label in labels))
+    lines = ["{:<{width}s} {:>10s} {:>10s} {:>12s}".format("node", "calls", "successes", "seconds", width=width)]
+    for label, (_, _, node) in zip(labels, nodes):
+      lines.append("{:<{width}s} {:10d} {:10d} {:12.6f}".format(label, node.stats.calls, node.stats.successes, node.stats.seconds, width=width))
+    return "\n".join(lines)
+  else:
+    raise ValueError("Unknown report format: {:s}".format(repr(format)))
@@ -0,0 +1,145 @@
+
+import threading
+import dataclasses
+from typing import Any, NamedTuple, TypeVar
+
+_T = TypeVar("_T")
+
+class InternInfo (NamedTuple):
+
+  """`SelectorInternTable` の統計情報を表現するクラスです。
+
+  Attributes
+  ----------
+  hits : int
+    既存のノードが再利用された回数です。
+  misses : int
+    新しいノードが登録された回数です。
+  currsize : int
+    現在登録されているノードの数です。
+  """
+
+  hits:int
+  misses:int
+  currsize:int
+
+#辞書のキーで登録済みの子ノードの識別子を表す目印です
+_NODE = object()
+
+def _is_frozen_dataclass (value:Any) -> bool:
+  return dataclasses.is_dataclass(value) and not isinstance(value, type) and value.__dataclass_params__.frozen
+
+def _shallow (value:Any) -> Any:
+  #登録済みの子ノードは識別子に置き換え、ハッシュ値の計算が子孫に及ばないようにします
+  if type(value) is tuple:
+    return tuple(_shallow(item) for item in value)
+  elif _is_frozen_dataclass(value):
+    return (_NODE, id(value))
+  else:
+    return value
+
+class SelectorInternTable:
+
+  """構造の等しいセレクターの部分木を1つのインスタンスに共有させる表です。
+
+  `ISelector` や `IAttributeSelector` の木構造を葉から順に登録し、
+  既に等しいノードが登録されていればそのインスタンスを返します。
+  子ノードは常に登録済みのインスタンスに置き換えられるため、表のキーには子ノードを識別子に置き換えたタプルを用います。
+  データクラスの `__hash__` はキャッシュされず子孫を再帰的にたどるため、ノード自身をキーにはしません。
+  これにより、ハッシュ値の計算と等価性の判定はいずれもノードの直下の値のみで済みます。
+  登録されたノードは表が破棄されるまで保持されます。
+  各メソッドはスレッドセーフです。
+
+  Examples
+  --------
+  >>> table = SelectorInternTable()
+  >>> a = parse_selector("div.content > p", intern_table=table)
+  >>> b = parse_selector("div.content a", intern_table=table)
+  >>> a.selector.cur_selector is b.selector.cur_selector
+  True
+  """
+
+  def __init__ (self):
+    self._nodes = {}
+    self._canonical_ids = set()
+    self._lock = threading.Lock()
+    self._hits = 0
+    self._misses = 0
+
+  def __len__ (self) -> int:
+    return len(self._nodes)
+
+  def _intern_value (self, value:Any) -> Any:
+    if type(value) is tuple:
+      items = tuple(self._intern_value(item) for item in value)
+      return value if all(a is b for a, b in zip(items, value)) else items
+    elif _is_frozen_dataclass(value):
+      return self._intern(value)
+    else:
+      return value
+
+  def _intern (self, node:_T) -> _T:
+    if id(node) in self._canonical_ids:
+      return node
+    changes = {}
+    for field in dataclasses.fields(node):
+      value = getattr(node, field.name)
+      canonical = self._intern_value(value)
+      if canonical is not value:
+        changes[field.name] = canonical
+    if changes:
+      node = dataclasses.replace(node, **changes)
+    key = (type(node), tuple(_shallow(getattr(node, field.name)) for field in dataclasses.fields(node)))
+    found = self._nodes.get(key)
+    if found is not None:
+      self._hits += 1
+      return found
+    self._nodes[key] = node
+    self._canonical_ids.add(id(node))
+    self._misses += 1
+    return node
+
+  def intern (self, node:_T) -> _T:
+
+    """ノードとその子孫を登録し、共有されたインスタンスを返します。
+
+    Parameters
+    ----------
+    node : _T
+      登録するノードです。
+      `frozen` なデータクラス以外が与えられたならば、そのまま返します。
+
+    Returns
+    -------
+    _T
+      構造の等しいノードが既に登録されていればそのインスタンスを、
+      そうでなければ子孫を共有されたインスタンスに置き換えたノードを返します。
+    """
+
+    if not _is_frozen_dataclass(node):
+      return node
+    with self._lock:
+      return self._intern(node)
+
+  def clear (self):
+
+    """登録されている全てのノードと統計情報を破棄します。"""
+
+    with self._lock:
+      self._nodes.clear()
+      self._canonical_ids.clear()
+      self._hits = 0
+      self._misses = 0
+
+  def info (self) -> InternInfo:
+
+    """統計情報を返します。
+
+    Returns
+    -------
+    InternInfo
+      現在の統計情報です。
+    """
+
+    with self._lock:
+      return InternInfo(self._hits, self._misses, len(self._nodes))
@@ -0,0 +1,230 @@
+
+from collections import deque
+from typing import Any, Iterable
+from .attribute_selector import IAttributeSelector, AttributeSelector_StartsWith, AttributeSelector_EndsWith, AttributeSelector_ContainsAnywhere
+
+class AhoCorasick:
+
+  """複数の文字列を1回の走査でまとめて検索する Aho-Corasick 法のオートマトンです。
+
+  Examples
+  --------
+  >>> automaton = AhoCorasick(["he", "she", "hers"])
+  >>> sorted(automaton.search("ushers"))
+  [0, 1, 2]
+
+  Parameters
+  ----------
+  patterns : Iterable[str]
+    検索する文字列の列です。
+    各文字列は列の中の位置を番号として識別されます。
+  """
+
+  def __init__ (self, patterns:Iterable[str]):
+    goto = [{}]
+    outputs = [[]]
+    for pattern_index, pattern in enumerate(patterns):
+      state = 0
+      for char in pattern:
+        next_state = goto[state].get(char)
+        if next_state is None:
+          next_state = goto[state][char] = len(goto)
+          goto.append({})
+          outputs.append([])
+        state = next_state
+      outputs[state].append(pattern_index)
+    fail = [0] * len(goto)
+    queue = deque(goto[0].values())
+    while queue:
+      state = queue.popleft()
+      for char, next_state in goto[state].items():
+        queue.append(next_state)
+        link = fail[state]
+        while link and char not in goto[link]:
+          link = fail[link]
+        fail[next_state] = goto[link].get(char, 0) if goto[link].get(char) != next_state else 0
+        outputs[next_state].extend(outputs[fail[next_state]])
+    self._goto = goto
+    self._fail = fail
+    self._outputs = [tuple(output) for output in outputs]
+
+  def search (self, text:str) -> set[int]:
+
+    """文字列に含まれる全てのパターンの番号を返します。
+
+    Parameters
+    ----------
+    text : str
+      検索対象の文字列です。
+
+    Returns
+    -------
+    set[int]
+      `text` に1回以上出現したパターンの番号の集合です。
+      空文字列のパターンは常に含まれます。
+    """
+
+    goto = self._goto
+    fail = self._fail
+    outputs = self._outputs
+    found = set(outputs[0])
+    state = 0
+    for char in text:
+      while state and char not in goto[state]:
+        state = fail[state]
+      state = goto[state].get(char, 0)
+      if outputs[state]:
+        found.update(outputs[state])
+    return found
+
+class _Trie:
+
+  def __init__ (self, patterns:Iterable[str]):
+    children = [{}]
+    outputs = [[]]
+    for pattern_index, pattern in enumerate(patterns):
+      node = 0
+      for char in pattern:
+        next_node = children[node].get(char)
+        if next_node is None:
+          next_node = children[node][char] = len(children)
+          children.append({})
+          outputs.append([])
+        node = next_node
+      outputs[node].append(pattern_index)
+    self._children = children
+    self._outputs = outputs
+
+  def search (self, chars:Iterable[str]) -> list[int]:
+    children = self._children
+    outputs = self._outputs
+    found = list(outputs[0])
+    node = 0
+    for char in chars:
+      node = children[node].get(char)
+      if node is None:
+        break
+      found.extend(outputs[node])
+    return found
+
+class _PatternGroup:
+
+  def __init__ (self):
+    self.contains = {}
+    self.prefixes = {}
+    self.suffixes = {}
+    self._compiled = None
+
+  def add (self, selector:IAttributeSelector, payload:Any):
+    if type(selector) is AttributeSelector_ContainsAnywhere:
+      patterns = self.contains
+    elif type(selector) is AttributeSelector_StartsWith:
+      patterns = self.prefixes
+    else:
+      patterns = self.suffixes
+    patterns.setdefault(selector.value, []).append(payload)
+    self._compiled = None
+
+  def _compile (self) -> tuple:
+    if self._compiled is None:
+      contains = list(self.contains)
+      prefixes = list(self.prefixes)
+      suffixes = list(self.suffixes)
+      self._compiled = (
+        AhoCorasick(contains) if contains else None, [self.contains[pattern] for pattern in contains],
+        _Trie(prefixes) if prefixes else None, [self.prefixes[pattern] for pattern in prefixes],
+        _Trie(pattern[::-1] for pattern in suffixes) if suffixes else None, [self.suffixes[pattern] for pattern in suffixes],
+      )
+    return self._compiled
+
+  def match (self, value:str, found:list[Any]):
+    automaton, contains, prefix_trie, prefixes, suffix_trie, suffixes = self._compile()
+    if automaton is not None:
+      for pattern_index in automaton.search(value):
+        found.extend(contains[pattern_index])
+    if prefix_trie is not None:
+      for pattern_index in prefix_trie.search(value):
+        found.extend(prefixes[pattern_index])
+    if suffix_trie is not None:
+      for pattern_index in suffix_trie.search(reversed(value)):
+        found.extend(suffixes[pattern_index])
+
+class AttributePatternIndex:
+
+  """多数の `[属性名*="値"]` ・ `[属性名^="値"]` ・ `[属性名$="値"]` をまとめて判定する索引です。
+
+  属性セレクターは属性名ごとに分類され、部分一致は Aho-Corasick 法のオートマトン、
+  前方一致と後方一致はトライ木にまとめられます。
+  そのため属性値を1回走査するだけで、一致する全ての属性セレクターが求まります。
+  判定に要する計算量は登録された属性セレクターの数にほとんど依存しません。
+
+  Examples
+  --------
+  >>> index = AttributePatternIndex()
+  >>> index.add(AttributeSelector_ContainsAnywhere("href", "ads"), "ads")
+  >>> index.add(AttributeSelector_StartsWith("href", "https:"), "secure")
+  >>> sorted(index.match({"href": "https://example.com/ads/1"}))
+  ['ads', 'secure']
+
+  Notes
+  -----
+  オートマトンは登録後の最初の `match` の呼び出し時に構築されます。
+  """
+
+  SUPPORTED_TYPES:tuple[type, ...] = (AttributeSelector_ContainsAnywhere, AttributeSelector_StartsWith, AttributeSelector_EndsWith)
+
+  def __init__ (self):
+    self._groups = {}
+    self._size = 0
+
+  def __len__ (self) -> int:
+    return self._size
+
+  def add (self, selector:IAttributeSelector, payload:Any):
+
+    """属性セレクターを登録します。
+
+    Parameters
+    ----------
+    selector : IAttributeSelector
+      登録する属性セレクターです。
+      `SUPPORTED_TYPES` に含まれる型のみ登録できます。
+    payload : Any
+      属性セレクターが一致した際に `match` が返す値です。
+    """
+
+    if type(selector) not in self.SUPPORTED_TYPES:
+      raise TypeError("Unsupported attribute selector: {:s}".format(repr(selector)))
+    group = self._groups.get(selector.name)
+    if group is None:
+      group = self._groups[selector.name] = _PatternGroup()
+    group.add(selector, payload)
+    self._size += 1
+
+  def match (self, attrs:dict[str, str]) -> list[Any]:
+
+    """属性の集合に一致した全ての属性セレクターに対応する値を返します。
+
+    Parameters
+    ----------
+    attrs : dict[str, str]
+      要素に設定された属性の集合です。
+
+    Returns
+    -------
+    list[Any]
+      一致した属性セレクターに対応する値のリストです。
+      値の順番は定められていません。
+    """
+
+    found = []
+    if len(self._groups) < len(attrs):
+      for name, group in self._groups.items():
+        if name in attrs:
+          group.match(attrs[name], found)
+    else:
+      for name, value in attrs.items():
+        group = self._groups.get(name)
+        if group is not None:
+          group.match(value, found)
+    return found
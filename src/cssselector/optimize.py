@@ -0,0 +1,125 @@
+
+from typing import Any, Iterable
+from .selector import ISelector, Selector_Element, Selector_Children, Selector_Son, Selector_NextSibling, Selector_SubsequentSibling, Selector_MatchAnywhere, Selector_Or, _has_sibling_combinator
+from .attribute_selector import IAttributeSelector, AttributeSelector_HasName, AttributeSelector_Equal, AttributeSelector_StartsWith, AttributeSelector_EndsWith, AttributeSelector_ContainsAnywhere, AttributeSelector_ContainsWithSeparator
+
+ATTRIBUTE_SELECTOR_COSTS:dict[type, int] = {
+  AttributeSelector_HasName: 0,
+  AttributeSelector_Equal: 1,
+  AttributeSelector_ContainsWithSeparator: 2,
+  AttributeSelector_StartsWith: 3,
+  AttributeSelector_EndsWith: 3,
+  AttributeSelector_ContainsAnywhere: 4,
+}
+
+_UNKNOWN_COST:int = max(ATTRIBUTE_SELECTOR_COSTS.values()) +1
+
+def _unique (items:Iterable[Any]) -> list[Any]:
+  result = []
+  seen = set()
+  for item in items:
+    try:
+      if item in seen:
+        continue
+      seen.add(item)
+    except TypeError:
+      if item in result:
+        continue
+    result.append(item)
+  return result
+
+def _optimize_attribute_selectors (attribute_selectors:Iterable[IAttributeSelector]) -> tuple[IAttributeSelector, ...]:
+  selectors = _unique(attribute_selectors)
+  #組み込みの属性セレクターは全て属性の存在を確認するため、同じ属性名に対する HasName は不要です
+  checked = {sel.name for sel in selectors if type(sel) in ATTRIBUTE_SELECTOR_COSTS and type(sel) is not AttributeSelector_HasName}
+  selectors = [sel for sel in selectors if not (type(sel) is AttributeSelector_HasName and sel.name in checked)]
+  return tuple(sorted(selectors, key=lambda sel: ATTRIBUTE_SELECTOR_COSTS.get(type(sel), _UNKNOWN_COST)))
+
+def _group_key (selector:ISelector) -> Any:
+  #兄弟結合子を含む選択肢を括り出すと flatten_selector で分解できなくなり、 StreamMatcher で判定できなくなります
+  if _has_sibling_combinator(selector):
+    return None
+  elif type(selector) is Selector_Son or type(selector) is Selector_Children:
+    try:
+      hash(selector.cur_selector)
+    except TypeError:
+      return None
+    return (type(selector), selector.cur_selector)
+  elif type(selector) is Selector_MatchAnywhere:
+    return (Selector_MatchAnywhere,)
+  else:
+    return None
+
+def _merge (selectors:list[ISelector]) -> ISelector:
+  branches = []
+  for sel in selectors:
+    if type(sel) is Selector_Or:
+      branches.extend(sel.selectors)
+    else:
+      branches.append(sel)
+  branches = _unique(branches)
+  groups = {}
+  for i, sel in enumerate(branches):
+    key = _group_key(sel)
+    groups.setdefault(i if key is None else key, []).append(sel)
+  factored = []
+  for group in groups.values():
+    head = group[0]
+    if len(group) == 1:
+      factored.append(head)
+    elif type(head) is Selector_MatchAnywhere:
+      factored.append(Selector_MatchAnywhere(_merge([sel.selector for sel in group])))
+    else:
+      factored.append(type(head)(head.cur_selector, _merge([sel.next_selector for sel in group])))
+  return factored[0] if len(factored) == 1 else Selector_Or(factored)
+
+def optimize_selector (selector:ISelector) -> ISelector:
+
+  """判定結果を変えずに、より少ない計算で判定できるようにセレクターの木構造を組み替えます。
+
+  次の変換を行います。
+
+  * 各複合セレクターの属性セレクターを、判定に要する計算量の見積もりが小さい順に並べ替えます
+    （ `ATTRIBUTE_SELECTOR_COSTS` を参照してください）。
+  * 重複した属性セレクターや、他の属性セレクターから判定結果が明らかな `[属性名]` を取り除きます。
+  * `Selector_Or` の選択肢から共通する先頭の部分を括り出します。
+    例えば `div p a, div p b` は `div p` に続けて `a` または `b` を判定する木構造になります。
+    兄弟結合子を含む選択肢は括り出さないため、 `StreamMatcher` や `extract` 関数でそのまま判定できます。
+
+  Notes
+  -----
+  括り出された木構造は `flatten_selector` で分解できないことがあります。
+  その場合 `RightToLeftMatcher` や `StreamMatcher` などは元の `match` による判定に切り替わります。
+  本関数は `match` ・ `DPMatcher` ・ `compile_selector` で判定するセレクターに用いてください。
+
+  Examples
+  --------
+  >>> optimize_selector(parse_selector('a[data-x*="foo"].hot')).selector.cur_selector.attribute_selectors
+  (AttributeSelector_ContainsWithSeparator(name='class', value='hot'), AttributeSelector_ContainsAnywhere(name='data-x', value='foo'))
+
+  Parameters
+  ----------
+  selector : ISelector
+    組み替えるセレクターです。
+    元のセレクターは変更されません。
+
+  Returns
+  -------
+  ISelector
+    組み替えられたセレクターです。
+    未知のノードはそのまま残されます。
+  """
+
+  if type(selector) is Selector_Element:
+    return Selector_Element(selector.tag, _optimize_attribute_selectors(selector.attribute_selectors), selector.pseudo_classes)
+  elif type(selector) in (Selector_Son, Selector_Children, Selector_NextSibling, Selector_SubsequentSibling):
+    return type(selector)(optimize_selector(selector.cur_selector), optimize_selector(selector.next_selector))
+  elif type(selector) is Selector_MatchAnywhere:
+    return Selector_MatchAnywhere(optimize_selector(selector.selector))
+  elif type(selector) is Selector_Or:
+    if selector.selectors:
+      return _merge([optimize_selector(sel) for sel in selector.selectors])
+    else:
+      return selector
+  else:
+    return selector
@@ -0,0 +1,125 @@
+
+import re
+import sys
+from typing import Iterable, NamedTuple, Self
+
+_WHITESPACE = re.compile("[ \t\n\f\r]+")
+
+def _split_whitespace (value:str) -> list[str]:
+  return [token for token in _WHITESPACE.split(value) if token]
+
+class PreparedAttributes (dict):
+
+  """判定に用いる情報を事前に計算した属性の集合です。
+
+  `dict` と同様に扱えるほか、空白文字で区切られた属性値のトークン集合を保持します。
+  `class` 属性のトークン集合は作成時に、その他の属性のトークン集合は初めて参照された時点で計算されます。
+  組み込みの属性セレクターは本クラスを検出し、属性値を分割し直さずにトークン集合を参照します。
+
+  Notes
+  -----
+  トークン集合は作成時の属性値をもとに計算されるため、作成後に内容を変更しないでください。
+
+  Attributes
+  ----------
+  id : str | None
+    `id` 属性の値です。存在しなければ `None` が設定されます。
+  classes : frozenset[str]
+    `class` 属性のトークン集合です。
+  """
+
+  __slots__ = ("id", "classes", "_tokens")
+
+  def __init__ (self, *args, **kwargs):
+    super().__init__(*args, **kwargs)
+    self.id = self.get("id")
+    self.classes = frozenset(_split_whitespace(self["class"])) if "class" in self else frozenset()
+    self._tokens = {"class": self.classes}
+
+  def tokens (self, name:str) -> frozenset[str]:
+
+    """空白文字で区切られた属性値のトークン集合を返します。
+
+    Parameters
+    ----------
+    name : str
+      参照する属性名です。
+      この属性は存在していなければなりません。
+
+    Returns
+    -------
+    frozenset[str]
+      属性値を HTML の空白文字で区切ったトークンの集合です。
+    """
+
+    tokens = self._tokens.get(name)
+    if tokens is None:
+      tokens = self._tokens[name] = frozenset(_split_whitespace(self[name]))
+    return tokens
+
+class PreparedElement (NamedTuple):
+
+  """判定に用いる情報を事前に計算したHTML要素を表現するクラスです。
+
+  `Element` と同じ形式をもつため、スタックの要素として `Element` の代わりに使えます。
+  `Selector_Element` は要素名の大文字・小文字を区別するため、要素名は変換せずに保持します。
+  大文字・小文字を区別せずに判定するには `SymbolTable` を用いてください。
+
+  Examples
+  --------
+  >>> element = PreparedElement.prepare("a", [("class", "x  y"), ("href", None)])
+  >>> element.tag
+  'a'
+  >>> sorted(element.classes)
+  ['x', 'y']
+
+  Attributes
+  ----------
+  tag : str
+    `sys.intern` で共有化した要素名です。
+  attrs : PreparedAttributes
+    要素に設定された属性の集合です。
+  """
+
+  tag:str
+  attrs:PreparedAttributes
+
+  @property
+  def id (self) -> str | None:
+
+    """`id` 属性の値です。"""
+
+    return self.attrs.id
+
+  @property
+  def classes (self) -> frozenset[str]:
+
+    """`class` 属性のトークン集合です。"""
+
+    return self.attrs.classes
+
+  @classmethod
+  def prepare (cls, tag:str, attrs:dict[str, str] | Iterable[tuple[str, str | None]]) -> Self:
+
+    """要素名と属性から自身のインスタンスを作成します。
+
+    Parameters
+    ----------
+    tag : str
+      要素名です。
+    attrs : dict[str, str] | Iterable[tuple[str, str | None]]
+      要素に設定された属性の集合です。
+      `html.parser.HTMLParser.handle_starttag` が受け取る形式のリストも指定できます。
+      その場合、値が `None` の属性は空文字列として扱われます。
+
+    Returns
+    -------
+    Self
+      作成されたインスタンスです。
+    """
+
+    if isinstance(attrs, dict):
+      prepared_attrs = PreparedAttributes(attrs)
+    else:
+      prepared_attrs = PreparedAttributes((name, "" if value is None else value) for name, value in attrs)
+    return cls(sys.intern(tag), prepared_attrs)
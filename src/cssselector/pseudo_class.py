@@ -0,0 +1,259 @@
+
+import re
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import Any, NamedTuple
+from .exception import ParseError, UndecidedError
+
+class SiblingCounter:
+
+  """同じ親をもつ兄弟要素の数を数えるクラスです。
+
+  兄弟要素は親ごとに1つのインスタンスを共有するため、後から兄弟要素が追加されると
+  既に作成された `ElementPosition` からも最新の数が参照できます。
+
+  Attributes
+  ----------
+  children : int
+    これまでに現れた兄弟要素の数です。
+  types : dict[str, int]
+    これまでに現れた兄弟要素の数を要素名ごとに数えた辞書です。
+  closed : bool
+    親要素が閉じられ、兄弟要素の数が確定したならば `True` です。
+  has : set[Any] | None
+    親要素に対して成立した `:has()` の条件の集合です。
+    条件が1つも成立していなければ `None` です。
+  descendants : set[Any] | None
+    `has` のうち子孫要素によって成立した条件の集合です。
+    親要素が閉じられると、親要素の `SiblingCounter` に引き継がれます。
+  """
+
+  __slots__ = ("children", "types", "closed", "has", "descendants")
+
+  def __init__ (self):
+    self.children = 0
+    self.types = {}
+    self.closed = False
+    self.has = None
+    self.descendants = None
+
+  def count (self, tag:str) -> "ElementPosition":
+
+    """兄弟要素を1つ追加し、その位置を返します。
+
+    Parameters
+    ----------
+    tag : str
+      追加する要素の要素名です。
+
+    Returns
+    -------
+    ElementPosition
+      追加した要素の位置です。
+    """
+
+    self.children += 1
+    type_index = self.types[tag] = self.types.get(tag, 0) +1
+    return ElementPosition(tag, self.children, type_index, self)
+
+class ElementPosition (NamedTuple):
+
+  """兄弟要素の中での要素の位置を表現するクラスです。
+
+  Attributes
+  ----------
+  tag : str
+    要素名です。
+  child_index : int
+    兄弟要素の中で何番目の要素かを表す1から始まる番号です。
+  type_index : int
+    同じ要素名の兄弟要素の中で何番目の要素かを表す1から始まる番号です。
+  counter : SiblingCounter
+    兄弟要素で共有される `SiblingCounter` です。
+  """
+
+  tag:str
+  child_index:int
+  type_index:int
+  counter:SiblingCounter
+
+def _position (element:Any) -> ElementPosition:
+  position = getattr(element, "position", None)
+  if position is None:
+    raise UndecidedError("Pseudo-classes require an element with its position: {:s}".format(repr(element)))
+  return position
+
+def _nth_match (a:int, b:int, n:int) -> bool:
+  if a == 0:
+    return n == b
+  else:
+    return (n - b) % a == 0 and (n - b) // a >= 0
+
+class IPseudoClass (ABC):
+
+  """疑似クラスを表現するインターフェイスです。"""
+
+  __slots__ = ()
+
+  @abstractmethod
+  def match (self, element_stack:list[Any], index:int) -> bool | None:
+
+    """スタックの指定位置の要素が自身の条件に一致するかを判定します。
+
+    Parameters
+    ----------
+    element_stack : list[Element]
+      HTMLの階層に見立てたスタックです。
+    index : int
+      判定する要素の位置です。
+
+    Returns
+    -------
+    bool | None
+      要素が条件に一致するならば `True` 一致しないならば `False` を返します。
+      後続の要素が現れるまで判定できないならば `None` を返します。
+
+    Raises
+    ------
+    UndecidedError
+      位置の情報が必要な疑似クラスに、位置をもたない要素が与えられた場合に送出されます。
+    """
+
+    pass
+
+@dataclass(frozen=True, slots=True)
+class PseudoClass_NthChild (IPseudoClass):
+
+  """先頭から数えた位置が `an+b` 番目ならば一致する疑似クラスです。
+
+  `:nth-child()` ・ `:first-child` ・ `:nth-of-type()` ・ `:first-of-type` を表します。
+
+  Parameters
+  ----------
+  a : int
+    `an+b` の `a` です。
+  b : int
+    `an+b` の `b` です。
+  of_type : bool
+    `True` ならば同じ要素名の兄弟要素のみを数えます。
+  """
+
+  a:int
+  b:int
+  of_type:bool=False
+
+  def match (self, element_stack:list[Any], index:int) -> bool | None:
+    position = _position(element_stack[index])
+    return _nth_match(self.a, self.b, position.type_index if self.of_type else position.child_index)
+
+@dataclass(frozen=True, slots=True)
+class PseudoClass_NthLastChild (IPseudoClass):
+
+  """末尾から数えた位置が `an+b` 番目ならば一致する疑似クラスです。
+
+  `:nth-last-child()` ・ `:last-child` ・ `:nth-last-of-type()` ・ `:last-of-type` を表します。
+  末尾からの位置は親要素が閉じられるまで確定しませんが、
+  `a` が0以下で一致する位置に上限がある場合は、その数を超える兄弟要素が現れた時点で不一致と判定できます。
+
+  Parameters
+  ----------
+  a : int
+    `an+b` の `a` です。
+  b : int
+    `an+b` の `b` です。
+  of_type : bool
+    `True` ならば同じ要素名の兄弟要素のみを数えます。
+  """
+
+  a:int
+  b:int
+  of_type:bool=False
+
+  def match (self, element_stack:list[Any], index:int) -> bool | None:
+    position = _position(element_stack[index])
+    counter = position.counter
+    if self.of_type:
+      current, total = position.type_index, counter.types[position.tag]
+    else:
+      current, total = position.child_index, counter.children
+    #これまでに現れた兄弟要素の数から求めた末尾からの位置の下限です
+    n = total - current +1
+    if counter.closed:
+      return _nth_match(self.a, self.b, n)
+    elif self.a <= 0 and n > self.b:
+      return False
+    else:
+      return None
+
+_NTH_PATTERN = re.compile(r"\s*(?:(?P<a>[+-]?\d*)n\s*(?:(?P<sign>[+-])\s*(?P<offset>\d+))?|(?P<b>[+-]?\d+))\s*")
+
+def _parse_nth (source:str, start:int, end:int) -> tuple[int, int]:
+  text = source[start:end].strip().lower()
+  if text == "odd":
+    return 2, 1
+  elif text == "even":
+    return 2, 0
+  matched = _NTH_PATTERN.fullmatch(source, start, end)
+  if matched is None:
+    raise ParseError.at("Could not read an+b notation", (source, start))
+  elif matched["b"] is not None:
+    return 0, int(matched["b"])
+  a = matched["a"]
+  a = 1 if a in ("", "+") else -1 if a == "-" else int(a)
+  b = 0 if matched["offset"] is None else int(matched["offset"]) * (-1 if matched["sign"] == "-" else 1)
+  return a, b
+
+_PSEUDO_CLASSES:dict[str, tuple[IPseudoClass, ...]] = {
+  "first-child": (PseudoClass_NthChild(0, 1),),
+  "last-child": (PseudoClass_NthLastChild(0, 1),),
+  "only-child": (PseudoClass_NthChild(0, 1), PseudoClass_NthLastChild(0, 1)),
+  "first-of-type": (PseudoClass_NthChild(0, 1, True),),
+  "last-of-type": (PseudoClass_NthLastChild(0, 1, True),),
+  "only-of-type": (PseudoClass_NthChild(0, 1, True), PseudoClass_NthLastChild(0, 1, True)),
+}
+
+_NTH_PSEUDO_CLASSES:dict[str, tuple[type, bool]] = {
+  "nth-child": (PseudoClass_NthChild, False),
+  "nth-last-child": (PseudoClass_NthLastChild, False),
+  "nth-of-type": (PseudoClass_NthChild, True),
+  "nth-last-of-type": (PseudoClass_NthLastChild, True),
+}
+
+_NAME_CHARS:set[str] = set("abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ-")
+
+def parse_pseudo_class (source:str, index:int, end:int) -> tuple[tuple[IPseudoClass, ...], int]:
+
+  """`:` で始まる疑似クラスを読み込みます。
+
+  Parameters
+  ----------
+  source : str
+    解析するコードが記述された文字列です。
+  index : int
+    `:` の位置です。
+  end : int
+    解析を終了する位置です。
+
+  Returns
+  -------
+  tuple[tuple[IPseudoClass, ...], int]
+    読み込んだ疑似クラスのタプルと、疑似クラスの直後の位置の組です。
+    `:only-child` のように、1つの疑似クラスが複数の条件に分解されることがあります。
+  """
+
+  start = index +1
+  index = start
+  while index < end and source[index] in _NAME_CHARS:
+    index += 1
+  name = source[start:index].lower()
+  if name in _PSEUDO_CLASSES:
+    return _PSEUDO_CLASSES[name], index
+  elif name in _NTH_PSEUDO_CLASSES and source.startswith("(", index):
+    close = source.find(")", index, end)
+    if close < 0:
+      raise ParseError.at("Could not find the end of pseudo-class", (source, index))
+    cls, of_type = _NTH_PSEUDO_CLASSES[name]
+    a, b = _parse_nth(source, index +1, close)
+    return (cls(a, b, of_type),), close +1
+  else:
+    raise ParseError.at("Read unsupported pseudo-class: {:s}".format(repr(":" + name)), (source, start))
@@ -0,0 +1,73 @@
+
+from dataclasses import dataclass, field
+from .selector import Element, ISelector, Selector_Son, _reject_sibling_combinators
+from .chain import Chain, flatten_selector
+
+def _match_chain (chain:Chain, element_stack:list[Element], match_anywhere:bool, match_children:bool) -> bool:
+  compounds, combinators = chain
+  if not match_children:
+    if not element_stack or not compounds[-1].match(element_stack, len(element_stack) -1):
+      return False
+  failed = set()
+  exhausted = {}
+
+  def match_at (m:int, pos:int) -> bool:
+    if (m, pos) in failed:
+      return False
+    if compounds[m].match(element_stack, pos):
+      if m == 0:
+        if match_anywhere or pos == 0:
+          return True
+      elif combinators[m -1] is Selector_Son:
+        if 0 < pos and match_at(m -1, pos -1):
+          return True
+      elif exhausted.get(m -1, 0) < pos:
+        if any(match_at(m -1, i) for i in range(pos -1, -1, -1)):
+          return True
+        exhausted[m -1] = pos
+    failed.add((m, pos))
+    return False
+
+  last = len(compounds) -1
+  if match_children:
+    return any(match_at(last, i) for i in range(len(element_stack) -1, -1, -1))
+  else:
+    return match_at(last, len(element_stack) -1)
+
+@dataclass
+class RightToLeftMatcher (ISelector):
+
+  """ブラウザと同様に右から左へ向かって判定を行うセレクターです。
+
+  最も右の複合セレクターをスタックの終端の要素と比較し、一致しなければ直ちに判定を終えます。
+  一致した場合に限り、祖先の要素に向かって結合子の条件を検証します。
+  判定結果は包んでいるセレクターの `match` と常に一致します。
+
+  Notes
+  -----
+  `parse_selector` 関数が作成する形式ではない木構造が与えられたならば、包んでいるセレクターの `match` で判定します。
+
+  Attributes
+  ----------
+  selector : ISelector
+    評価するセレクターです。
+    通常は `parse_selector` 関数によって作成されたインスタンスを指定します。
+
+  Raises
+  ------
+  ValueError
+    兄弟結合子を含むセレクターが与えられた場合に送出されます。
+  """
+
+  selector:ISelector
+  chains:list[Chain] | None = field(init=False, repr=False, compare=False)
+
+  def __post_init__ (self):
+    _reject_sibling_combinators(self.selector, "RightToLeftMatcher")
+    self.chains = flatten_selector(self.selector)
+
+  def match (self, element_stack:list[Element], index:int=0, *, match_anywhere:bool=True, match_children:bool=False) -> bool:
+    if self.chains is None:
+      return self.selector.match(element_stack, index, match_anywhere=match_anywhere, match_children=match_children)
+    else:
+      return any(_match_chain(chain, element_stack, match_anywhere, match_children) for chain in self.chains)
@@ -0,0 +1,363 @@
+
+import gc
+import sys
+import json
+import mmap
+import zlib
+import struct
+from array import array
+from typing import Any, Iterable
+from .exception import RulePackError
+from .selector import ISelector, PseudoClass_Is, PseudoClass_Not, PseudoClass_Has, Selector_Element, Selector_Children, Selector_Son, Selector_NextSibling, Selector_SubsequentSibling, Selector_MatchAnywhere, Selector_MatchLast, Selector_Or
+from .pseudo_class import PseudoClass_NthChild, PseudoClass_NthLastChild
+from .attribute_selector import AttributeSelector_HasName, AttributeSelector_Equal, AttributeSelector_StartsWith, AttributeSelector_EndsWith, AttributeSelector_ContainsAnywhere, AttributeSelector_ContainsWithSeparator
+
+MAGIC:bytes = b"CSSRPACK"
+FORMAT_VERSION:tuple[int, int] = (1, 3)
+
+#ヘッダー: マジックナンバー・メジャーバージョン・マイナーバージョン・本体の CRC32・本体のバイト数
+_HEADER = struct.Struct("<8sHHIQ")
+#本体の先頭: 文字列の数・ノードの数・ノードの語数・規則の数・文字列のバイト数
+_COUNTS = 5
+
+_OP_ELEMENT = 1
+_OP_CHILDREN = 2
+_OP_SON = 3
+_OP_MATCH_ANYWHERE = 4
+_OP_MATCH_LAST = 5
+_OP_OR = 6
+_OP_NEXT_SIBLING = 7
+_OP_SUBSEQUENT_SIBLING = 8
+_OP_POSITIONED_ELEMENT = 9
+
+_COMBINATOR_OPCODES:dict[type, int] = {
+  Selector_Children: _OP_CHILDREN,
+  Selector_Son: _OP_SON,
+  Selector_NextSibling: _OP_NEXT_SIBLING,
+  Selector_SubsequentSibling: _OP_SUBSEQUENT_SIBLING,
+}
+
+_COMBINATOR_TYPES:dict[int, type] = {opcode: cls for cls, opcode in _COMBINATOR_OPCODES.items()}
+
+_ATTRIBUTE_OPCODES:dict[type, int] = {
+  AttributeSelector_HasName: 16,
+  AttributeSelector_Equal: 17,
+  AttributeSelector_StartsWith: 18,
+  AttributeSelector_EndsWith: 19,
+  AttributeSelector_ContainsAnywhere: 20,
+  AttributeSelector_ContainsWithSeparator: 21,
+}
+
+_ATTRIBUTE_TYPES:dict[int, type] = {opcode: cls for cls, opcode in _ATTRIBUTE_OPCODES.items()}
+
+_PSEUDO_CLASS_OPCODES:dict[type, int] = {
+  PseudoClass_NthChild: 32,
+  PseudoClass_NthLastChild: 33,
+}
+
+_OP_IS = 34
+_OP_NOT = 35
+_OP_HAS = 36
+
+_PSEUDO_CLASS_TYPES:dict[int, type] = {opcode: cls for cls, opcode in _PSEUDO_CLASS_OPCODES.items()}
+
+#符号付き整数を符号なしの語に格納するための ZigZag 符号化です
+def _zigzag (value:int) -> int:
+  return value * 2 if value >= 0 else -value * 2 -1
+
+def _unzigzag (value:int) -> int:
+  return value // 2 if value % 2 == 0 else -(value +1) // 2
+
+def _words (values:array) -> bytes:
+  if sys.byteorder != "little":
+    values = array("I", values)
+    values.byteswap()
+  return values.tobytes()
+
+class _Writer:
+
+  def __init__ (self):
+    self.strings = {}
+    self.nodes = {}
+    self.words = array("I")
+
+  def string (self, value:str) -> int:
+    index = self.strings.get(value)
+    if index is None:
+      index = self.strings[value] = len(self.strings)
+    return index
+
+  def node (self, node:Any) -> int:
+    index = self.nodes.get(node)
+    if index is not None:
+      return index
+    words = self.words
+    if type(node) is Selector_Element:
+      attributes = [self.node(sel) for sel in node.attribute_selectors]
+      if node.pseudo_classes:
+        pseudo_classes = [self.node(sel) for sel in node.pseudo_classes]
+        words.extend((_OP_POSITIONED_ELEMENT, self.string(node.tag), len(attributes)))
+        words.extend(attributes)
+        words.append(len(pseudo_classes))
+        words.extend(pseudo_classes)
+      else:
+        words.extend((_OP_ELEMENT, self.string(node.tag), len(attributes)))
+        words.extend(attributes)
+    elif type(node) in _COMBINATOR_OPCODES:
+      cur_index = self.node(node.cur_selector)
+      next_index = self.node(node.next_selector)
+      words.extend((_COMBINATOR_OPCODES[type(node)], cur_index, next_index))
+    elif type(node) is Selector_MatchAnywhere:
+      words.extend((_OP_MATCH_ANYWHERE, self.node(node.selector)))
+    elif type(node) is Selector_MatchLast:
+      words.append(_OP_MATCH_LAST)
+    elif type(node) is Selector_Or:
+      children = [self.node(sel) for sel in node.selectors]
+      words.extend((_OP_OR, len(children)))
+      words.extend(children)
+    elif type(node) is PseudoClass_Is or type(node) is PseudoClass_Not:
+      selectors = [self.node(sel) for sel in node.selectors]
+      words.extend((_OP_IS if type(node) is PseudoClass_Is else _OP_NOT, len(selectors)))
+      words.extend(selectors)
+    elif type(node) is PseudoClass_Has:
+      children = [self.node(sel) for sel in node.children]
+      descendants = [self.node(sel) for sel in node.descendants]
+      words.extend((_OP_HAS, len(children)))
+      words.extend(children)
+      words.append(len(descendants))
+      words.extend(descendants)
+    elif type(node) in _PSEUDO_CLASS_OPCODES:
+      words.extend((_PSEUDO_CLASS_OPCODES[type(node)], _zigzag(node.a), _zigzag(node.b), int(node.of_type)))
+    elif type(node) in _ATTRIBUTE_OPCODES:
+      if type(node) is AttributeSelector_HasName:
+        words.extend((_ATTRIBUTE_OPCODES[type(node)], self.string(node.name)))
+      else:
+        words.extend((_ATTRIBUTE_OPCODES[type(node)], self.string(node.name), self.string(node.value)))
+    else:
+      raise RulePackError("Could not serialize an unsupported node: {:s}".format(repr(node)))
+    index = self.nodes[node] = len(self.nodes)
+    return index
+
+def dumps_rule_pack (rules:Iterable[tuple[ISelector, Any]]) -> bytes:
+
+  """セレクターと値の組の列を規則パックのバイト列に変換します。
+
+  Parameters
+  ----------
+  rules : Iterable[tuple[ISelector, Any]]
+    セレクターと値の組の列です。
+    値は `json.dumps` で変換できなければなりません。
+
+  Returns
+  -------
+  bytes
+    規則パックのバイト列です。
+  """
+
+  writer = _Writer()
+  rule_words = array("I")
+  for selector, payload in rules:
+    rule_words.append(writer.node(selector))
+    rule_words.append(writer.string(json.dumps(payload, ensure_ascii=False, separators=(",", ":"))))
+  blobs = [value.encode("utf-8") for value in writer.strings]
+  offsets = array("I", [0])
+  for blob in blobs:
+    offsets.append(offsets[-1] + len(blob))
+  counts = array("I", [len(blobs), len(writer.nodes), len(writer.words), len(rule_words) // 2, offsets[-1]])
+  body = b"".join([_words(counts), _words(offsets), _words(writer.words), _words(rule_words), *blobs])
+  return _HEADER.pack(MAGIC, *FORMAT_VERSION, zlib.crc32(body), len(body)) + body
+
+def _read_nodes (words:list[int], strings:list[str], count:int) -> list[Any]:
+  nodes = []
+  append = nodes.append
+  pos = 0
+  try:
+    for _ in range(count):
+      op = words[pos]
+      if op == _OP_ELEMENT:
+        size = words[pos +2]
+        append(Selector_Element(strings[words[pos +1]], tuple([nodes[i] for i in words[pos +3:pos +3 +size]])))
+        pos += 3 + size
+      elif op == _OP_POSITIONED_ELEMENT:
+        tag = strings[words[pos +1]]
+        size = words[pos +2]
+        attributes = tuple([nodes[i] for i in words[pos +3:pos +3 +size]])
+        pos += 3 + size
+        size = words[pos]
+        append(Selector_Element(tag, attributes, tuple([nodes[i] for i in words[pos +1:pos +1 +size]])))
+        pos += 1 + size
+      elif op == _OP_IS or op == _OP_NOT:
+        size = words[pos +1]
+        append((PseudoClass_Is if op == _OP_IS else PseudoClass_Not)(tuple([nodes[i] for i in words[pos +2:pos +2 +size]])))
+        pos += 2 + size
+      elif op == _OP_HAS:
+        size = words[pos +1]
+        children = tuple([nodes[i] for i in words[pos +2:pos +2 +size]])
+        pos += 2 + size
+        size = words[pos]
+        append(PseudoClass_Has(children, tuple([nodes[i] for i in words[pos +1:pos +1 +size]])))
+        pos += 1 + size
+      elif op in _PSEUDO_CLASS_TYPES:
+        append(_PSEUDO_CLASS_TYPES[op](_unzigzag(words[pos +1]), _unzigzag(words[pos +2]), bool(words[pos +3])))
+        pos += 4
+      elif op in _COMBINATOR_TYPES:
+        append(_COMBINATOR_TYPES[op](nodes[words[pos +1]], nodes[words[pos +2]]))
+        pos += 3
+      elif op == _OP_MATCH_ANYWHERE:
+        append(Selector_MatchAnywhere(nodes[words[pos +1]]))
+        pos += 2
+      elif op == _OP_MATCH_LAST:
+        append(Selector_MatchLast())
+        pos += 1
+      elif op == _OP_OR:
+        size = words[pos +1]
+        append(Selector_Or(tuple([nodes[i] for i in words[pos +2:pos +2 +size]])))
+        pos += 2 + size
+      elif op == _ATTRIBUTE_OPCODES[AttributeSelector_HasName]:
+        append(AttributeSelector_HasName(strings[words[pos +1]]))
+        pos += 2
+      elif op in _ATTRIBUTE_TYPES:
+        append(_ATTRIBUTE_TYPES[op](strings[words[pos +1]], strings[words[pos +2]]))
+        pos += 3
+      else:
+        raise RulePackError("Read an unknown opcode {:d} at word {:d}.".format(op, pos))
+  except IndexError:
+    raise RulePackError("Node table is broken at word {:d}.".format(pos)) from None
+  if pos != len(words):
+    raise RulePackError("Node table has {:d} trailing words.".format(len(words) - pos))
+  return nodes
+
+def _decode_payload (source:str, payloads:dict[str, Any]) -> Any:
+  payload = payloads.get(source, payloads)
+  if payload is payloads:
+    payload = json.loads(source)
+    if payload is None or type(payload) in (str, int, float, bool):
+      payloads[source] = payload
+  return payload
+
+def loads_rule_pack (data:bytes | bytearray | memoryview | mmap.mmap) -> list[tuple[ISelector, Any]]:
+
+  """規則パックのバイト列からセレクターと値の組のリストを復元します。
+
+  Parameters
+  ----------
+  data : bytes | bytearray | memoryview | mmap.mmap
+    規則パックのバイト列です。
+
+  Returns
+  -------
+  list[tuple[ISelector, Any]]
+    保存された順番に並べたセレクターと値の組のリストです。
+    同じ構造の部分木は1つのインスタンスに共有されます。
+
+  Raises
+  ------
+  RulePackError
+    マジックナンバー・バージョン・チェックサムのいずれかが正しくない場合や、内容が壊れている場合に送出されます。
+  """
+
+  #復元するオブジェクトは循環参照をもたないため、大量のオブジェクトを作成する間は循環参照の検出を止めます
+  enabled = gc.isenabled()
+  gc.disable()
+  try:
+    return _loads(data)
+  finally:
+    if enabled:
+      gc.enable()
+
+def _loads (data:bytes | bytearray | memoryview | mmap.mmap) -> list[tuple[ISelector, Any]]:
+  payloads = {}
+  with memoryview(data) as view:
+    if len(view) < _HEADER.size:
+      raise RulePackError("Rule pack is too short: {:d} bytes.".format(len(view)))
+    magic, major, minor, checksum, body_size = _HEADER.unpack_from(view)
+    if magic != MAGIC:
+      raise RulePackError("Not a rule pack: {:s}".format(repr(magic)))
+    if major != FORMAT_VERSION[0]:
+      raise RulePackError("Unsupported rule pack version: {:d}.{:d}".format(major, minor))
+    body = view[_HEADER.size:_HEADER.size +body_size]
+    with body:
+      if len(body) != body_size or zlib.crc32(body) != checksum:
+        raise RulePackError("Rule pack checksum mismatch.")
+      if body_size < _COUNTS * 4:
+        raise RulePackError("Rule pack is too short: {:d} bytes.".format(body_size))
+      string_count, node_count, node_size, rule_count, blob_size = struct.unpack_from("<5I", body)
+      word_count = _COUNTS + (string_count +1) + node_size + rule_count * 2
+      if word_count * 4 + blob_size != body_size:
+        raise RulePackError("Rule pack sections do not match its size.")
+      with body[:word_count * 4] as raw:
+        if sys.byteorder == "little":
+          words = raw.cast("I")
+        else:
+          words = array("I", raw.tobytes())
+          words.byteswap()
+        try:
+          offsets = words[_COUNTS:_COUNTS + string_count +1].tolist()
+          blob = bytes(body[word_count * 4:])
+          strings = [blob[offsets[i]:offsets[i +1]].decode("utf-8") for i in range(string_count)]
+          start = _COUNTS + string_count +1
+          nodes = _read_nodes(words[start:start +node_size].tolist(), strings, node_count)
+          start += node_size
+          rule_words = words[start:start +rule_count * 2].tolist()
+        finally:
+          if isinstance(words, memoryview):
+            words.release()
+  try:
+    return [(nodes[rule_words[i]], _decode_payload(strings[rule_words[i +1]], payloads)) for i in range(0, len(rule_words), 2)]
+  except (IndexError, ValueError) as error:
+    raise RulePackError("Rule table is broken: {:s}".format(str(error))) from None
+
+def save_rule_pack (path:str, rules:Iterable[tuple[ISelector, Any]]):
+
+  """セレクターと値の組の列を規則パックのファイルに保存します。
+
+  規則パックは `MAGIC` で始まり、 `FORMAT_VERSION` と本体の CRC32 をヘッダーにもつバイナリ形式です。
+  本体には文字列の表と、子を親より先に並べたノードの命令列が格納されます。
+  同じ構造の部分木は1つのノードにまとめて保存されます。
+  形式はメジャーバージョンが同じ間は互換性が保たれます。
+
+  Examples
+  --------
+  >>> save_rule_pack("rules.pack", [(parse_selector("p > a"), "link")])
+  >>> selector_set = SelectorSet(load_rule_pack("rules.pack"))
+
+  Parameters
+  ----------
+  path : str
+    保存先のパスです。
+  rules : Iterable[tuple[ISelector, Any]]
+    セレクターと値の組の列です。
+    値は `json.dumps` で変換できなければなりません。
+  """
+
+  data = dumps_rule_pack(rules)
+  with open(path, "wb") as file:
+    file.write(data)
+
+def load_rule_pack (path:str) -> list[tuple[ISelector, Any]]:
+
+  """規則パックのファイルを `mmap` で読み込み、セレクターと値の組のリストを復元します。
+
+  Parameters
+  ----------
+  path : str
+    読み込むファイルのパスです。
+
+  Returns
+  -------
+  list[tuple[ISelector, Any]]
+    保存された順番に並べたセレクターと値の組のリストです。
+
+  Raises
+  ------
+  RulePackError
+    ファイルが規則パックとして正しくない場合に送出されます。
+  """
+
+  with open(path, "rb") as file:
+    try:
+      mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+    except ValueError:
+      raise RulePackError("Rule pack is empty: {:s}".format(repr(path))) from None
+    with mapped:
+      return loads_rule_pack(mapped)
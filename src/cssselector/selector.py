@@ -1,10 +1,15 @@
 
+import re
 import string
+import dataclasses
 from abc import ABC, abstractmethod
 from typing import NamedTuple, Self, Type
 from dataclasses import dataclass
-from .exception import ParseError
+from .exception import ParseError, UndecidedError
+from .interning import SelectorInternTable
+from .symbols import SymbolTable
 from .attribute_selector import IAttributeSelector, AttributeSelector_Equal, AttributeSelector_ContainsWithSeparator, parse_attribute_selector
+from .pseudo_class import IPseudoClass, PseudoClass_NthLastChild, ElementPosition, SiblingCounter, parse_pseudo_class
 
 class Element (NamedTuple):
 
@@ -21,10 +26,38 @@ class Element (NamedTuple):
   tag:str
   attrs:dict[str, str]
 
+class PositionedElement (Element):
+
+  """兄弟要素の中での位置をもつHTML要素を表現するクラスです。
+
+  `Element` と同じく要素名と属性の組として扱えるうえ、疑似クラスの判定に用いる位置を属性 `position` にもちます。
+  `StreamMatcher` などの逐次処理でのみ作成されます。
+
+  Attributes
+  ----------
+  tag : str
+    要素名です。
+  attrs : dict[str, str]
+    要素に設定された属性の集合です。
+  position : ElementPosition
+    兄弟要素の中での要素の位置です。
+  children : SiblingCounter
+    子要素を数える `SiblingCounter` です。
+    `:has()` の判定に用いられます。
+  """
+
+  def __new__ (cls, tag:str, attrs:dict[str, str], position:ElementPosition, children:SiblingCounter):
+    self = super().__new__(cls, tag, attrs)
+    self.position = position
+    self.children = children
+    return self
+
 class ISelector (ABC):
 
   """セレクターを表現するインターフェイスです。"""
 
+  __slots__ = ()
+
   @abstractmethod
   def match (self, element_stack:list[Element], index:int=0, *, match_anywhere:bool=True, match_children:bool=False) -> bool:
 
@@ -47,6 +80,12 @@ class ISelector (ABC):
     -------
     bool
       スタックが条件に一致したならば `True` そうでなければ `False` を返します。
+
+    Raises
+    ------
+    ValueError
+      兄弟結合子（ `Selector_NextSibling` と `Selector_SubsequentSibling` ）の判定に達した場合に送出されます。
+      スタックは兄弟要素の情報をもたないためです。
     """
 
     pass
@@ -80,7 +119,7 @@ class IGeneratableFromStack (ABC):
 
     pass
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class Selector_Element (ISelector):
 
   """複合セレクターを表現します。
@@ -90,24 +129,49 @@ class Selector_Element (ISelector):
   tag : str
     一致させるタグ名です。
     空文字列が指定されたならば全てのタグ名に一致します。
-  attribute_selectors : list[IAttributeSelector]
-    一致させる属性セレクターのリストです。
+  attribute_selectors : tuple[IAttributeSelector, ...]
+    一致させる属性セレクターのタプルです。
+    リストが指定されたならばタプルに変換されます。
+  pseudo_classes : tuple[IPseudoClass, ...]
+    一致させる疑似クラスのタプルです。
+    リストが指定されたならばタプルに変換されます。
+
+  Raises
+  ------
+  UndecidedError
+    疑似クラスをもつ場合に、要素が位置をもたないか、後続の兄弟要素が現れるまで判定できないならば `match` が送出します。
   """
 
   tag:str
-  attribute_selectors:list[IAttributeSelector]
+  attribute_selectors:tuple[IAttributeSelector, ...]
+  pseudo_classes:tuple[IPseudoClass, ...] = ()
+
+  def __post_init__ (self):
+    if type(self.attribute_selectors) is not tuple:
+      object.__setattr__(self, "attribute_selectors", tuple(self.attribute_selectors))
+    if type(self.pseudo_classes) is not tuple:
+      object.__setattr__(self, "pseudo_classes", tuple(self.pseudo_classes))
 
   def match (self, element_stack:list[Element], index:int=0, *, match_anywhere:bool=True, match_children:bool=False) -> bool:
     if index < len(element_stack):
-      tag, attributes = element_stack[index]
-      return (
+      element = element_stack[index]
+      tag, attributes = element
+      if not (
         (not self.tag or self.tag == tag) and 
         all((sel.match(attributes) for sel in self.attribute_selectors))
-      )
+      ):
+        return False
+      elif self.pseudo_classes:
+        matched = _match_pseudo_classes(self.pseudo_classes, element_stack, index)
+        if matched is None:
+          raise UndecidedError("Pseudo-classes can not be decided until following elements appear: {:s}".format(repr(element)))
+        return matched
+      else:
+        return True
     else:
       return False
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class Selector_Children (ISelector, IGeneratableFromStack):
 
   """子孫結合子を表現します。
@@ -135,7 +199,7 @@ class Selector_Children (ISelector, IGeneratableFromStack):
     cur_selector = selector_stack.pop()
     return cls(cur_selector, next_selector)
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class Selector_Son (ISelector, IGeneratableFromStack):
 
   """子結合子を表現します。
@@ -163,7 +227,67 @@ class Selector_Son (ISelector, IGeneratableFromStack):
     cur_selector = selector_stack.pop()
     return cls(cur_selector, next_selector)
 
-@dataclass
+@dataclass(frozen=True, slots=True)
+class Selector_NextSibling (ISelector, IGeneratableFromStack):
+
+  """隣接兄弟結合子（ `A + B` ）を表現します。
+
+  Notes
+  -----
+  スタックは兄弟要素の情報をもたないため、 `match` は `ValueError` を送出します。
+  本結合子を含むセレクターは `StreamMatcher` や `extract` 関数で判定してください。
+
+  Attributes
+  ----------
+  cur_selector : ISelector
+    直前の兄弟要素を表すセレクターです。
+  next_selector : ISelector
+    判定対象の要素を表すセレクターです。
+  """
+
+  cur_selector:ISelector
+  next_selector:ISelector
+
+  def match (self, element_stack:list[Element], index:int=0, *, match_anywhere:bool=True, match_children:bool=False) -> bool:
+    raise ValueError("Sibling combinators can not be matched against an element stack; use StreamMatcher or extract instead.")
+
+  @classmethod
+  def from_stack (cls, selector_stack:list[ISelector]) -> Self:
+    next_selector = selector_stack.pop()
+    cur_selector = selector_stack.pop()
+    return cls(cur_selector, next_selector)
+
+@dataclass(frozen=True, slots=True)
+class Selector_SubsequentSibling (ISelector, IGeneratableFromStack):
+
+  """一般兄弟結合子（ `A ~ B` ）を表現します。
+
+  Notes
+  -----
+  スタックは兄弟要素の情報をもたないため、 `match` は `ValueError` を送出します。
+  本結合子を含むセレクターは `StreamMatcher` や `extract` 関数で判定してください。
+
+  Attributes
+  ----------
+  cur_selector : ISelector
+    先行する兄弟要素を表すセレクターです。
+  next_selector : ISelector
+    判定対象の要素を表すセレクターです。
+  """
+
+  cur_selector:ISelector
+  next_selector:ISelector
+
+  def match (self, element_stack:list[Element], index:int=0, *, match_anywhere:bool=True, match_children:bool=False) -> bool:
+    raise ValueError("Sibling combinators can not be matched against an element stack; use StreamMatcher or extract instead.")
+
+  @classmethod
+  def from_stack (cls, selector_stack:list[ISelector]) -> Self:
+    next_selector = selector_stack.pop()
+    cur_selector = selector_stack.pop()
+    return cls(cur_selector, next_selector)
+
+@dataclass(frozen=True, slots=True)
 class Selector_MatchAnywhere (ISelector, IGeneratableFromStack):
 
   """引数 `match_anywhere` が有効ならば、任意の位置からの一致を検証します。
@@ -192,7 +316,7 @@ class Selector_MatchAnywhere (ISelector, IGeneratableFromStack):
     selector = selector_stack.pop()
     return cls(selector)
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class Selector_MatchLast (ISelector):
 
   """引数 `match_children` が有効ならば、引数 `element_stack` の終端に一致します。
@@ -208,24 +332,271 @@ class Selector_MatchLast (ISelector):
     else:
       return index == len(element_stack)
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class Selector_Or (ISelector):
 
   """...
 
   Attributes
   ----------
-  selectors : list[ISelector]
+  selectors : tuple[ISelector, ...]
     ...
   """
 
-  selectors:list[ISelector]
+  selectors:tuple[ISelector, ...]
+
+  def __post_init__ (self):
+    if type(self.selectors) is not tuple:
+      object.__setattr__(self, "selectors", tuple(self.selectors))
 
   def match (self, element_stack:list[Element], index:int=0, *, match_anywhere:bool=True, match_children:bool=False) -> bool:
     return any((sel.match(element_stack, index, match_anywhere=match_anywhere, match_children=match_children) for sel in self.selectors))
 
+def _match_pseudo_classes (pseudo_classes:tuple[IPseudoClass, ...], element_stack:list[Element], index:int) -> bool | None:
+  undecided = False
+  for sel in pseudo_classes:
+    matched = sel.match(element_stack, index)
+    if matched is None:
+      undecided = True
+    elif not matched:
+      return False
+  return None if undecided else True
+
+def _match_any (selectors:tuple[ISelector, ...], element_stack:list[Element], index:int) -> bool | None:
+  undecided = False
+  for sel in selectors:
+    try:
+      if type(sel) is Selector_Element:
+        matched = sel.match(element_stack, index)
+      else:
+        matched = sel.match(element_stack[:index +1], match_anywhere=True, match_children=False)
+    except UndecidedError:
+      undecided = True
+    else:
+      if matched:
+        return True
+  return None if undecided else False
+
+@dataclass(frozen=True, slots=True)
+class PseudoClass_Is (IPseudoClass):
+
+  """引数のセレクターリストのいずれかに一致すれば一致する疑似クラスです。
+
+  `:is()` と `:where()` を表します。
+
+  Parameters
+  ----------
+  selectors : tuple[ISelector, ...]
+    セレクターリストの各セレクターです。
+    複合セレクターのみからなるセレクターは `Selector_Element` として保持され、判定する要素のみを参照します。
+    それ以外のセレクターは判定する要素までのスタックに対して判定されます。
+  """
+
+  selectors:tuple[ISelector, ...]
+
+  def __post_init__ (self):
+    if type(self.selectors) is not tuple:
+      object.__setattr__(self, "selectors", tuple(self.selectors))
+
+  def match (self, element_stack:list[Element], index:int) -> bool | None:
+    return _match_any(self.selectors, element_stack, index)
+
+@dataclass(frozen=True, slots=True)
+class PseudoClass_Not (IPseudoClass):
+
+  """引数のセレクターリストのいずれにも一致しなければ一致する疑似クラスです。
+
+  `:not()` を表します。
+
+  Parameters
+  ----------
+  selectors : tuple[ISelector, ...]
+    セレクターリストの各セレクターです。
+    保持する形式は `PseudoClass_Is` と同じです。
+  """
+
+  selectors:tuple[ISelector, ...]
+
+  def __post_init__ (self):
+    if type(self.selectors) is not tuple:
+      object.__setattr__(self, "selectors", tuple(self.selectors))
+
+  def match (self, element_stack:list[Element], index:int) -> bool | None:
+    matched = _match_any(self.selectors, element_stack, index)
+    return None if matched is None else not matched
+
+@dataclass(frozen=True, slots=True)
+class PseudoClass_Has (IPseudoClass):
+
+  """指定された子要素または子孫要素をもつならば一致する疑似クラスです。
+
+  `:has(> A)` と `:has(A)` を表します。
+  子孫要素は要素が閉じられるまで確定しないため、条件を満たす要素が現れるまで判定は保留されます。
+  条件を満たす要素の記録は `StreamMatcher` などの逐次処理が `PositionedElement.children` に書き込みます。
+
+  Parameters
+  ----------
+  children : tuple[Selector_Element, ...]
+    子要素に一致させる複合セレクターのタプルです。
+  descendants : tuple[Selector_Element, ...]
+    子孫要素に一致させる複合セレクターのタプルです。
+  """
+
+  children:tuple[Selector_Element, ...]
+  descendants:tuple[Selector_Element, ...]
+
+  def __post_init__ (self):
+    if type(self.children) is not tuple:
+      object.__setattr__(self, "children", tuple(self.children))
+    if type(self.descendants) is not tuple:
+      object.__setattr__(self, "descendants", tuple(self.descendants))
+
+  def match (self, element_stack:list[Element], index:int) -> bool | None:
+    counter = getattr(element_stack[index], "children", None)
+    if counter is None:
+      raise UndecidedError(":has() requires an element with its children: {:s}".format(repr(element_stack[index])))
+    elif counter.has is not None and self in counter.has:
+      return True
+    elif counter.closed:
+      return False
+    else:
+      return None
+
 #parser
 
+def _collect_pseudo_classes (selector:ISelector, found:list[IPseudoClass]):
+  if type(selector) is Selector_Element:
+    for sel in selector.pseudo_classes:
+      found.append(sel)
+      if type(sel) is PseudoClass_Is or type(sel) is PseudoClass_Not:
+        for sub_selector in sel.selectors:
+          _collect_pseudo_classes(sub_selector, found)
+      elif type(sel) is PseudoClass_Has:
+        for sub_selector in sel.children + sel.descendants:
+          _collect_pseudo_classes(sub_selector, found)
+  elif dataclasses.is_dataclass(selector):
+    for field in dataclasses.fields(selector):
+      value = getattr(selector, field.name)
+      if isinstance(value, ISelector):
+        _collect_pseudo_classes(value, found)
+      elif isinstance(value, (tuple, list)):
+        for item in value:
+          if isinstance(item, ISelector):
+            _collect_pseudo_classes(item, found)
+
+def _pseudo_classes (selector:ISelector) -> list[IPseudoClass]:
+  found = []
+  _collect_pseudo_classes(selector, found)
+  return found
+
+def _find_close (source:str, start:int, end:int) -> int:
+  depth = 0
+  quote = None
+  for index in range(start, end):
+    char = source[index]
+    if quote is not None:
+      if char == quote:
+        quote = None
+    elif char == "\"" or char == "'":
+      quote = char
+    elif char == "(":
+      depth += 1
+    elif char == ")":
+      depth -= 1
+      if depth == 0:
+        return index
+  raise ParseError.at("Could not find the end of parentheses", (source, start))
+
+def _split_arguments (source:str, start:int, end:int) -> list[tuple[int, int]]:
+  arguments = []
+  depth = 0
+  quote = None
+  begin = start
+  for index in range(start, end):
+    char = source[index]
+    if quote is not None:
+      if char == quote:
+        quote = None
+    elif char == "\"" or char == "'":
+      quote = char
+    elif char == "(":
+      depth += 1
+    elif char == ")":
+      depth -= 1
+    elif char == "," and depth == 0:
+      arguments.append((begin, index))
+      begin = index +1
+  arguments.append((begin, end))
+  return arguments
+
+def _single_compound (selector:ISelector) -> Selector_Element | None:
+  if type(selector) is Selector_MatchAnywhere and type(selector.selector) is Selector_Son:
+    son = selector.selector
+    if type(son.cur_selector) is Selector_Element and type(son.next_selector) is Selector_MatchLast:
+      return son.cur_selector
+  return None
+
+def _has_sibling_combinator (selector:ISelector) -> bool:
+  if type(selector) is Selector_Or:
+    return any(_has_sibling_combinator(sel) for sel in selector.selectors)
+  elif type(selector) is Selector_MatchAnywhere:
+    return _has_sibling_combinator(selector.selector)
+  elif type(selector) is Selector_NextSibling or type(selector) is Selector_SubsequentSibling:
+    return True
+  elif type(selector) is Selector_Son or type(selector) is Selector_Children:
+    return _has_sibling_combinator(selector.cur_selector) or _has_sibling_combinator(selector.next_selector)
+  else:
+    return False
+
+def _reject_sibling_combinators (selector:ISelector, owner:str):
+  #スタックのみで判定する実装は兄弟要素を参照できないため、判定の途中ではなく作成時に拒否します
+  if _has_sibling_combinator(selector):
+    raise ValueError("{:s} does not support sibling combinators; use StreamMatcher or extract instead.".format(owner))
+
+def _parse_argument (source:str, start:int, end:int) -> ISelector:
+  sel = parse_selector(source[start:end])
+  #兄弟要素はスタックに含まれないため、 :is() と :not() の引数では兄弟結合子を受け付けません
+  if _has_sibling_combinator(sel):
+    raise ParseError.at("Sibling combinators in :is() and :not() are not supported", (source, start))
+  compound = _single_compound(sel)
+  return sel if compound is None else compound
+
+def _parse_has_argument (source:str, children:list[Selector_Element], descendants:list[Selector_Element]):
+  text = source.strip()
+  if text.startswith(">"):
+    targets = children
+    text = text[1:]
+  elif text.startswith("+") or text.startswith("~"):
+    raise ParseError("Sibling combinators in :has() are not supported: {:s}".format(repr(source)))
+  else:
+    targets = descendants
+  compound = _single_compound(parse_selector(text))
+  if compound is None:
+    raise ParseError(":has() only supports a compound selector with an optional '>': {:s}".format(repr(source)))
+  for sel in _pseudo_classes(compound):
+    if type(sel) is PseudoClass_NthLastChild or type(sel) is PseudoClass_Has:
+      raise ParseError(":has() can not contain pseudo-classes which depend on following elements: {:s}".format(repr(source)))
+  targets.append(compound)
+
+_SELECTOR_PSEUDO_CLASS = re.compile(r":(is|where|not|has)\(", re.IGNORECASE)
+
+def _read_pseudo_class (source:str, index:int, end:int) -> tuple[tuple[IPseudoClass, ...], int]:
+  matched = _SELECTOR_PSEUDO_CLASS.match(source, index, end)
+  if matched is None:
+    return parse_pseudo_class(source, index, end)
+  name = matched[1].lower()
+  close = _find_close(source, matched.end() -1, end)
+  arguments = _split_arguments(source, matched.end(), close)
+  if name == "has":
+    children = []
+    descendants = []
+    for begin, stop in arguments:
+      _parse_has_argument(source[begin:stop], children, descendants)
+    return (PseudoClass_Has(children, descendants),), close +1
+  else:
+    selectors = [_parse_argument(source, begin, stop) for begin, stop in arguments]
+    return ((PseudoClass_Not if name == "not" else PseudoClass_Is)(selectors),), close +1
+
 _TAG_CHARS:set[str] = set(string.ascii_letters + string.digits + "-_")
 _TAG_START_CHARS:set[str] = set(string.ascii_letters)
 
@@ -234,12 +605,10 @@ def _read_tag (source:str, start:int, end:int) -> tuple[str, int]:
     if source[start] == "*":
       return "", start +1
     elif source[start] in _TAG_START_CHARS:
-      tmp = source[start]
       index = start +1
       while index < end and source[index] in _TAG_CHARS:
-        tmp += source[index]
         index += 1
-      return tmp, index
+      return source[start:index], index
     else:
       return "", start
   else:
@@ -251,26 +620,22 @@ _CLASS_AND_ID_START_CHARS:set[str] = set(string.ascii_letters)
 def _read_class_and_id (source:str, start:int, end:int) -> tuple[str, int]:
   if start < end:
     if source[start] in _CLASS_AND_ID_START_CHARS:
-      tmp = source[start]
       index = start +1
       while index < end and source[index] in _CLASS_AND_ID_CHARS:
-        tmp += source[index]
         index += 1
-      return tmp, index
+      return source[start:index], index
     else:
       raise ParseError.at("Read an invalid character to start of class, id identifier: {:s}".format(repr(source[start])), (source, start))
   else:
     raise ParseError.at("Reached end of data on parsing.", (source, start))
 
-_SEPARATOR_CHARS:set[str] = set(",> ")
+_SEPARATOR_CHARS:set[str] = set(",>+~ ")
 
 def _read_separator (source:str, start:int, end:int) -> tuple[str, int]:
-  tmp = ""
   index = start
   while index < end and source[index] in _SEPARATOR_CHARS:
-    tmp += source[index]
     index += 1
-  return tmp, index
+  return source[start:index], index
 
 def _strip (source:str) -> tuple[int, int]:
   start = 0
@@ -304,7 +669,7 @@ def _build (read_selector_stack:list[ISelector], combination_selector_type_stack
   else:
     raise ParseError.at("Argument `read_selector_stack` given an empty list.", source_and_pos)
 
-def parse_selector (source:str) -> ISelector:
+def parse_selector (source:str, *, intern_table:SelectorInternTable | None=None, symbol_table:SymbolTable | None=None) -> ISelector:
 
   """CSSセレクターが記述された文字列を受け取り、マッチング用のオブジェクトを作成します。
 
@@ -312,6 +677,12 @@ def parse_selector (source:str) -> ISelector:
   ----------
   source : str
     解析するコードが記述された文字列です。
+  intern_table : SelectorInternTable | None
+    構造の等しい部分木を共有させるための表です。
+    指定されたならば、作成された木構造のノードは表に登録済みのインスタンスに置き換えられます。
+  symbol_table : SymbolTable | None
+    要素名と属性名を共有された文字列に変換するための表です。
+    指定されたならば、要素名と属性名は小文字に正規化され、同じ表で作成したスタックの名前と同一性で比較できるようになります。
 
   Returns
   -------
@@ -328,21 +699,25 @@ def parse_selector (source:str) -> ISelector:
   while index < end:
     tag, index = _read_tag(source, index, end)
     attribute_selectors = []
+    pseudo_classes = []
     while index < end:
-      if source[index:].startswith("."):
+      if source.startswith(".", index):
         class_, index = _read_class_and_id(source, index +1, end)
         sel = AttributeSelector_ContainsWithSeparator("class", class_)
         attribute_selectors.append(sel)
-      elif source[index:].startswith("#"):
+      elif source.startswith("#", index):
         id_, index = _read_class_and_id(source, index +1, end)
         sel = AttributeSelector_Equal("id", id_)
         attribute_selectors.append(sel)
-      elif source[index:].startswith("["):
+      elif source.startswith("[", index):
         sel, index = parse_attribute_selector(source, index, end)
         attribute_selectors.append(sel)
+      elif source.startswith(":", index):
+        sels, index = _read_pseudo_class(source, index, end)
+        pseudo_classes.extend(sels)
       else:
         break
-    sel = Selector_Element(tag, attribute_selectors)
+    sel = Selector_Element(tag, attribute_selectors, pseudo_classes)
     read_sel_stack.append(sel)
     if index < end:
       separator, index = _read_separator(source, index, end)
@@ -351,9 +726,15 @@ def parse_selector (source:str) -> ISelector:
           comb_sel_type_stack.append(Selector_Children)
         case ">":
           comb_sel_type_stack.append(Selector_Son)
+        case "+":
+          comb_sel_type_stack.append(Selector_NextSibling)
+        case "~":
+          comb_sel_type_stack.append(Selector_SubsequentSibling)
         case ",":
           built_sel = _build(read_sel_stack, comb_sel_type_stack, (source, index))
           built_sels.append(built_sel)
+          read_sel_stack = []
+          comb_sel_type_stack = []
         case _:
           raise ParseError.at("Read unknown separator: {:s}".format(repr(separator)), (source, index))
     else:
@@ -362,9 +743,9 @@ def parse_selector (source:str) -> ISelector:
       break
   
   if built_sels:
-    if len(built_sels) == 1:
-      return built_sels[0]
-    else:
-      return Selector_Or(built_sels)
+    built_sel = built_sels[0] if len(built_sels) == 1 else Selector_Or(built_sels)
+    if symbol_table is not None:
+      built_sel = symbol_table.intern_selector(built_sel)
+    return intern_table.intern(built_sel) if intern_table is not None else built_sel
   else:
     raise ParseError("Could not build ISelector instance even once from source: {:s}".format(repr(source)))
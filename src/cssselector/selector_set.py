@@ -0,0 +1,210 @@
+
+from typing import Any, Iterable
+from .attribute_selector import AttributeSelector_Equal, AttributeSelector_ContainsWithSeparator
+from .prepared import PreparedAttributes, _split_whitespace
+from .selector import Element, ISelector, Selector_Element, Selector_NextSibling, Selector_SubsequentSibling, Selector_Or, _pseudo_classes
+from .chain import Chain, flatten_selector
+from .stream_matcher import StreamMatcher
+from .rtl_matcher import _match_chain
+from .multipattern import AttributePatternIndex
+from .ancestor_filter import AncestorFilter, chain_ancestor_features
+
+def _index_key (compound:Selector_Element) -> tuple[str, Any] | None:
+  class_key = None
+  pattern_key = None
+  for sel in compound.attribute_selectors:
+    if type(sel) is AttributeSelector_Equal and sel.name == "id":
+      return "id", sel.value
+    elif type(sel) is AttributeSelector_ContainsWithSeparator and sel.name == "class" and class_key is None:
+      class_key = "class", sel.value
+    elif type(sel) in AttributePatternIndex.SUPPORTED_TYPES and sel.value and pattern_key is None:
+      pattern_key = "pattern", sel
+  if class_key is not None:
+    return class_key
+  elif pattern_key is not None:
+    return pattern_key
+  elif compound.tag:
+    return "tag", compound.tag
+  else:
+    return None
+
+class SelectorSet:
+
+  """多数のセレクターをまとめて判定するためのクラスです。
+
+  各セレクターは最も右の複合セレクターがもつ ID・クラス名・部分一致などの属性セレクター・要素名のいずれかで分類されます。
+  `[属性名*="値"]` ・ `[属性名^="値"]` ・ `[属性名$="値"]` で分類されたセレクターは `AttributePatternIndex` にまとめられ、
+  属性値を1回走査するだけで候補が求まります。
+  判定時にはスタックの終端の要素がもつ特徴に対応する候補のみを検証するため、
+  計算量は登録されたセレクターの総数ではなく候補の数に比例します。
+  さらに `AncestorFilter` が与えられたならば、祖先要素に求める特徴が記録されていない候補はスタックをたどらずに除外されます。
+
+  Examples
+  --------
+  >>> selector_set = SelectorSet()
+  >>> selector_set.add(parse_selector("p > a"), "link")
+  >>> selector_set.add(parse_selector("#main .title"), "title")
+  >>> selector_set.match([("div", {"id": "main"}), ("h1", {"class": "title"})])
+  ['title']
+
+  Notes
+  -----
+  判定は `ISelector.match` の引数 `match_children` に `False` を指定した場合と同じ意味をもちます。
+  `parse_selector` 関数が作成する形式ではない木構造は分類できないため、常に `ISelector.match` で検証されます。
+  兄弟結合子を含むセレクターはスタックのみでは判定できないため、 `sibling_matcher` が作成する `StreamMatcher` にまとめ、
+  要素の開始・終了に合わせて更新されたビット列から判定します。
+
+  Parameters
+  ----------
+  selectors : Iterable[tuple[ISelector, Any]]
+    最初に登録するセレクターと、一致した際に返す値の組の列です。
+  """
+
+  def __init__ (self, selectors:Iterable[tuple[ISelector, Any]]=()):
+    self._payloads = []
+    self._by_id = {}
+    self._by_class = {}
+    self._by_tag = {}
+    self._by_pattern = AttributePatternIndex()
+    self._universal = []
+    self._unindexed = []
+    #兄弟結合子を含むセレクターと、その各 Chain が属するセレクターの番号です
+    self._sibling_selectors = []
+    self._sibling_rules = []
+    #疑似クラスを含むセレクターが登録されたならば、逐次処理の際に要素の位置を追跡します
+    self._pseudo_classes = []
+    for selector, payload in selectors:
+      self.add(selector, payload)
+
+  def __len__ (self) -> int:
+    return len(self._payloads)
+
+  def add (self, selector:ISelector, payload:Any):
+
+    """セレクターを登録します。
+
+    Parameters
+    ----------
+    selector : ISelector
+      登録するセレクターです。
+    payload : Any
+      セレクターが一致した際に `match` が返す値です。
+    """
+
+    rule_index = len(self._payloads)
+    self._payloads.append(payload)
+    self._pseudo_classes.extend(_pseudo_classes(selector))
+    chains = flatten_selector(selector, siblings=True)
+    if chains is None:
+      self._unindexed.append((rule_index, selector))
+    elif any(combinator is Selector_NextSibling or combinator is Selector_SubsequentSibling for chain in chains for combinator in chain.combinators):
+      self._sibling_selectors.append(selector)
+      self._sibling_rules.extend([rule_index] * len(chains))
+    else:
+      for chain in chains:
+        entry = (rule_index, chain, chain_ancestor_features(chain))
+        key = _index_key(chain.compounds[-1])
+        if key is None:
+          self._universal.append(entry)
+        else:
+          kind, value = key
+          if kind == "pattern":
+            self._by_pattern.add(value, entry)
+          else:
+            if kind == "id":
+              buckets = self._by_id
+            elif kind == "class":
+              buckets = self._by_class
+            else:
+              buckets = self._by_tag
+            buckets.setdefault(value, []).append(entry)
+
+  def _candidates (self, element:Element) -> list[tuple[int, Chain, tuple[int, ...]]]:
+    tag, attrs = element
+    candidates = []
+    candidates.extend(self._by_tag.get(tag, ()))
+    if "id" in attrs:
+      candidates.extend(self._by_id.get(attrs["id"], ()))
+    if "class" in attrs:
+      if type(attrs) is PreparedAttributes:
+        classes = attrs.classes
+      else:
+        classes = set(_split_whitespace(attrs["class"]))
+      for class_ in classes:
+        candidates.extend(self._by_class.get(class_, ()))
+    if self._by_pattern:
+      candidates.extend(self._by_pattern.match(attrs))
+    candidates.extend(self._universal)
+    return candidates
+
+  def sibling_matcher (self, *, match_anywhere:bool=True) -> StreamMatcher | None:
+
+    """兄弟結合子を含むセレクターを逐次判定する `StreamMatcher` を作成します。
+
+    作成された `StreamMatcher` には `match` に与えるスタックと同じ順番で要素を与え、
+    `match` の引数 `sibling_matcher` に指定します。
+
+    Parameters
+    ----------
+    match_anywhere : bool
+      `ISelector.match` の同名の引数と同じ意味をもちます。
+
+    Returns
+    -------
+    StreamMatcher | None
+      作成された `StreamMatcher` です。
+      兄弟結合子を含むセレクターが登録されていなければ `None` を返します。
+    """
+
+    if not self._sibling_selectors:
+      return None
+    return StreamMatcher(Selector_Or(tuple(self._sibling_selectors)), match_anywhere=match_anywhere)
+
+  def match (self, element_stack:list[Element], *, match_anywhere:bool=True, ancestor_filter:AncestorFilter | None=None, sibling_matcher:StreamMatcher | None=None, sibling_snapshot:Any=None) -> list[Any]:
+
+    """スタックに一致した全てのセレクターに対応する値を返します。
+
+    Parameters
+    ----------
+    element_stack : list[Element]
+      HTMLの階層に見立てたスタックです。
+    match_anywhere : bool
+      `ISelector.match` の同名の引数と同じ意味をもちます。
+    ancestor_filter : AncestorFilter | None
+      `element_stack` の全ての要素を記録した `AncestorFilter` です。
+      指定されたならば、祖先要素に求める特徴が記録されていない候補の検証を省略します。
+    sibling_matcher : StreamMatcher | None
+      `sibling_matcher` が作成し、 `element_stack` と同じ要素を与えた `StreamMatcher` です。
+      兄弟結合子を含むセレクターが登録されていれば必須です。
+    sibling_snapshot : Any
+      `sibling_matcher` の `snapshot` が返した状態です。
+      指定されたならば、兄弟結合子を含むセレクターを保存した時点のスタックで判定します。
+
+    Returns
+    -------
+    list[Any]
+      一致したセレクターに対応する値のリストです。
+      値は登録された順番に並べられます。
+
+    Raises
+    ------
+    ValueError
+      兄弟結合子を含むセレクターが登録されているにもかかわらず `sibling_matcher` が指定されなかった場合に送出されます。
+    """
+
+    if self._sibling_rules and sibling_matcher is None:
+      raise ValueError("Selectors with sibling combinators require the StreamMatcher created by sibling_matcher().")
+    matched = set()
+    if element_stack:
+      for rule_index, chain, features in self._candidates(element_stack[-1]):
+        if rule_index in matched or (ancestor_filter is not None and features and not ancestor_filter.may_contain(features)):
+          continue
+        if _match_chain(chain, element_stack, match_anywhere, False):
+          matched.add(rule_index)
+    for rule_index, selector in self._unindexed:
+      if selector.match(element_stack, match_anywhere=match_anywhere, match_children=False):
+        matched.add(rule_index)
+    if self._sibling_rules:
+      for branch in sibling_matcher.matching_branches(sibling_snapshot):
+        matched.add(self._sibling_rules[branch])
+    return [self._payloads[rule_index] for rule_index in sorted(matched)]
@@ -0,0 +1,418 @@
+
+from collections import deque
+from typing import Any, Iterable
+from .exception import UndecidedError
+from .selector import Element, PositionedElement, ISelector, Selector_Son, Selector_Children, Selector_NextSibling, Selector_SubsequentSibling, PseudoClass_Has, _pseudo_classes
+from .pseudo_class import IPseudoClass, SiblingCounter
+from .chain import flatten_selector
+
+#直前の複合セレクターの一致を参照するビット列の種類です
+_SOURCE_PARENT_END = 0
+_SOURCE_PARENT_ANCESTOR = 1
+_SOURCE_PREVIOUS_END = 2
+_SOURCE_PREVIOUS_ANY = 3
+
+_SOURCES:dict[type, int] = {
+  Selector_Son: _SOURCE_PARENT_END,
+  Selector_Children: _SOURCE_PARENT_ANCESTOR,
+  Selector_NextSibling: _SOURCE_PREVIOUS_END,
+  Selector_SubsequentSibling: _SOURCE_PREVIOUS_ANY,
+}
+
+class _PositionTracker:
+
+  #階層ごとに子要素を数える SiblingCounter を保持し、 :has() の条件を満たす子孫要素を記録します
+
+  def __init__ (self, pseudo_classes:list[IPseudoClass]):
+    self.counters = [SiblingCounter()]
+    self.has_conditions = list(dict.fromkeys(sel for sel in pseudo_classes if type(sel) is PseudoClass_Has))
+
+  def push (self, element_stack:list[Element], tag:str, attrs:dict[str, str]):
+    counter = self.counters[-1]
+    children = SiblingCounter()
+    element_stack.append(PositionedElement(tag, attrs, counter.count(tag), children))
+    self.counters.append(children)
+    if self.has_conditions:
+      depth = len(element_stack) -1
+      for has in self.has_conditions:
+        if any(sel.match(element_stack, depth) for sel in has.descendants):
+          if counter.has is None:
+            counter.has = set()
+          if counter.descendants is None:
+            counter.descendants = set()
+          counter.has.add(has)
+          counter.descendants.add(has)
+        elif any(sel.match(element_stack, depth) for sel in has.children):
+          if counter.has is None:
+            counter.has = set()
+          counter.has.add(has)
+
+  def pop (self):
+    children = self.counters.pop()
+    children.closed = True
+    #子孫要素によって成立した条件は、さらに上の祖先要素に対しても成立します
+    if children.descendants:
+      counter = self.counters[-1]
+      if counter.has is None:
+        counter.has = set()
+      if counter.descendants is None:
+        counter.descendants = set()
+      counter.has.update(children.descendants)
+      counter.descendants.update(children.descendants)
+
+  def close (self):
+    for counter in self.counters:
+      counter.closed = True
+
+  def reset (self):
+    self.counters[:] = [SiblingCounter()]
+
+class StreamMatcher:
+
+  """要素の開始・終了を逐次受け取り、スタックがセレクターに一致するかを判定するクラスです。
+
+  各階層ごとに「どの複合セレクターまで一致しているか」をビット列として保持します。
+  そのため `push` `pop` `matches` の計算量はスタックの深さに依存せず、複合セレクターの数のみに比例します。
+
+  兄弟結合子（ `A + B` と `A ~ B` ）を含むセレクターでは、各階層ごとに
+  「直前の兄弟要素が一致した複合セレクター」と「それまでの兄弟要素が一致した複合セレクター」もビット列として保持します。
+  文書の木構造を保持したり兄弟要素を走査し直したりすることはないため、計算量は変わりません。
+
+  疑似クラスを含むセレクターでは、階層ごとに兄弟要素の数を数える `SiblingCounter` を保持し、
+  スタックには位置をもつ `PositionedElement` を積みます。
+  `:last-child` のように後続の兄弟要素が現れるまで判定できない条件は「一致する可能性がある」ものとして別のビット列で追跡し、
+  そのような要素に対して `matches` を呼び出すと `UndecidedError` が送出されます。
+  `:has()` を含むセレクターでは、条件を満たす子孫要素が現れた時点で祖先要素の `SiblingCounter` に記録します。
+  兄弟要素の数や記録は共有されているため、 `snapshot` で保存した状態を後から `matches` に与えれば判定できます。
+  兄弟結合子も含む場合は、一致が確定していない兄弟要素のみを階層ごとに保持し、保存した状態から判定し直します。
+  疑似クラスを含まないセレクターでは、これらの処理は一切行われません。
+
+  Examples
+  --------
+  >>> matcher = StreamMatcher(parse_selector("p > a[href]"))
+  >>> matcher.push("p", {})
+  >>> matcher.push("a", {"href": "..."})
+  >>> matcher.matches()
+  True
+  >>> matcher.pop().tag
+  'a'
+  >>> matcher.matches()
+  False
+
+  Notes
+  -----
+  `parse_selector` 関数が作成する形式ではない木構造が与えられたならば、
+  `matches` は保持しているスタックに対して `ISelector.match` を呼び出して判定します。
+
+  Parameters
+  ----------
+  selector : ISelector
+    判定に用いるセレクターです。
+  match_anywhere : bool
+    `ISelector.match` の同名の引数と同じ意味をもちます。
+  match_children : bool
+    `ISelector.match` の同名の引数と同じ意味をもちます。
+
+  Attributes
+  ----------
+  selector : ISelector
+    判定に用いるセレクターです。
+  element_stack : list[Element]
+    現在開いている要素のスタックです。
+  """
+
+  def __init__ (self, selector:ISelector, *, match_anywhere:bool=True, match_children:bool=False):
+    self.selector = selector
+    self.match_anywhere = match_anywhere
+    self.match_children = match_children
+    self.element_stack = []
+    self._ends = [0]
+    self._ancestors = [0]
+    self._entries = None
+    self._last_mask = 0
+    self._last_bits = []
+    #兄弟結合子を含む場合のみ、階層ごとに直前の兄弟要素とそれまでの兄弟要素のビット列を保持します
+    self._sibling_ends = None
+    self._sibling_anys = None
+    #疑似クラスを含む場合のみ、階層ごとに兄弟要素の数を数えます
+    pseudo_classes = _pseudo_classes(selector)
+    self._positions = _PositionTracker(pseudo_classes) if pseudo_classes else None
+    #ビット列の下位に一致が確定した複合セレクター、上位 `_width` ビットより上に一致する可能性がある複合セレクターを保持します
+    self._width = 0
+    chains = flatten_selector(selector, siblings=True)
+    if chains is not None:
+      self._entries = []
+      bit = 1
+      for compounds, combinators in chains:
+        for i, compound in enumerate(compounds):
+          if i == 0:
+            self._entries.append((compound, bit, 0, _SOURCE_PARENT_END))
+          else:
+            self._entries.append((compound, bit, bit >> 1, _SOURCES[combinators[i -1]]))
+          bit <<= 1
+        self._last_mask |= bit >> 1
+        self._last_bits.append(bit >> 1)
+        if any(_SOURCES[combinator] >= _SOURCE_PREVIOUS_END for combinator in combinators):
+          self._sibling_ends = [0]
+          self._sibling_anys = [0]
+      self._width = bit.bit_length() -1
+    #兄弟結合子と疑似クラスを併用する場合のみ、階層ごとに確定した兄弟要素のビット列と、確定していない兄弟要素の列を保持します
+    self._levels = [[0, 0, deque()]] if self._sibling_ends is not None and self._positions is not None else None
+
+  def push (self, tag:str, attrs:dict[str, str] | Iterable[tuple[str, str | None]]):
+
+    """要素を開始します。
+
+    Parameters
+    ----------
+    tag : str
+      要素名です。
+    attrs : dict[str, str] | Iterable[tuple[str, str | None]]
+      要素に設定された属性の集合です。
+      `html.parser.HTMLParser.handle_starttag` が受け取る形式のリストも指定できます。
+      その場合、値が `None` の属性は空文字列として扱われます。
+    """
+
+    if not isinstance(attrs, dict):
+      attrs = {name: "" if value is None else value for name, value in attrs}
+    element_stack = self.element_stack
+    if self._positions is None:
+      element_stack.append(Element(tag, attrs))
+    else:
+      self._positions.push(element_stack, tag, attrs)
+    if self._entries is not None:
+      depth = len(element_stack) -1
+      parent_ancestor = self._ancestors[-1]
+      if self._sibling_ends is None:
+        masks = (self._ends[-1], parent_ancestor)
+      else:
+        masks = (self._ends[-1], parent_ancestor, self._sibling_ends[-1], self._sibling_anys[-1])
+        self._sibling_ends.append(0)
+        self._sibling_anys.append(0)
+      if self._positions is None:
+        end = 0
+        for compound, bit, prev_bit, source in self._entries:
+          if prev_bit:
+            if not masks[source] & prev_bit:
+              continue
+          elif depth and not self.match_anywhere:
+            continue
+          if compound.match(element_stack, depth):
+            end |= bit
+      else:
+        end = self._match_undecided(masks, depth, element_stack)
+      self._ends.append(end)
+      self._ancestors.append(parent_ancestor | end)
+      if self._levels is not None:
+        self._record(masks, depth, end)
+        self._levels.append([0, 0, deque()])
+
+  def _is_decided (self, mask:int) -> bool:
+    return (mask >> self._width) == mask & ((1 << self._width) -1)
+
+  def _record (self, masks:tuple[int, ...], depth:int, end:int):
+    level = self._levels[depth]
+    undecided = level[2]
+    #後続の兄弟要素が現れたことで確定した兄弟要素は、ビット列に畳み込んで破棄します
+    while undecided:
+      element, mask = undecided[0]
+      mask = self._match_undecided((masks[0], masks[1], level[0], level[1]), depth, self.element_stack[:depth] + [element])
+      if not self._is_decided(mask):
+        undecided[0] = (element, mask)
+        break
+      undecided.popleft()
+      level[0] = mask
+      level[1] |= mask
+    if not undecided and self._is_decided(end):
+      level[0] = end
+      level[1] |= end
+    else:
+      undecided.append((self.element_stack[depth], end))
+
+  def _match_undecided (self, masks:tuple[int, ...], depth:int, element_stack:list[Element]) -> int:
+    width = self._width
+    end = 0
+    for compound, bit, prev_bit, source in self._entries:
+      if prev_bit:
+        mask = masks[source]
+        if not (mask >> width) & prev_bit:
+          continue
+        sure = mask & prev_bit
+      elif depth and not self.match_anywhere:
+        continue
+      else:
+        sure = True
+      try:
+        matched = compound.match(element_stack, depth)
+      except UndecidedError:
+        end |= bit << width
+      else:
+        if matched:
+          end |= (bit | bit << width) if sure else bit << width
+    return end
+
+  def pop (self) -> Element:
+
+    """最後に開始した要素を終了します。
+
+    Returns
+    -------
+    Element
+      終了した要素です。
+    """
+
+    element = self.element_stack.pop()
+    if self._positions is not None:
+      self._positions.pop()
+    if self._entries is not None:
+      end = self._ends.pop()
+      self._ancestors.pop()
+      if self._levels is not None:
+        self._levels.pop()
+      if self._sibling_ends is not None:
+        self._sibling_ends.pop()
+        self._sibling_anys.pop()
+        self._sibling_ends[-1] = end
+        self._sibling_anys[-1] |= end
+    return element
+
+  def snapshot (self) -> Any:
+
+    """現在のスタックの判定に必要な状態を保存します。
+
+    保存した状態を `matches` または `matching_branches` に与えると、
+    その時点のスタックを後続の要素が現れた後の情報で判定し直せます。
+    保持されるのはスタックの要素と、一致が確定していない兄弟要素のみです。
+
+    Returns
+    -------
+    Any
+      保存した状態です。内容は実装に依存します。
+    """
+
+    path = tuple(self.element_stack)
+    if self._entries is None:
+      levels = None
+    elif self._levels is not None:
+      levels = tuple((end, any_, tuple(undecided)) for end, any_, undecided in self._levels[:-1])
+    elif self._positions is not None:
+      levels = tuple((end, 0, ()) if self._is_decided(end) else (0, 0, ((element, end),)) for element, end in zip(path, self._ends[1:]))
+    else:
+      levels = tuple((end, 0, ()) for end in self._ends[1:])
+    return path, levels
+
+  def _replay (self, levels:tuple[tuple[int, int, tuple[tuple[Element, int], ...]], ...], path:tuple[Element, ...]) -> tuple[int, int]:
+    #保存した時点で確定していなかった兄弟要素の一致を、上の階層から順に判定し直します
+    element_stack = []
+    end = 0
+    ancestor = 0
+    for depth, (sibling_end, sibling_any, undecided) in enumerate(levels):
+      for element, mask in undecided:
+        if not self._is_decided(mask):
+          element_stack.append(element)
+          mask = self._match_undecided((end, ancestor, sibling_end, sibling_any), depth, element_stack)
+          element_stack.pop()
+        sibling_end = mask
+        sibling_any |= mask
+      element_stack.append(path[depth])
+      end = sibling_end
+      ancestor |= end
+    return end, ancestor
+
+  def _mask (self, snapshot:Any) -> int:
+    if snapshot is None:
+      end = self._ends[-1]
+      ancestor = self._ancestors[-1]
+    else:
+      path, levels = snapshot
+      end, ancestor = self._replay(levels, path)
+    return ancestor if self.match_children else end
+
+  def matches (self, snapshot:Any=None) -> bool:
+
+    """現在のスタックがセレクターに一致するかを判定します。
+
+    Parameters
+    ----------
+    snapshot : Any
+      `snapshot` が返した状態です。
+      指定されたならば、現在のスタックの代わりに保存した時点のスタックを判定します。
+
+    Returns
+    -------
+    bool
+      スタックがセレクターに一致したならば `True` そうでなければ `False` を返します。
+
+    Raises
+    ------
+    UndecidedError
+      後続の兄弟要素が現れるまで判定できない場合に送出されます。
+    """
+
+    if self._entries is None:
+      element_stack = self.element_stack if snapshot is None else list(snapshot[0])
+      return self.selector.match(element_stack, match_anywhere=self.match_anywhere, match_children=self.match_children)
+    mask = self._mask(snapshot)
+    if mask & self._last_mask:
+      return True
+    elif self._positions is not None and (mask >> self._width) & self._last_mask:
+      raise UndecidedError("Stack can not be decided until following elements appear.")
+    else:
+      return False
+
+  def matching_branches (self, snapshot:Any=None) -> list[int]:
+
+    """現在のスタックに一致したセレクターリストの各セレクターの番号を返します。
+
+    Parameters
+    ----------
+    snapshot : Any
+      `matches` の同名の引数と同じ意味をもちます。
+
+    Returns
+    -------
+    list[int]
+      `flatten_selector(selector, siblings=True)` が返すリストの中で、一致した `Chain` の番号のリストです。
+
+    Raises
+    ------
+    ValueError
+      `parse_selector` 関数が作成する形式ではない木構造が与えられていた場合に送出されます。
+    UndecidedError
+      いずれかのセレクターが後続の兄弟要素が現れるまで判定できない場合に送出されます。
+    """
+
+    if self._entries is None:
+      raise ValueError("Branches are available only for selectors created by parse_selector.")
+    mask = self._mask(snapshot)
+    if self._positions is not None and (mask >> self._width) & self._last_mask & ~mask:
+      raise UndecidedError("Stack can not be decided until following elements appear.")
+    if not mask & self._last_mask:
+      return []
+    return [branch for branch, bit in enumerate(self._last_bits) if mask & bit]
+
+  def close (self):
+
+    """文書の終端に達したことを通知します。
+
+    開いている全ての要素の兄弟要素の数を確定させるため、
+    それまでに判定できなかった状態を `snapshot` から判定できるようになります。
+    """
+
+    if self._positions is not None:
+      self._positions.close()
+
+  def reset (self):
+
+    """スタックを空にして初期状態に戻します。"""
+
+    self.element_stack.clear()
+    del self._ends[1:]
+    del self._ancestors[1:]
+    if self._sibling_ends is not None:
+      self._sibling_ends[:] = [0]
+      self._sibling_anys[:] = [0]
+    if self._levels is not None:
+      self._levels[:] = [[0, 0, deque()]]
+    if self._positions is not None:
+      self._positions.reset()
@@ -0,0 +1,178 @@
+
+import threading
+import dataclasses
+from typing import Any, Iterable, TypeVar
+from .prepared import PreparedAttributes, PreparedElement
+
+_T = TypeVar("_T")
+
+#要素名・属性名を保持するフィールドの名前です
+_NAME_FIELDS:tuple[str, ...] = ("tag", "name")
+
+class SymbolTable:
+
+  """要素名と属性名を小文字に正規化し、共有された文字列と小さな整数に変換する表です。
+
+  同じ表で変換された名前は同じ文字列のインスタンスになるため、
+  要素名の比較や属性の `dict` の参照は文字列の内容を比較せず同一性の確認で済みます。
+  大文字・小文字の正規化は名前が初めて登録された時点で1度だけ行われ、
+  その綴りは以降そのまま正規化済みの名前に変換されます。
+  各メソッドはスレッドセーフです。
+
+  Examples
+  --------
+  >>> table = SymbolTable()
+  >>> selector = parse_selector("DIV > A[HREF]", symbol_table=table)
+  >>> stack = table.stack([("div", {}), ("A", {"href": "/"})])
+  >>> selector.match(stack)
+  True
+  >>> stack[-1].tag is selector.selector.next_selector.cur_selector.tag
+  True
+  >>> table.symbol("Href") == table.symbol("href")
+  True
+  """
+
+  def __init__ (self):
+    self._symbols = {}
+    self._names = []
+    self._lock = threading.Lock()
+
+  def __len__ (self) -> int:
+    return len(self._names)
+
+  def symbol (self, name:str) -> int:
+
+    """名前に対応する番号を返します。表になければ登録します。
+
+    Parameters
+    ----------
+    name : str
+      変換する要素名または属性名です。大文字・小文字は区別されません。
+
+    Returns
+    -------
+    int
+      名前の番号です。
+    """
+
+    symbol = self._symbols.get(name)
+    if symbol is None:
+      with self._lock:
+        normalized = name.lower()
+        symbol = self._symbols.get(normalized)
+        if symbol is None:
+          symbol = self._symbols[normalized] = len(self._names)
+          self._names.append(normalized)
+        self._symbols[name] = symbol
+    return symbol
+
+  def intern (self, name:str) -> str:
+
+    """名前を正規化し、共有された文字列を返します。
+
+    Parameters
+    ----------
+    name : str
+      変換する要素名または属性名です。大文字・小文字は区別されません。
+
+    Returns
+    -------
+    str
+      小文字に変換された名前です。同じ名前に対しては常に同じインスタンスが返されます。
+    """
+
+    return self._names[self.symbol(name)]
+
+  def name (self, symbol:int) -> str:
+
+    """番号に対応する名前を返します。
+
+    Parameters
+    ----------
+    symbol : int
+      `symbol` が返した番号です。
+
+    Returns
+    -------
+    str
+      小文字に変換された名前です。
+    """
+
+    return self._names[symbol]
+
+  def intern_selector (self, selector:_T) -> _T:
+
+    """セレクターの木構造に含まれる要素名と属性名を、共有された文字列に置き換えます。
+
+    Parameters
+    ----------
+    selector : _T
+      置き換えるセレクターです。
+      `frozen` なデータクラス以外が与えられたならば、そのまま返します。
+
+    Returns
+    -------
+    _T
+      名前を置き換えたセレクターです。置き換える名前がなければ `selector` がそのまま返されます。
+    """
+
+    if type(selector) is tuple:
+      items = tuple(self.intern_selector(item) for item in selector)
+      return selector if all(a is b for a, b in zip(items, selector)) else items
+    elif not (dataclasses.is_dataclass(selector) and not isinstance(selector, type) and selector.__dataclass_params__.frozen):
+      return selector
+    changes = {}
+    for field in dataclasses.fields(selector):
+      value = getattr(selector, field.name)
+      if field.name in _NAME_FIELDS and type(value) is str:
+        canonical = self.intern(value) if value else value
+      else:
+        canonical = self.intern_selector(value)
+      if canonical is not value:
+        changes[field.name] = canonical
+    return dataclasses.replace(selector, **changes) if changes else selector
+
+  def prepare (self, tag:str, attrs:dict[str, str] | Iterable[tuple[str, str | None]]) -> PreparedElement:
+
+    """要素名と属性名を共有された文字列に置き換えた `PreparedElement` を作成します。
+
+    Parameters
+    ----------
+    tag : str
+      要素名です。
+    attrs : dict[str, str] | Iterable[tuple[str, str | None]]
+      要素に設定された属性の集合です。
+      `html.parser.HTMLParser.handle_starttag` が受け取る形式のリストも指定できます。
+      その場合、値が `None` の属性は空文字列として扱われます。
+
+    Returns
+    -------
+    PreparedElement
+      作成された要素です。
+    """
+
+    names = self._names
+    symbol = self.symbol
+    if isinstance(attrs, dict):
+      prepared_attrs = PreparedAttributes((names[symbol(name)], value) for name, value in attrs.items())
+    else:
+      prepared_attrs = PreparedAttributes((names[symbol(name)], "" if value is None else value) for name, value in attrs)
+    return PreparedElement(names[symbol(tag)], prepared_attrs)
+
+  def stack (self, elements:Iterable[tuple[str, Any]]) -> list[PreparedElement]:
+
+    """要素名と属性の組の列から、判定に用いるスタックを作成します。
+
+    Parameters
+    ----------
+    elements : Iterable[tuple[str, Any]]
+      最上位の要素から順に並べた要素名と属性の組の列です。
+      属性は `prepare` が受け取る形式で指定します。
+
+    Returns
+    -------
+    list[PreparedElement]
+      作成されたスタックです。
+    """
+
+    return [self.prepare(tag, attrs) for tag, attrs in elements]
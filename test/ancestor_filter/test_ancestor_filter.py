@@ -0,0 +1,118 @@
+import os
+import sys
+import pickle
+import random
+import subprocess
+import pytest
+import cssselector
+from cssselector import AncestorFilter, SelectorSet, ancestor_features, parse_selector, extract
+
+SOURCES = [
+  "a",
+  "a b",
+  "a > b",
+  "a.x b",
+  "#y c",
+  "a .x > c#y",
+  "a + b",
+  "a > b ~ c",
+  "a b, c.x a",
+  "*.z b",
+]
+
+def _random_stack (rng:random.Random) -> list[tuple[str, dict[str, str]]]:
+  stack = []
+  for _ in range(rng.randint(1, 8)):
+    attrs = {}
+    if rng.random() < 0.3:
+      attrs["class"] = " ".join(rng.sample(["x", "y", "z"], rng.randint(1, 2)))
+    if rng.random() < 0.2:
+      attrs["id"] = rng.choice(["y", "z"])
+    stack.append((rng.choice("abc"), attrs))
+  return stack
+
+def test_ancestor_filter ():
+
+  #フィルターが不一致と判定したセレクターは ISelector.match でも一致しません
+
+  rng = random.Random(0)
+  selectors = [(parse_selector(source), source) for source in SOURCES]
+  features = [ancestor_features(selector) for selector, _ in selectors]
+  for bits in (1, 4, 12):
+    ancestors = AncestorFilter(bits)
+    for _ in range(300):
+      stack = _random_stack(rng)
+      for tag, attrs in stack:
+        ancestors.push(tag, attrs)
+      assert len(ancestors) == len(stack)
+      for (selector, source), feature in zip(selectors, features):
+        if "+" in source or "~" in source:
+          continue
+        if not ancestors.may_match(feature):
+          assert not selector.match(stack, match_children=False), source
+      for _ in stack:
+        ancestors.pop()
+    #全ての要素を終了するとカウンターは全て0に戻ります
+    assert not any(ancestors._counts)
+
+def test_ancestor_filter_features ():
+
+  #兄弟結合子の左にある複合セレクターは祖先要素の特徴に含まれません
+
+  assert ancestor_features(parse_selector("a + b")) == ((),)
+  assert ancestor_features(parse_selector("a > b ~ c")) == ancestor_features(parse_selector("a > c"))
+  assert len(ancestor_features(parse_selector("a b, c"))) == 2
+
+  ancestors = AncestorFilter()
+  ancestors.push("div", {"id": "main", "class": "content wide"})
+  ancestors.push("p", {})
+  assert ancestors.may_match(ancestor_features(parse_selector("div#main.wide > p")))
+  assert not ancestors.may_match(ancestor_features(parse_selector("section p")))
+  assert not ancestors.may_match(ancestor_features(parse_selector(".narrow p")))
+  assert ancestors.may_match(ancestor_features(parse_selector("section p, div p")))
+  ancestors.clear()
+  assert not ancestors.may_match(ancestor_features(parse_selector("div p")))
+
+  with pytest.raises(ValueError):
+    AncestorFilter(17)
+
+def test_ancestor_filter_selector_set ():
+
+  #フィルターを与えても SelectorSet の判定結果は変わりません
+
+  rng = random.Random(1)
+  selector_set = SelectorSet((parse_selector(source), source) for source in SOURCES if "+" not in source and "~" not in source)
+  ancestors = AncestorFilter(2)
+  for _ in range(300):
+    stack = _random_stack(rng)
+    for tag, attrs in stack:
+      ancestors.push(tag, attrs)
+    assert selector_set.match(stack, ancestor_filter=ancestors) == selector_set.match(stack)
+    for _ in stack:
+      ancestors.pop()
+
+  #抽出でも同じ結果になります
+
+  html = "<div class='main'><p>1<a>2</a></p></div><section><a>3</a></section>"
+  selector_set = SelectorSet([(parse_selector(".main a"), "main"), (parse_selector("section a"), "section")])
+  assert [(extraction.selector, extraction.data) for extraction in extract(selector_set, [html])] == [("main", "2"), ("section", "3")]
+
+def test_ancestor_filter_pickle (tmp_path):
+
+  #PYTHONHASHSEED の異なるプロセスへ渡した SelectorSet でも一致する要素を除外しません
+
+  path = tmp_path / "selector_set.pickle"
+  path.write_bytes(pickle.dumps(SelectorSet([(parse_selector("div.main a"), "r"), (parse_selector("#top > p span"), "s")])))
+  script = "\n".join([
+    "import pickle, sys",
+    "from cssselector import extract",
+    "selector_set = pickle.loads(open(sys.argv[1], 'rb').read())",
+    "html = '<div class=main><a>x</a></div><p id=top><span>y</span></p>'",
+    "print([(extraction.selector, extraction.data) for extraction in extract(selector_set, [html])])",
+  ])
+  env = dict(os.environ)
+  env["PYTHONPATH"] = os.pathsep.join([os.path.dirname(os.path.dirname(cssselector.__file__)), env.get("PYTHONPATH", "")])
+  for seed in ("1", "2"):
+    env["PYTHONHASHSEED"] = seed
+    result = subprocess.run([sys.executable, "-c", script, str(path)], env=env, capture_output=True, text=True, check=True)
+    assert result.stdout.strip() == "[('r', 'x')]"
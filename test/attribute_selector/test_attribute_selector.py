@@ -52,3 +52,6 @@ def test_attribute_selector_contains_with_separator ():
   assert sel.match({"a": "1 x 3", "b": "2"}) == False
   assert sel.match({"a": "1 x 3"}) == False
   assert sel.match({}) == False
+  assert sel.match({"a": "1\t2\n3"}) == True
+  assert sel.match({"a": "  2  "}) == True
+  assert sel.match({"a": "1\xa02"}) == False
@@ -0,0 +1,77 @@
+
+import os
+import pytest
+from cssselector import BatchRunner, SelectorSet, parse_selector, walk_paths, batch
+
+def _write_corpus (directory, count:int) -> list[str]:
+  paths = []
+  os.makedirs(os.path.join(directory, "sub"))
+  for i in range(count):
+    path = os.path.join(directory, "sub" if i % 2 else "", "{:03d}.html".format(i))
+    with open(path, "w", encoding="utf-8") as file:
+      file.write("<html><head><title>t{:d}</title></head><body><p><a href='#'>{:d}</a><br></p></body></html>".format(i, i))
+    paths.append(path)
+  return paths
+
+def test_batch_runner (tmp_path):
+
+  paths = _write_corpus(str(tmp_path), 10)
+  sel = parse_selector("p > a[href]")
+
+  #与えられたパスの順番で結果を返すかを検証します
+
+  runner = BatchRunner(sel, max_workers=2, chunksize=3)
+  results = list(runner.run(paths))
+  assert [result.path for result in results] == paths
+  assert [[e.data for e in result.extractions] for result in results] == [[str(i)] for i in range(10)]
+  assert all(e.selector is sel and e.element_stack == () for result in results for e in result.extractions)
+  stats = runner.stats
+  assert stats.files == 10
+  assert stats.bytes == sum(os.path.getsize(path) for path in paths)
+  assert stats.errors == 0
+  assert stats.files_per_second > 0
+
+  #処理が終わった順番で結果を返す場合の動作確認です
+
+  runner = BatchRunner(SelectorSet([(parse_selector("title"), "title")]), max_workers=2, chunksize=1, ordered=False, with_stack=True)
+  results = list(runner.run(paths + [str(tmp_path / "missing.html")]))
+  assert sorted(result.path for result in results) == sorted(paths + [str(tmp_path / "missing.html")])
+  assert runner.stats.errors == 1
+  for result in results:
+    if result.error is None:
+      assert [(e.selector, [element.tag for element in e.element_stack]) for e in result.extractions] == [("title", ["html", "head", "title"])]
+
+def test_batch_runner_match_error (tmp_path):
+
+  #判定に失敗したファイルはエラーとして記録され、他のファイルの処理は続けられます
+
+  paths = _write_corpus(str(tmp_path), 3)
+  deep = str(tmp_path / "deep.html")
+  with open(deep, "w", encoding="utf-8") as file:
+    file.write("<p>" + "<a>t</a>" * 2000 + "<b></b></p>")
+  runner = BatchRunner(SelectorSet([(parse_selector("p:has(b) a"), "a"), (parse_selector("title"), "title")]), max_workers=1)
+  results = list(runner.run([paths[0], deep, paths[1]]))
+  assert [result.path for result in results] == [paths[0], deep, paths[1]]
+  assert results[1].error is not None and results[1].extractions == []
+  assert [[e.data for e in result.extractions] for result in (results[0], results[2])] == [["t0"], ["t1"]]
+  assert runner.stats.errors == 1
+
+def test_walk_paths (tmp_path):
+
+  paths = _write_corpus(str(tmp_path), 4)
+  assert sorted(walk_paths([str(tmp_path)])) == sorted(paths)
+  assert list(walk_paths([str(tmp_path)], recursive=False)) == []
+
+def test_batch_main (tmp_path, capsys):
+
+  _write_corpus(str(tmp_path), 3)
+  assert batch.main(["title", str(tmp_path), "-j", "1"]) == 0
+  captured = capsys.readouterr()
+  assert sorted(line.split(":")[-1] for line in captured.out.splitlines()) == ["t0", "t1", "t2"]
+  assert "3 files" in captured.err
+
+  #セレクターが読み込めなければトレースバックを出さずに終了します
+
+  assert batch.main(["p:unknown", str(tmp_path)]) == 2
+  captured = capsys.readouterr()
+  assert captured.err.startswith("cssselector-batch: ") and captured.out == ""
@@ -0,0 +1,42 @@
+import json
+import pytest
+from cssselector import benchmark
+
+def test_benchmark_cases ():
+
+  #全ての計測対象が実行できることの確認です
+
+  for case in benchmark.CASES:
+    case.setup()()
+  names = [case.name for case in benchmark.CASES]
+  assert len(names) == len(set(names))
+
+def test_benchmark_compare ():
+
+  #基準に対する速度低下の判定の確認です
+
+  baseline = {"format": benchmark.FORMAT_VERSION, "results": {"a": {"seconds": 1.0}, "b": {"seconds": 1.0}, "c": {"seconds": 1.0}}}
+  current = {"format": benchmark.FORMAT_VERSION, "results": {"a": {"seconds": 1.1}, "b": {"seconds": 1.5}, "d": {"seconds": 1.0}}}
+  assert benchmark.compare(current, baseline, threshold=0.2) == [("a", pytest.approx(1.1), False), ("b", pytest.approx(1.5), True)]
+  assert benchmark.compare(current, baseline, threshold=0.6) == [("a", pytest.approx(1.1), False), ("b", pytest.approx(1.5), False)]
+
+  #形式の異なる基準は拒否されます
+
+  with pytest.raises(ValueError):
+    benchmark.compare(current, {"format": -1, "results": {}})
+
+def test_benchmark_main (tmp_path, capsys):
+
+  #結果の書き出しと基準との比較の確認です
+
+  output = tmp_path / "result.json"
+  assert benchmark.main(["-k", "parse/short", "--repeat", "1", "--min-time", "0", "-o", str(output)]) == 0
+  result = json.loads(output.read_text(encoding="utf-8"))
+  assert list(result["results"]) == ["parse/short"]
+
+  #基準より大幅に遅い場合は 1 を返します
+
+  result["results"]["parse/short"]["seconds"] /= 1000
+  output.write_text(json.dumps(result), encoding="utf-8")
+  assert benchmark.main(["-k", "parse/short", "--repeat", "1", "--min-time", "0", "-b", str(output)]) == 1
+  assert "REGRESSION" in capsys.readouterr().out
@@ -0,0 +1,65 @@
+
+import dataclasses
+import pytest
+from cssselector import SelectorCache, CacheInfo, ParseError, parse_selector, parse_selector_cached, default_cache
+
+def test_selector_cache ():
+
+  cache = SelectorCache(maxsize=2)
+
+  #同じコードに対しては同じインスタンスを返します
+
+  sel = cache.parse("a")
+  assert sel == parse_selector("a")
+  assert cache.parse("a") is sel
+  assert cache.info() == CacheInfo(hits=1, misses=1, evictions=0, maxsize=2, currsize=1)
+
+  #容量を超えた場合は最も古く参照された項目が破棄されます
+
+  cache.parse("b")
+  cache.parse("a")
+  cache.parse("c")
+  assert cache.info() == CacheInfo(hits=2, misses=3, evictions=1, maxsize=2, currsize=2)
+  assert cache.parse("a") is sel
+  cache.parse("b")
+  assert cache.info().misses == 4
+
+  #最大数を変更した場合の動作確認です
+
+  cache.resize(1)
+  assert len(cache) == 1
+  assert cache.info().evictions == 3
+
+  #項目と統計情報を破棄した場合の動作確認です
+
+  cache.clear()
+  assert cache.info() == CacheInfo(hits=0, misses=0, evictions=0, maxsize=1, currsize=0)
+
+  #パースに失敗したコードは保持されません
+
+  with pytest.raises(ParseError):
+    cache.parse("")
+  assert len(cache) == 0
+
+  #最大数に 0 を指定した場合は何も保持しません
+
+  cache = SelectorCache(maxsize=0)
+  assert cache.parse("a") is not cache.parse("a")
+  assert len(cache) == 0
+
+  with pytest.raises(ValueError):
+    SelectorCache(maxsize=-1)
+
+def test_parse_selector_cached ():
+
+  #既定のキャッシュを経由してパースした場合の動作確認です
+
+  default_cache.clear()
+  sel = parse_selector_cached("p > a")
+  assert parse_selector_cached("p > a") is sel
+  assert default_cache.info().hits == 1
+
+  #キャッシュから返されたインスタンスは変更できません
+
+  with pytest.raises(dataclasses.FrozenInstanceError):
+    sel.selector = None
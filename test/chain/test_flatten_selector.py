@@ -0,0 +1,27 @@
+
+import pytest
+from cssselector import Chain, Selector_Element, Selector_Children, Selector_Son, Selector_Or, parse_selector, flatten_selector
+
+def test_flatten_selector ():
+
+  #単一のセレクターを展開した場合の動作確認です
+
+  chains = flatten_selector(parse_selector("a > b c"))
+  assert len(chains) == 1
+  assert [sel.tag for sel in chains[0].compounds] == ["a", "b", "c"]
+  assert chains[0].combinators == [Selector_Son, Selector_Children]
+
+  #セレクターリストを展開した場合の動作確認です
+
+  chains = flatten_selector(parse_selector("a, b c"))
+  assert len(chains) == 2
+  assert [sel.tag for sel in chains[0].compounds] == ["a"]
+  assert chains[0].combinators == []
+  assert [sel.tag for sel in chains[1].compounds] == ["b", "c"]
+  assert chains[1].combinators == [Selector_Children]
+
+  #parse_selector が作成する形式ではない場合の動作確認です
+
+  assert flatten_selector(Selector_Element("a", [])) is None
+  assert flatten_selector(Selector_Son(Selector_Element("a", []), Selector_Element("b", []))) is None
+  assert flatten_selector(Selector_Or([Selector_Element("a", [])])) is None
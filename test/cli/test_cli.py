@@ -0,0 +1,113 @@
+
+import io
+import os
+import sys
+import json
+import threading
+import pytest
+from cssselector import cli
+
+HTML = """
+<html>
+  <body>
+    <p id="first"><a href="/a">A</a><a>B</a></p>
+    <p><a href="/c" class="x">C</a><br></p>
+  </body>
+</html>
+"""
+
+@pytest.fixture
+def html_file (tmp_path):
+  path = tmp_path / "index.html"
+  path.write_text(HTML, encoding="utf-8")
+  return str(path)
+
+def test_cli_text (html_file, capsys):
+
+  #一致した要素のテキストを出力する場合の動作確認です
+
+  assert cli.main(["p > a[href]", html_file]) == 0
+  assert capsys.readouterr().out.splitlines() == ["A", "C"]
+
+  #一致する要素がない場合は 1 を返します
+
+  assert cli.main(["table", html_file]) == 1
+  assert capsys.readouterr().out == ""
+
+def test_cli_output (html_file, capsys):
+
+  #属性・スタックの経路を出力する場合の動作確認です
+
+  assert cli.main(["-o", "attrs", "a.x", html_file]) == 0
+  assert [json.loads(line) for line in capsys.readouterr().out.splitlines()] == [{"href": "/c", "class": "x"}]
+
+  assert cli.main(["-o", "path", "#first > a", html_file]) == 0
+  assert capsys.readouterr().out.splitlines() == ["html > body > p > a", "html > body > p > a"]
+
+def test_cli_count_and_first (html_file, capsys):
+
+  #一致した数のみを出力する場合の動作確認です
+
+  assert cli.main(["-c", "a", html_file]) == 0
+  assert capsys.readouterr().out.splitlines() == ["3"]
+
+  #最初に一致した時点で読み込みを終える場合の動作確認です
+
+  assert cli.main(["--first", "-c", "a", html_file]) == 0
+  assert capsys.readouterr().out.splitlines() == ["1"]
+
+def test_cli_inputs (html_file, tmp_path, capsys, monkeypatch):
+
+  #セレクターをファイルから読み込み、ディレクトリを再帰的に探索する場合の動作確認です
+
+  selectors = tmp_path / "selectors.txt"
+  selectors.write_text("#first > a\n\na.x\n", encoding="utf-8")
+  (tmp_path / "empty.html").write_text("", encoding="utf-8")
+  assert cli.main(["-f", str(selectors), "-r", str(tmp_path)]) == 0
+  assert capsys.readouterr().out.splitlines() == ["{:s}:{:s}".format(html_file, data) for data in ["A", "B", "C"]]
+
+  #標準入力から読み込む場合の動作確認です
+
+  monkeypatch.setattr(sys, "stdin", io.TextIOWrapper(io.BytesIO(HTML.encode("utf-8"))))
+  assert cli.main(["a.x"]) == 0
+  assert capsys.readouterr().out.splitlines() == ["C"]
+
+  #エラーが発生した場合は 2 を返します
+
+  assert cli.main(["a", str(tmp_path / "missing.html")]) == 2
+  assert cli.main(["a >> [", html_file]) == 2
+
+def test_cli_special_inputs (tmp_path, capsys):
+
+  #大きさが 0 と報告されるパイプからも読み込めます
+
+  path = tmp_path / "fifo"
+  os.mkfifo(path)
+  writer = threading.Thread(target=path.write_text, args=(HTML,), kwargs={"encoding": "utf-8"})
+  writer.start()
+  assert cli.main(["a.x", str(path)]) == 0
+  writer.join()
+  assert capsys.readouterr().out.splitlines() == ["C"]
+
+  #判定を保留したテキストが多すぎる場合はエラーとして 2 を返します
+
+  path = tmp_path / "deep.html"
+  path.write_text("<p>" + "<i>t</i>" * 2000 + "<b></b></p>", encoding="utf-8")
+  assert cli.main(["p:has(b) i", str(path)]) == 2
+  assert "cssselector:" in capsys.readouterr().err
+
+def test_cli_invalid_options (html_file, tmp_path, capsys):
+
+  #未知の文字コードは読み込みを始める前に拒否されます
+
+  with pytest.raises(SystemExit) as info:
+    cli.main(["a", html_file, "--encoding", "no-such-encoding"])
+  assert info.value.code == 2
+  assert "unknown encoding: no-such-encoding" in capsys.readouterr().err
+
+  #-r を指定せずに与えたディレクトリはエラーとして報告されます
+
+  assert cli.main(["a.x", str(tmp_path), html_file]) == 2
+  captured = capsys.readouterr()
+  assert captured.out.splitlines() == ["{:s}:C".format(html_file)]
+  assert "{:s}: Is a directory".format(str(tmp_path)) in captured.err
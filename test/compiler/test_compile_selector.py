@@ -0,0 +1,88 @@
+
+import itertools
+import pytest
+from cssselector import CompiledSelector, IAttributeSelector, Selector_Element, Selector_Children, Selector_Son, Selector_Or, compile_selector, parse_selector
+
+SOURCES = [
+  "a",
+  "*",
+  "a b",
+  "a > b",
+  "a b > c",
+  "a > b c",
+  "a a b",
+  "* > b",
+  "a.x b",
+  "#y",
+  "a[href^=\"/x\"] [data-v$=\"z\"] > [title*=\"m\"]",
+  "[data-a=\"1\"][data-b]",
+  "a, b > c",
+  "a b, c",
+]
+
+ATTRIBUTES = [
+  {},
+  {"class": "x"},
+  {"id": "y", "href": "/xyz", "data-v": "yz", "title": "amb"},
+  {"data-a": "1", "data-b": ""},
+]
+
+def _stacks ():
+  for size in range(0, 4):
+    for tags in itertools.product("abc", repeat=size):
+      for attrs in ATTRIBUTES:
+        yield [(tag, attrs if i % 2 == size % 2 else {}) for i, tag in enumerate(tags)]
+
+def test_compile_selector ():
+
+  #parse_selector で作成したセレクターと判定結果が一致するかを検証します
+
+  for source in SOURCES:
+    sel = parse_selector(source)
+    compiled = compile_selector(sel)
+    assert isinstance(compiled, CompiledSelector)
+    for stack in _stacks():
+      for match_anywhere, match_children in itertools.product([True, False], repeat=2):
+        for index in range(len(stack) +2):
+          expected = sel.match(stack, index, match_anywhere=match_anywhere, match_children=match_children)
+          actual = compiled.match(stack, index, match_anywhere=match_anywhere, match_children=match_children)
+          assert actual == expected, (source, stack, index, match_anywhere, match_children)
+
+class _AttributeSelector_Odd (IAttributeSelector):
+
+  def match (self, attrs:dict[str, str]) -> bool:
+    return len(attrs) % 2 == 1
+
+def test_compile_selector_custom ():
+
+  #独自の属性セレクターや結合子を直接組み立てたセレクターの動作確認です
+
+  sels = [
+    Selector_Element("a", [_AttributeSelector_Odd()]),
+    Selector_Children(Selector_Element("a", []), Selector_Element("b", [])),
+    Selector_Son(Selector_Element("a", []), Selector_Element("", [])),
+    Selector_Or([]),
+  ]
+  for sel in sels:
+    compiled = compile_selector(sel)
+    for stack in _stacks():
+      for index in range(len(stack) +2):
+        assert compiled.match(stack, index) == sel.match(stack, index)
+
+def test_compiled_selector_source_code ():
+
+  #生成されたソースコードに定数が展開されているかを検証します
+
+  compiled = compile_selector(parse_selector("p > a.read-more"))
+  source = compiled.source_code()
+  assert "'read-more'" in source
+  assert "'p'" in source
+
+def test_compile_selector_sibling ():
+
+  #兄弟結合子を含むセレクターは変換時に拒否されます
+
+  with pytest.raises(ValueError):
+    compile_selector(parse_selector("h1 + p"))
+  with pytest.raises(ValueError):
+    CompiledSelector(parse_selector("a, h1 ~ p"))
@@ -0,0 +1,71 @@
+
+import itertools
+import pytest
+from cssselector import DPMatcher, match_each, Selector_Element, Selector_Children, Selector_Son, Selector_Or, parse_selector
+
+SOURCES = [
+  "a",
+  "a b",
+  "a > b",
+  "a b > c",
+  "a > b c",
+  "a a b",
+  "* > b",
+  "a.x b",
+  "a, b > c",
+  "a b, c",
+]
+
+def _stacks ():
+  for size in range(0, 5):
+    for tags in itertools.product("abc", repeat=size):
+      yield [(tag, {"class": "x"} if i % 2 else {}) for i, tag in enumerate(tags)]
+
+def test_dp_matcher ():
+
+  #parse_selector で作成したセレクターと判定結果が一致するかを検証します
+
+  for source in SOURCES:
+    sel = parse_selector(source)
+    dp_sel = DPMatcher(sel)
+    for stack in _stacks():
+      for match_anywhere, match_children in itertools.product([True, False], repeat=2):
+        for index in range(len(stack) +3):
+          expected = sel.match(stack, index, match_anywhere=match_anywhere, match_children=match_children)
+          actual = dp_sel.match(stack, index, match_anywhere=match_anywhere, match_children=match_children)
+          assert actual == expected, (source, stack, index, match_anywhere, match_children)
+
+def test_dp_matcher_combinators ():
+
+  #結合子を直接組み立てたセレクターの判定結果が一致するかを検証します
+
+  sels = [
+    Selector_Children(Selector_Element("a", []), Selector_Element("b", [])),
+    Selector_Son(Selector_Element("a", []), Selector_Element("b", [])),
+    Selector_Or([Selector_Element("a", []), Selector_Element("b", [])]),
+  ]
+  for sel in sels:
+    dp_sel = DPMatcher(sel)
+    for stack in _stacks():
+      for index in range(len(stack) +3):
+        assert dp_sel.match(stack, index) == sel.match(stack, index)
+
+def test_dp_matcher_deep_stack ():
+
+  #深いスタックに対しても現実的な時間で判定できるかを検証します
+
+  sel = DPMatcher(parse_selector("div div div div span"))
+  stack = [("div", {})] * 500
+  assert sel.match(stack) == False
+  assert sel.match(stack + [("span", {})]) == True
+  assert sel.match(stack + [("span", {}), ("b", {})]) == False
+  assert sel.match(stack + [("span", {}), ("b", {})], match_children=True) == True
+
+def test_dp_matcher_sibling ():
+
+  #兄弟結合子を含むセレクターは作成時に拒否されます
+
+  with pytest.raises(ValueError):
+    DPMatcher(parse_selector("h1 + p"))
+  with pytest.raises(ValueError):
+    match_each([parse_selector("a"), parse_selector("div, h1 ~ p")], [("p", {})])
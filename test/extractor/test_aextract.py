@@ -0,0 +1,81 @@
+import asyncio
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+from cssselector import SelectorSet, aextract, extract, parse_selector
+
+HTML = """
+<html>
+  <body>
+    <p><a href="/1">あいう</a><a>Never</a></p>
+    <p><a href="/2">Second</a></p>
+  </body>
+</html>
+""".encode("utf-8")
+
+async def _chunks (data:bytes, size:int, pulled:list | None=None):
+  for i in range(0, len(data), size):
+    if pulled is not None:
+      pulled.append(i)
+    await asyncio.sleep(0)
+    yield data[i:i +size]
+
+async def _collect (selector, chunks, **kwargs) -> list:
+  return [extraction async for extraction in aextract(selector, chunks, **kwargs)]
+
+def test_aextract ():
+
+  #同期版の extract と同じ結果が得られます
+
+  selector = parse_selector("p > a[href]")
+  expected = list(extract(selector, [HTML[i:i +5] for i in range(0, len(HTML), 5)]))
+  assert [e.data for e in expected] == ["あいう", "Second"]
+  assert asyncio.run(_collect(selector, _chunks(HTML, 5))) == expected
+
+  #Executor と SelectorSet を指定した場合の動作確認です
+
+  selector_set = SelectorSet([(parse_selector("a[href]"), "link")])
+  with ThreadPoolExecutor(1) as executor:
+    extractions = asyncio.run(_collect(selector_set, _chunks(HTML, 3), executor=executor))
+  assert [(e.selector, e.data) for e in extractions] == [("link", "あいう"), ("link", "Second")]
+
+def test_aextract_backpressure ():
+
+  #消費が止まっている間は max_pending 個を超えて読み込みません
+
+  async def main ():
+    pulled = []
+    data = HTML * 50
+    iterator = aextract(parse_selector("p > a[href]"), _chunks(data, 4, pulled), max_pending=2)
+    await iterator.__anext__()
+    count = len(pulled)
+    for _ in range(20):
+      await asyncio.sleep(0)
+    assert len(pulled) <= count + 3
+    assert len(pulled) < len(data) // 4
+    await iterator.aclose()
+
+  asyncio.run(main())
+
+def test_aextract_errors ():
+
+  #読み込み中の例外は呼び出し元に伝わります
+
+  async def broken ():
+    yield b"<p><a href=''>x</a>"
+    raise OSError("connection reset")
+
+  with pytest.raises(OSError):
+    asyncio.run(_collect(parse_selector("a"), broken()))
+
+  #途中で打ち切ると読み込みも止まります
+
+  async def main ():
+    pulled = []
+    async for extraction in aextract(parse_selector("a[href]"), _chunks(HTML * 100, 8, pulled), max_pending=1):
+      break
+    count = len(pulled)
+    for _ in range(10):
+      await asyncio.sleep(0)
+    assert len(pulled) == count
+
+  asyncio.run(main())
@@ -0,0 +1,61 @@
+
+import pytest
+from cssselector import Extraction, SelectorSet, extract, parse_selector
+
+HTML = """
+<html>
+  <head></head>
+  <body>
+    <h1></h1>
+    <p>
+      <a>Never Extract...</a>
+      <a href="">Should Extract!</a>
+    </p>
+  </body>
+</html>
+"""
+
+def test_extract ():
+
+  #README の TextExtractor と同じ結果が得られるかを検証します
+
+  extractions = list(extract(parse_selector("p > a[href]"), [HTML]))
+  assert [e.data for e in extractions] == ["Should Extract!"]
+  assert [e.tag for e in extractions[0].element_stack] == ["html", "body", "p", "a"]
+
+  #断片の境界が任意の位置にある場合の動作確認です
+
+  chunks = [HTML[i:i +7] for i in range(0, len(HTML), 7)]
+  assert [e.data for e in extract(parse_selector("p > a[href]"), chunks)] == ["Should Extract!"]
+
+  #bytes の断片を逐次デコードする場合の動作確認です
+
+  source = "<p><a href=''>日本語</a></p>".encode("utf-8")
+  chunks = [source[i:i +1] for i in range(len(source))]
+  assert "".join(e.data for e in extract(parse_selector("p > a"), chunks)) == "日本語"
+
+def test_extract_void_elements ():
+
+  #終了タグをもたない空要素がスタックに残らないかを検証します
+
+  html = "<p>a<br>b<img src='x'>c<br/>d</p><p>e</p>"
+  assert [e.data for e in extract(parse_selector("p"), [html])] == ["a", "b", "c", "d", "e"]
+  assert [e.data for e in extract(parse_selector("br"), [html])] == []
+
+def test_extract_unbalanced ():
+
+  #対応しない終了タグを含む場合の動作確認です
+
+  html = "<div><p><b>x</p>y</span></div>z"
+  extractions = list(extract(parse_selector("div"), [html]))
+  assert [e.data for e in extractions] == ["y"]
+  assert [e.data for e in extract(parse_selector("div b"), [html])] == ["x"]
+
+def test_extract_selector_set ():
+
+  #SelectorSet を用いた場合は対応する値が返されます
+
+  selector_set = SelectorSet([(parse_selector("p > a"), "link"), (parse_selector("a[href]"), "href")])
+  extractions = list(extract(selector_set, [HTML]))
+  assert [(e.selector, e.data) for e in extractions] == [("link", "Never Extract..."), ("link", "Should Extract!"), ("href", "Should Extract!")]
+  assert isinstance(extractions[0], Extraction)
@@ -0,0 +1,120 @@
+import random
+import pytest
+from cssselector import FlatDocument, StreamMatcher, parse_selector, select_all
+
+SOURCES = [
+  "a",
+  "*",
+  ".x",
+  "#i1",
+  "a.x",
+  "a b",
+  "a > b",
+  "a b > c.y",
+  "a > a > b",
+  "b[data-k=\"1\"]",
+  "a.x.y > *[data-k] c",
+  "a > b, c.x, #i2 b",
+]
+
+SIBLING_SOURCES = [
+  "a + b",
+  "a ~ b",
+  "a > b + c",
+  "a ~ b c",
+  "a.x + b, c ~ a",
+]
+
+def _random_document (rng:random.Random, size:int) -> FlatDocument:
+  document = FlatDocument()
+  for i in range(size):
+    attrs = {}
+    if rng.random() < 0.4:
+      attrs["class"] = " ".join(rng.sample(["x", "y", "z"], rng.randint(1, 2)))
+    if rng.random() < 0.1:
+      attrs["id"] = "i{:d}".format(rng.randint(0, 3))
+    if rng.random() < 0.2:
+      attrs["data-k"] = rng.choice(["1", "2"])
+    #親要素は最後に追加した要素とその祖先要素から選びます
+    ancestors = [-1]
+    ancestor = i -1
+    while ancestor >= 0:
+      ancestors.append(ancestor)
+      ancestor = document.parents[ancestor]
+    document.append(rng.choice("abc"), attrs, rng.choice(ancestors))
+  return document
+
+def _replay (selector, document:FlatDocument) -> list[int]:
+  #文書順に要素を StreamMatcher に与えた結果です
+  matcher = StreamMatcher(selector)
+  found = []
+  for index in range(len(document)):
+    while len(matcher.element_stack) > document.depths[index]:
+      matcher.pop()
+    matcher.push(document._strings[document.tags[index]], document.attrs[index])
+    if matcher.matches():
+      found.append(index)
+  return found
+
+def test_flat_document_select_all ():
+
+  #要素ごとの ISelector.match と同じ結果になることの確認です
+
+  rng = random.Random(0)
+  for _ in range(20):
+    document = _random_document(rng, 60)
+    for source in SOURCES:
+      selector = parse_selector(source)
+      expected = [index for index in range(len(document)) if selector.match(document.element_stack(index), match_children=False)]
+      assert select_all(selector, document) == expected, source
+      expected = [index for index in range(len(document)) if selector.match(document.element_stack(index), match_anywhere=False, match_children=False)]
+      assert select_all(selector, document, match_anywhere=False) == expected, source
+
+  #兄弟結合子は StreamMatcher に文書順に与えた結果と比較します
+
+  for _ in range(20):
+    document = _random_document(rng, 60)
+    for source in SIBLING_SOURCES:
+      selector = parse_selector(source)
+      assert select_all(selector, document) == _replay(selector, document), source
+
+def test_flat_document_from_html ():
+
+  #空要素は子要素をもたず、閉じられていない要素は親要素の終了で閉じられます
+
+  document = FlatDocument.from_html(["<ul><li class='x y'>1<br>", "<b id=k>2</b></li><li>3</ul><p>4<img src=a></p>"])
+  assert [document._strings[tag] for tag in document.tags] == ["ul", "li", "br", "b", "li", "p", "img"]
+  assert list(document.parents) == [-1, 0, 1, 1, 0, -1, 5]
+  assert list(document.previous) == [-1, -1, -1, 2, 1, 0, -1]
+  assert list(document.depths) == [0, 1, 2, 2, 1, 0, 1]
+  assert [tag for tag, _ in document.element_stack(3)] == ["ul", "li", "b"]
+  assert select_all(parse_selector("ul > li.y"), document) == [1]
+  assert select_all(parse_selector("li br + #k"), document) == [3]
+  assert select_all(parse_selector("ul ~ p > img[src]"), document) == [6]
+  assert select_all(parse_selector("ol, .z"), document) == []
+
+  #親要素は最後に追加した要素かその祖先要素でなければなりません
+
+  with pytest.raises(IndexError):
+    document.append("a", {}, len(document))
+  with pytest.raises(ValueError):
+    document.append("a", {}, 2)
+
+def test_flat_document_pseudo_class ():
+
+  #疑似クラスは文書全体から確定した位置と :has() の記録で判定されます
+
+  document = FlatDocument.from_html("<ul><li class='x'>1</li><li>2<b>3</b></li><li>4</li></ul><ol><li>5</li></ol>")
+  assert select_all(parse_selector("li:first-child"), document) == [1, 6]
+  assert select_all(parse_selector("li:last-child"), document) == [4, 6]
+  assert select_all(parse_selector("li:only-child"), document) == [6]
+  assert select_all(parse_selector("ul > li:nth-child(odd)"), document) == [1, 4]
+  assert select_all(parse_selector("li:has(b)"), document) == [2]
+  assert select_all(parse_selector("*:has(> li.x)"), document) == [0]
+  assert select_all(parse_selector("li:not(.x) + li"), document) == [4]
+  assert select_all(parse_selector("li:is(ol > *)"), document) == [6]
+
+  #要素を追加すると位置は計算し直されます
+
+  document.append("li", {}, 5)
+  assert select_all(parse_selector("li:last-child"), document) == [4, 7]
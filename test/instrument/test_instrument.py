@@ -0,0 +1,51 @@
+from cssselector import parse_selector, instrument, report, InstrumentedSelector, Selector_Or, Selector_MatchAnywhere
+
+def test_instrument ():
+
+  #計測用のラッパーで包んでも結果は変わりません
+
+  selector = parse_selector("div.x > a[href], p span")
+  instrumented = instrument(selector)
+  stacks = [
+    [("div", {"class": "x"}), ("a", {"href": ""})],
+    [("p", {}), ("b", {}), ("span", {})],
+    [("div", {}), ("a", {"href": ""})],
+    [],
+  ]
+  for stack in stacks:
+    assert instrumented.match(stack) == selector.match(stack)
+    assert instrumented.match(stack, match_children=True) == selector.match(stack, match_children=True)
+
+  #元のセレクターは変更されません
+
+  assert type(selector) is Selector_Or
+  assert all(type(sel) is Selector_MatchAnywhere for sel in selector.selectors)
+
+def test_instrument_report ():
+
+  #ノードごとの呼び出し回数と一致した回数の確認です
+
+  instrumented = instrument(parse_selector("div.x > a"))
+  assert instrumented.match([("div", {"class": "x"}), ("a", {})])
+  assert not instrumented.match([("div", {}), ("a", {})])
+  stats = report(instrumented, format="dict")
+  assert stats["0"]["node"] == "Selector_MatchAnywhere"
+  assert (stats["0"]["calls"], stats["0"]["successes"]) == (2, 1)
+  assert stats["0.0"]["node"] == "Selector_Son"
+  assert stats["0.0.0"]["node"] == "Selector_Element('div')"
+  assert (stats["0.0.0"]["calls"], stats["0.0.0"]["successes"]) == (3, 1)
+  assert stats["0.0.0.0"]["node"] == "AttributeSelector_ContainsWithSeparator(name='class', value='x')"
+  assert (stats["0.0.0.0"]["calls"], stats["0.0.0.0"]["successes"]) == (2, 1)
+  assert all(0 <= value["seconds"] for value in stats.values())
+
+  #表形式では木構造が字下げで表現されます
+
+  lines = report(instrumented).splitlines()
+  assert lines[0].split() == ["node", "calls", "successes", "seconds"]
+  assert lines[1].startswith("Selector_MatchAnywhere ")
+  assert lines[2].startswith("  Selector_Son ")
+
+  #計測結果の初期化の確認です
+
+  instrumented.reset()
+  assert all(value["calls"] == 0 for value in report(instrumented, format="dict").values())
@@ -0,0 +1,73 @@
+import itertools
+from dataclasses import dataclass
+from cssselector import parse_selector, match_each, SelectorInternTable, ISelector, Selector_Element, Selector_Son, AttributeSelector_HasName
+
+def test_intern_table ():
+
+  #構造の等しい部分木は同じインスタンスになります
+
+  table = SelectorInternTable()
+  a = parse_selector("div.content > p, a[href]", intern_table=table)
+  b = parse_selector("div.content a, a[href]", intern_table=table)
+  assert a.selectors[0].selector.cur_selector is b.selectors[0].selector.cur_selector
+  assert a.selectors[1] is b.selectors[1]
+  assert a.selectors[0].selector.cur_selector.attribute_selectors[0] is b.selectors[0].selector.cur_selector.attribute_selectors[0]
+
+  #同じコードからは同じインスタンスが作成されます
+
+  assert parse_selector("div.content > p", intern_table=table) is a.selectors[0]
+  assert parse_selector("div.content > p, a[href]", intern_table=table) is a
+
+  #表を用いてもパースの結果は変わりません
+
+  assert a == parse_selector("div.content > p, a[href]")
+  assert b == parse_selector("div.content a, a[href]")
+
+  #個別に作成したノードも登録できます
+
+  element = table.intern(Selector_Element("a", [AttributeSelector_HasName("href")]))
+  assert element is a.selectors[1].selector.cur_selector
+  info = table.info()
+  assert info.currsize == len(table)
+  assert 0 < info.hits
+  table.clear()
+  assert len(table) == 0
+
+def test_match_each ():
+
+  #まとめて評価した結果は個別に評価した結果と一致します
+
+  table = SelectorInternTable()
+  sources = ["div.content > p", "div.content a", "div.content p a[href]", "article > p", "a[href]", "div.content"]
+  selectors = [parse_selector(source, intern_table=table) for source in sources]
+  tags = [("div", {"class": "content"}), ("p", {}), ("a", {"href": ""}), ("article", {})]
+  for depth in range(4):
+    for stack in itertools.product(tags, repeat=depth):
+      stack = list(stack)
+      for match_anywhere, match_children in itertools.product([True, False], repeat=2):
+        expected = [sel.match(stack, match_anywhere=match_anywhere, match_children=match_children) for sel in selectors]
+        assert match_each(selectors, stack, match_anywhere=match_anywhere, match_children=match_children) == expected
+
+@dataclass(frozen=True)
+class _CountingLeaf (ISelector):
+
+  calls = [0]
+
+  def __hash__ (self) -> int:
+    self.calls[0] += 1
+    return 0
+
+  def match (self, element_stack, index:int=0, *, match_anywhere:bool=True, match_children:bool=False) -> bool:
+    return False
+
+def test_intern_table_hash ():
+
+  #登録済みの部分木のハッシュ値は、親ノードを登録する際に計算し直されません
+
+  table = SelectorInternTable()
+  node = table.intern(_CountingLeaf())
+  _CountingLeaf.calls[0] = 0
+  for _ in range(100):
+    node = table.intern(Selector_Son(Selector_Element("a", []), node))
+  assert _CountingLeaf.calls[0] == 0
+  assert len(table) == 102
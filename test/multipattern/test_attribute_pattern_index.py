@@ -0,0 +1,56 @@
+import random
+import itertools
+from cssselector import parse_selector, AhoCorasick, AttributePatternIndex, SelectorSet, AttributeSelector_StartsWith, AttributeSelector_EndsWith, AttributeSelector_ContainsAnywhere, AttributeSelector_Equal
+import pytest
+
+def test_aho_corasick ():
+
+  #重なり合うパターンも全て見つかります
+
+  automaton = AhoCorasick(["he", "she", "hers", "his", ""])
+  assert automaton.search("ushers") == {0, 1, 2, 4}
+  assert automaton.search("") == {4}
+
+  #総当たりの結果と比較します
+
+  rng = random.Random(0)
+  for _ in range(500):
+    patterns = ["".join(rng.choice("ab") for _ in range(rng.randint(1, 4))) for _ in range(8)]
+    text = "".join(rng.choice("abc") for _ in range(rng.randint(0, 16)))
+    assert AhoCorasick(patterns).search(text) == {i for i, pattern in enumerate(patterns) if pattern in text}
+
+def test_attribute_pattern_index ():
+
+  #登録された全ての属性セレクターの結果と一致します
+
+  rng = random.Random(1)
+  types = [AttributeSelector_StartsWith, AttributeSelector_EndsWith, AttributeSelector_ContainsAnywhere]
+  selectors = [
+    rng.choice(types)(rng.choice(["href", "src"]), "".join(rng.choice("ab/") for _ in range(rng.randint(0, 3))))
+    for _ in range(60)
+  ]
+  index = AttributePatternIndex()
+  for i, sel in enumerate(selectors):
+    index.add(sel, i)
+  assert len(index) == len(selectors)
+  for _ in range(300):
+    attrs = {name: "".join(rng.choice("ab/c") for _ in range(rng.randint(0, 10))) for name in ("href", "src", "alt") if rng.random() < 0.7}
+    assert sorted(index.match(attrs)) == [i for i, sel in enumerate(selectors) if sel.match(attrs)]
+
+  #対応していない属性セレクターは登録できません
+
+  with pytest.raises(TypeError):
+    index.add(AttributeSelector_Equal("href", "/"), -1)
+
+def test_selector_set_patterns ():
+
+  #部分一致などで分類されたセレクターの判定結果の確認です
+
+  sources = ["[href*=\"ads\"]", "a[href^=\"https:\"]", "div > img[src$=\".gif\"]", "a.x[href*=\"ads\"]", "[href*=\"\"]", "p a[href$=\"/\"]"]
+  selector_set = SelectorSet((parse_selector(source), source) for source in sources)
+  tags = [("div", {}), ("p", {}), ("a", {"href": "https://ads.example/"}), ("a", {"href": "/ads", "class": "x"}), ("img", {"src": "/a.gif"}), ("a", {})]
+  for depth in range(4):
+    for stack in itertools.product(tags, repeat=depth):
+      stack = list(stack)
+      expected = [source for source in sources if parse_selector(source).match(stack, match_children=False)]
+      assert selector_set.match(stack) == expected
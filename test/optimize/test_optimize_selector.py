@@ -0,0 +1,79 @@
+import itertools
+from cssselector import parse_selector, optimize_selector, flatten_selector, extract, compile_selector, DPMatcher, Selector_Element, Selector_Children, Selector_Son, Selector_MatchAnywhere, Selector_MatchLast, Selector_Or, AttributeSelector_Equal, AttributeSelector_StartsWith, AttributeSelector_ContainsAnywhere, AttributeSelector_ContainsWithSeparator
+
+def test_optimize_attribute_selectors ():
+
+  #計算量の見積もりが小さい順に並べ替えられます
+
+  sel = optimize_selector(parse_selector("a[data-x*=\"foo\"][href^=\"/\"].hot#main"))
+  assert sel.selector.cur_selector.attribute_selectors == (
+    AttributeSelector_Equal("id", "main"),
+    AttributeSelector_ContainsWithSeparator("class", "hot"),
+    AttributeSelector_StartsWith("href", "/"),
+    AttributeSelector_ContainsAnywhere("data-x", "foo"),
+  )
+
+  #重複した判定と不要な存在確認は取り除かれます
+
+  sel = optimize_selector(parse_selector("a.hot.hot[href][href^=\"/\"][title]"))
+  assert [type(attr).__name__ for attr in sel.selector.cur_selector.attribute_selectors] == [
+    "AttributeSelector_HasName",
+    "AttributeSelector_ContainsWithSeparator",
+    "AttributeSelector_StartsWith",
+  ]
+
+def test_optimize_or ():
+
+  #共通する先頭の部分が括り出されます
+
+  sel = optimize_selector(parse_selector("div p a, div p b"))
+  assert sel == Selector_MatchAnywhere(
+    Selector_Children(
+      Selector_Element("div", []),
+      Selector_Children(
+        Selector_Element("p", []),
+        Selector_Or([
+          Selector_Son(Selector_Element("a", []), Selector_MatchLast()),
+          Selector_Son(Selector_Element("b", []), Selector_MatchLast()),
+        ]),
+      ),
+    ),
+  )
+
+  #重複した選択肢は1つにまとめられます
+
+  assert optimize_selector(parse_selector("div > a, div > a")) == parse_selector("div > a")
+
+def test_optimize_equivalence ():
+
+  #組み替えたセレクターは元のセレクターと同じ結果を返します
+
+  sources = [
+    "div p a, div p b, div > p a[href], div span",
+    "a[data-x*=\"o\"].hot, a.hot, a, a > b, a b",
+    "div.x > p, div.x p, div.x, div.y > p",
+    "p, p > a, p a, a[href][href=\"/\"][href^=\"/\"]",
+  ]
+  tags = [("div", {"class": "x"}), ("div", {"class": "y"}), ("p", {}), ("a", {"href": "/", "class": "hot", "data-x": "foo"}), ("a", {}), ("b", {}), ("span", {})]
+  for source in sources:
+    original = parse_selector(source)
+    optimized = optimize_selector(original)
+    matchers = [optimized, DPMatcher(optimized), compile_selector(optimized)]
+    for depth in range(4):
+      for stack in itertools.product(tags, repeat=depth):
+        stack = list(stack)
+        for match_anywhere, match_children in itertools.product([True, False], repeat=2):
+          expected = original.match(stack, match_anywhere=match_anywhere, match_children=match_children)
+          for matcher in matchers:
+            assert matcher.match(stack, match_anywhere=match_anywhere, match_children=match_children) == expected, (source, stack)
+
+def test_optimize_sibling ():
+
+  #兄弟結合子を含む選択肢は括り出されず、 extract で同じ結果が得られます
+
+  html = "<div><h1>t</h1><p>1</p><a>2</a><h1>u</h1><a>3</a><p>4</p></div><h2>v</h2><p>5</p>"
+  for source in ["h1 + p, h1 + a", "div > h1 ~ p, div > h1 + a, h2 + p", "h1 + p[x][x=\"1\"], p"]:
+    original = parse_selector(source)
+    optimized = optimize_selector(original)
+    assert flatten_selector(optimized, siblings=True) is not None, source
+    assert [e.data for e in extract(optimized, [html])] == [e.data for e in extract(original, [html])], source
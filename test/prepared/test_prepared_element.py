@@ -0,0 +1,57 @@
+
+import pytest
+from cssselector import PreparedAttributes, PreparedElement, AttributeSelector_ContainsWithSeparator, parse_selector, compile_selector
+
+def test_prepared_attributes ():
+
+  #トークン集合が事前に計算されるかを検証します
+
+  attrs = PreparedAttributes({"id": "main", "class": " a\tb  c ", "rel": "x y"})
+  assert attrs == {"id": "main", "class": " a\tb  c ", "rel": "x y"}
+  assert attrs.id == "main"
+  assert attrs.classes == frozenset(["a", "b", "c"])
+  assert attrs.tokens("rel") == frozenset(["x", "y"])
+  assert attrs.tokens("rel") is attrs.tokens("rel")
+
+  attrs = PreparedAttributes()
+  assert attrs.id is None
+  assert attrs.classes == frozenset()
+
+def test_prepared_element ():
+
+  #要素名と属性から作成した場合の動作確認です
+
+  element = PreparedElement.prepare("div", [("class", "x y"), ("hidden", None)])
+  assert element.tag == "div"
+  assert element.attrs == {"class": "x y", "hidden": ""}
+  assert element.classes == frozenset(["x", "y"])
+  assert element.id is None
+  tag, attrs = element
+  assert tag == "div"
+  assert isinstance(attrs, PreparedAttributes)
+
+  #属性セレクターがトークン集合を参照するかを検証します
+
+  sel = AttributeSelector_ContainsWithSeparator("class", "y")
+  assert sel.match(element.attrs) == True
+  assert AttributeSelector_ContainsWithSeparator("class", "x y").match(element.attrs) == False
+
+  #Element の代わりにスタックの要素として使えるかを検証します
+
+  stack = [PreparedElement.prepare("p", {}), PreparedElement.prepare("a", {"class": "read-more\tlink"})]
+  for sel in (parse_selector("p > a.read-more"), compile_selector(parse_selector("p > a.read-more"))):
+    assert sel.match(stack) == True
+    assert sel.match(stack[:1]) == False
+
+def test_prepared_element_case ():
+
+  #要素名の大文字・小文字は変換されず、判定結果は Element の場合と一致します
+
+  for source in ("DIV > A", "div > a", "Div > a"):
+    sel = parse_selector(source)
+    for tags in (("DIV", "A"), ("div", "a"), ("Div", "a")):
+      stack = [(tag, {}) for tag in tags]
+      prepared = [PreparedElement.prepare(tag, attrs) for tag, attrs in stack]
+      assert sel.match(prepared) == sel.match(stack), (source, tags)
+  assert parse_selector("DIV").match([PreparedElement.prepare("DIV", {})]) == True
+  assert PreparedElement.prepare("DIV", {}).tag == "DIV"
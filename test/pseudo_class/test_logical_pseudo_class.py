@@ -0,0 +1,76 @@
+import pytest
+from cssselector import parse_selector, extract, SelectorSet, StreamMatcher, Element, PositionedElement, Selector_Element, PseudoClass_Is, PseudoClass_Not, PseudoClass_Has, AttributeSelector_ContainsWithSeparator, UndecidedError, ParseError
+
+HTML = "<div class=a><p>1</p><img></div><div class=b><p>2</p></div><div class=c><span><b>x</b></span><p>3</p></div>"
+
+def test_parse_logical_pseudo_class ():
+
+  #複合セレクターのみの引数は Selector_Element として保持されます
+
+  sel = parse_selector("p:not(.x, div > p)").selector.cur_selector
+  not_ = sel.pseudo_classes[0]
+  assert type(not_) is PseudoClass_Not
+  assert not_.selectors[0] == Selector_Element("", (AttributeSelector_ContainsWithSeparator("class", "x"),))
+  assert not_.selectors[1] == parse_selector("div > p")
+
+  #:has() は子要素と子孫要素の条件に分けて保持されます
+
+  has = parse_selector("div:has(> img, b)").selector.cur_selector.pseudo_classes[0]
+  assert has == PseudoClass_Has((Selector_Element("img", ()),), (Selector_Element("b", ()),))
+
+  #括弧や引用符の中の区切り文字は無視されます
+
+  is_ = parse_selector("a:is([title=\"a, (b\"], :not(.x, .y))").selector.cur_selector.pseudo_classes[0]
+  assert type(is_) is PseudoClass_Is and len(is_.selectors) == 2
+
+  #:has() の引数は1つの複合セレクターに限られ、 :is() と :not() の引数は兄弟結合子を含められません
+
+  for source in ["a:has(+ b)", "a:has(b c)", "a:has(b:last-child)", "a:has(b:has(c))", "a:not(b", "p:is(h1 + p)", "p:not(h1 ~ p)", "p:is(div, div > h1 + p)", "p:not(:is(a ~ b))"]:
+    with pytest.raises(ParseError):
+      parse_selector(source)
+
+def test_match_logical_pseudo_class ():
+
+  #:is() と :not() はスタックのみで判定できます
+
+  stack = [("div", {"class": "c"}), ("span", {}), ("b", {})]
+  assert parse_selector(":is(div.c span) b").match(stack) == True
+  assert parse_selector("div:not(.c) b").match(stack) == False
+  assert parse_selector("div:is(.a, .c) > span").match(stack[:2]) == True
+
+  #:has() は子要素の情報がなければ判定できません
+
+  with pytest.raises(UndecidedError):
+    parse_selector("div:has(b)").match(stack)
+
+def test_extract_logical_pseudo_class ():
+
+  #:has() は条件を満たす要素が現れるか、要素が閉じられた時点で判定されます
+
+  cases = {
+    "div:has(> img) p": ["1"],
+    "div:has(b) p": ["3"],
+    "div:not(:has(img)) p": ["2", "3"],
+    "div:has(> p, > img) p": ["1", "2", "3"],
+    "div:not(.a, .c) p": ["2"],
+    "p:not(:first-child)": ["3"],
+  }
+  for source, expected in cases.items():
+    assert [e.data for e in extract(parse_selector(source), HTML)] == expected, source
+    assert [e.data for e in extract(SelectorSet([(parse_selector(source), source)]), HTML)] == expected, source
+
+  #保留できる数を超えると UndecidedError が送出されます
+
+  with pytest.raises(UndecidedError):
+    list(extract(parse_selector("div:has(img) p"), "<div>" + "<p>x</p>" * 10 + "<img></div>", max_deferred=4))
+
+def test_plain_selector_without_positions ():
+
+  #疑似クラスを含まないセレクターでは要素の位置を追跡しません
+
+  matcher = StreamMatcher(parse_selector("div p"))
+  matcher.push("div", {})
+  assert type(matcher.element_stack[-1]) is Element
+  matcher = StreamMatcher(parse_selector("div:has(p)"))
+  matcher.push("div", {})
+  assert type(matcher.element_stack[-1]) is PositionedElement
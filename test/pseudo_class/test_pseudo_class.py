@@ -0,0 +1,62 @@
+import pytest
+from cssselector import parse_selector, parse_pseudo_class, PseudoClass_NthChild, PseudoClass_NthLastChild, PositionedElement, SiblingCounter, ParseError
+
+def test_parse_pseudo_class ():
+
+  #各疑似クラスは an+b の形式に正規化されます
+
+  cases = {
+    ":first-child": (PseudoClass_NthChild(0, 1),),
+    ":last-child": (PseudoClass_NthLastChild(0, 1),),
+    ":only-child": (PseudoClass_NthChild(0, 1), PseudoClass_NthLastChild(0, 1)),
+    ":first-of-type": (PseudoClass_NthChild(0, 1, True),),
+    ":last-of-type": (PseudoClass_NthLastChild(0, 1, True),),
+    ":nth-child(odd)": (PseudoClass_NthChild(2, 1),),
+    ":nth-child(even)": (PseudoClass_NthChild(2, 0),),
+    ":nth-child(3)": (PseudoClass_NthChild(0, 3),),
+    ":nth-child(-n + 3)": (PseudoClass_NthChild(-1, 3),),
+    ":nth-child(2n-1)": (PseudoClass_NthChild(2, -1),),
+    ":nth-last-of-type( n )": (PseudoClass_NthLastChild(1, 0, True),),
+  }
+  for source, expected in cases.items():
+    assert parse_pseudo_class(source, 0, len(source)) == (expected, len(source))
+
+  #複合セレクターの条件として読み込まれます
+
+  sel = parse_selector("ul > li.x:nth-child(2n+1)").selector.next_selector.cur_selector
+  assert sel.tag == "li"
+  assert sel.pseudo_classes == (PseudoClass_NthChild(2, 1),)
+
+  #未対応の疑似クラスや不正な an+b は読み込めません
+
+  for source in ["a:hover", "a:nth-child(x)", "a:nth-child(2n+1", "a:nth-child()"]:
+    with pytest.raises(ParseError):
+      parse_selector(source)
+
+def test_pseudo_class_match ():
+
+  #an+b を満たす位置でのみ一致します
+
+  for a, b in [(0, 1), (0, 3), (2, 1), (2, 0), (-1, 3), (3, -1), (1, 0)]:
+    counter = SiblingCounter()
+    elements = [PositionedElement("li", {}, counter.count("li"), SiblingCounter()) for _ in range(10)]
+    counter.closed = True
+    expected = {a * k + b for k in range(20)}
+    assert [PseudoClass_NthChild(a, b).match([e], 0) for e in elements] == [i +1 in expected for i in range(10)]
+    assert [PseudoClass_NthLastChild(a, b).match([e], 0) for e in elements] == [10 - i in expected for i in range(10)]
+
+def test_pseudo_class_undecided ():
+
+  #末尾からの位置は兄弟要素の数が確定するまで判定を保留します
+
+  counter = SiblingCounter()
+  stack = [PositionedElement("li", {}, counter.count("li"), SiblingCounter())]
+  assert PseudoClass_NthLastChild(0, 1).match(stack, 0) is None
+  assert PseudoClass_NthLastChild(2, 1).match(stack, 0) is None
+  counter.count("p")
+  #上限のある条件は、それを超える兄弟要素が現れた時点で判定できます
+  assert PseudoClass_NthLastChild(0, 1).match(stack, 0) == False
+  assert PseudoClass_NthLastChild(0, 1, True).match(stack, 0) is None
+  counter.closed = True
+  assert PseudoClass_NthLastChild(0, 1, True).match(stack, 0) == True
+  assert PseudoClass_NthLastChild(2, 1).match(stack, 0) == False
@@ -0,0 +1,65 @@
+
+import itertools
+import pytest
+from cssselector import RightToLeftMatcher, Selector_Element, Selector_Children, parse_selector
+
+SOURCES = [
+  "a",
+  "a b",
+  "a > b",
+  "a b > c",
+  "a > b c",
+  "a a b",
+  "a > a > b",
+  "* > b",
+  "a.x b",
+  "a, b > c",
+  "a b, c",
+]
+
+def _stacks ():
+  for size in range(0, 5):
+    for tags in itertools.product("abc", repeat=size):
+      yield [(tag, {"class": "x"} if i % 2 else {}) for i, tag in enumerate(tags)]
+
+def test_rtl_matcher ():
+
+  #parse_selector で作成したセレクターと判定結果が一致するかを検証します
+
+  for source in SOURCES:
+    sel = parse_selector(source)
+    rtl_sel = RightToLeftMatcher(sel)
+    assert rtl_sel.chains is not None
+    for stack in _stacks():
+      for match_anywhere, match_children in itertools.product([True, False], repeat=2):
+        expected = sel.match(stack, match_anywhere=match_anywhere, match_children=match_children)
+        actual = rtl_sel.match(stack, match_anywhere=match_anywhere, match_children=match_children)
+        assert actual == expected, (source, stack, match_anywhere, match_children)
+
+def test_rtl_matcher_fallback ():
+
+  #展開できない木構造が与えられた場合は元のセレクターで判定します
+
+  sel = Selector_Children(Selector_Element("a", []), Selector_Element("b", []))
+  rtl_sel = RightToLeftMatcher(sel)
+  assert rtl_sel.chains is None
+  assert rtl_sel.match([("a", {}), ("x", {}), ("b", {})]) == True
+  assert rtl_sel.match([("b", {}), ("a", {})]) == False
+
+def test_rtl_matcher_deep_stack ():
+
+  #深いスタックに対しても現実的な時間で判定できるかを検証します
+
+  sel = RightToLeftMatcher(parse_selector("div div div div > span"))
+  stack = [("div", {})] * 500
+  assert sel.match(stack) == False
+  assert sel.match(stack + [("span", {})]) == True
+  assert sel.match(stack + [("p", {}), ("span", {})]) == False
+  assert sel.match(stack + [("span", {}), ("b", {})], match_children=True) == True
+
+def test_rtl_matcher_sibling ():
+
+  #兄弟結合子を含むセレクターは作成時に拒否されます
+
+  with pytest.raises(ValueError):
+    RightToLeftMatcher(parse_selector("div > h1 ~ p"))
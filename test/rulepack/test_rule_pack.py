@@ -0,0 +1,86 @@
+import itertools
+import pytest
+from cssselector import parse_selector, dumps_rule_pack, loads_rule_pack, save_rule_pack, load_rule_pack, SelectorSet, RulePackError, Selector_Element
+
+SOURCES = [
+  "p > a.read-more",
+  "div#main section p a[href^=\"/\"][href$=\".html\"]",
+  "a[data-x*=\"あ\"], img[src][alt~=\"logo\"], *[title=\"a &quot;b&quot;\"]",
+  "ul li, ul > li > a",
+]
+
+def test_rule_pack_round_trip (tmp_path):
+
+  #保存したセレクターと値がそのまま復元されます
+
+  rules = [(parse_selector(source), {"source": source, "index": i}) for i, source in enumerate(SOURCES)]
+  rules.append((parse_selector("p"), None))
+  path = str(tmp_path / "rules.pack")
+  save_rule_pack(path, rules)
+  loaded = load_rule_pack(path)
+  assert loaded == rules
+  assert loads_rule_pack(dumps_rule_pack(rules)) == rules
+
+  #復元したセレクターは元のセレクターと同じ結果を返します
+
+  tags = [("div", {"id": "main"}), ("ul", {}), ("li", {}), ("p", {}), ("a", {"href": "/x.html", "class": "read-more"}), ("img", {"src": "", "alt": "logo"})]
+  original = SelectorSet(rules)
+  restored = SelectorSet(loaded)
+  for depth in range(4):
+    for stack in itertools.product(tags, repeat=depth):
+      stack = list(stack)
+      assert restored.match(stack) == original.match(stack)
+
+  #同じ構造の部分木は共有されます
+
+  a, b = [selector for selector, _ in loads_rule_pack(dumps_rule_pack([(parse_selector("div p"), 1), (parse_selector("span p"), 2)]))]
+  assert a.selector.next_selector is b.selector.next_selector
+
+def test_rule_pack_errors (tmp_path):
+
+  #壊れた規則パックは読み込めません
+
+  data = dumps_rule_pack([(parse_selector(source), i) for i, source in enumerate(SOURCES)])
+  with pytest.raises(RulePackError):
+    loads_rule_pack(b"NOTAPACK" + data[8:])
+  with pytest.raises(RulePackError):
+    loads_rule_pack(data[:8] + b"\x02\x00" + data[10:])
+  with pytest.raises(RulePackError):
+    loads_rule_pack(data[:-1] + bytes([data[-1] ^ 1]))
+  with pytest.raises(RulePackError):
+    loads_rule_pack(data[:-4])
+  with pytest.raises(RulePackError):
+    loads_rule_pack(b"")
+  path = tmp_path / "empty.pack"
+  path.write_bytes(b"")
+  with pytest.raises(RulePackError):
+    load_rule_pack(str(path))
+
+  #保存できないノードは拒否されます
+
+  class Custom (Selector_Element):
+    pass
+
+  with pytest.raises(RulePackError):
+    dumps_rule_pack([(Custom("a", []), 0)])
+
+def test_rule_pack_sibling ():
+
+  #兄弟結合子を含むセレクターも保存できます
+
+  rules = [(parse_selector("h1 + p ~ a, div > h2 + p"), "sibling")]
+  assert loads_rule_pack(dumps_rule_pack(rules)) == rules
+
+def test_rule_pack_pseudo_class ():
+
+  #疑似クラスを含むセレクターも保存できます
+
+  rules = [(parse_selector("ul > li:nth-child(-2n+3):last-of-type a, :only-child"), "pseudo")]
+  assert loads_rule_pack(dumps_rule_pack(rules)) == rules
+
+def test_rule_pack_logical_pseudo_class ():
+
+  #:is() ・ :not() ・ :has() を含むセレクターも保存できます
+
+  rules = [(parse_selector("div:has(> img, b.x):not(.a, div > p:first-child) p:is(.x)"), "logical")]
+  assert loads_rule_pack(dumps_rule_pack(rules)) == rules
@@ -153,7 +153,7 @@ def test_build ():
   assert isinstance(sel.selector, Selector_Son)
   assert isinstance(sel.selector.cur_selector, Selector_Element)
   assert sel.selector.cur_selector.tag == "a"
-  assert sel.selector.cur_selector.attribute_selectors == []
+  assert sel.selector.cur_selector.attribute_selectors == ()
   assert isinstance(sel.selector.next_selector, Selector_MatchLast)
 
   #read_selector_stack, combination_selector_type_stack 両方に値を設定した場合の動作確認です
@@ -163,11 +163,11 @@ def test_build ():
   assert isinstance(sel.selector, Selector_Children)
   assert isinstance(sel.selector.cur_selector, Selector_Element)
   assert sel.selector.cur_selector.tag == "a"
-  assert sel.selector.cur_selector.attribute_selectors == []
+  assert sel.selector.cur_selector.attribute_selectors == ()
   assert isinstance(sel.selector.next_selector, Selector_Son)
   assert isinstance(sel.selector.next_selector.cur_selector, Selector_Element)
   assert sel.selector.next_selector.cur_selector.tag == "b"
-  assert sel.selector.next_selector.cur_selector.attribute_selectors == []
+  assert sel.selector.next_selector.cur_selector.attribute_selectors == ()
   assert isinstance(sel.selector.next_selector.next_selector, Selector_MatchLast)
 
 def test_parse_selector ():
@@ -184,7 +184,7 @@ def test_parse_selector ():
   assert isinstance(sel.selector, Selector_Son)
   assert isinstance(sel.selector.cur_selector, Selector_Element)
   assert sel.selector.cur_selector.tag == "a"
-  assert sel.selector.cur_selector.attribute_selectors == []
+  assert sel.selector.cur_selector.attribute_selectors == ()
   assert isinstance(sel.selector.next_selector, Selector_MatchLast)
 
   #...
@@ -194,7 +194,7 @@ def test_parse_selector ():
   assert isinstance(sel.selector, Selector_Son)
   assert isinstance(sel.selector.cur_selector, Selector_Element)
   assert sel.selector.cur_selector.tag == "a"
-  assert isinstance(sel.selector.cur_selector.attribute_selectors, list)
+  assert isinstance(sel.selector.cur_selector.attribute_selectors, tuple)
   assert len(sel.selector.cur_selector.attribute_selectors) == 1
   assert isinstance(sel.selector.cur_selector.attribute_selectors[0], AttributeSelector_ContainsWithSeparator)
   assert sel.selector.cur_selector.attribute_selectors[0].name == "class"
@@ -207,7 +207,7 @@ def test_parse_selector ():
   assert isinstance(sel.selector, Selector_Son)
   assert isinstance(sel.selector.cur_selector, Selector_Element)
   assert sel.selector.cur_selector.tag == "a"
-  assert isinstance(sel.selector.cur_selector.attribute_selectors, list)
+  assert isinstance(sel.selector.cur_selector.attribute_selectors, tuple)
   assert len(sel.selector.cur_selector.attribute_selectors) == 1
   assert isinstance(sel.selector.cur_selector.attribute_selectors[0], AttributeSelector_Equal)
   assert sel.selector.cur_selector.attribute_selectors[0].name == "id"
@@ -220,7 +220,7 @@ def test_parse_selector ():
   assert isinstance(sel.selector, Selector_Son)
   assert isinstance(sel.selector.cur_selector, Selector_Element)
   assert sel.selector.cur_selector.tag == "a"
-  assert isinstance(sel.selector.cur_selector.attribute_selectors, list)
+  assert isinstance(sel.selector.cur_selector.attribute_selectors, tuple)
   assert len(sel.selector.cur_selector.attribute_selectors) == 3
   assert isinstance(sel.selector.cur_selector.attribute_selectors[0], AttributeSelector_Equal)
   assert sel.selector.cur_selector.attribute_selectors[0].name == "a"
@@ -237,11 +237,11 @@ def test_parse_selector ():
   assert isinstance(sel.selector, Selector_Children)
   assert isinstance(sel.selector.cur_selector, Selector_Element)
   assert sel.selector.cur_selector.tag == "a"
-  assert sel.selector.cur_selector.attribute_selectors == []
+  assert sel.selector.cur_selector.attribute_selectors == ()
   assert isinstance(sel.selector.next_selector, Selector_Son)
   assert isinstance(sel.selector.next_selector.cur_selector, Selector_Element)
   assert sel.selector.next_selector.cur_selector.tag == "b"
-  assert sel.selector.next_selector.cur_selector.attribute_selectors == []
+  assert sel.selector.next_selector.cur_selector.attribute_selectors == ()
   assert isinstance(sel.selector.next_selector.next_selector, Selector_MatchLast)
 
   #...
@@ -251,11 +251,11 @@ def test_parse_selector ():
   assert isinstance(sel.selector, Selector_Son)
   assert isinstance(sel.selector.cur_selector, Selector_Element)
   assert sel.selector.cur_selector.tag == "a"
-  assert sel.selector.cur_selector.attribute_selectors == []
+  assert sel.selector.cur_selector.attribute_selectors == ()
   assert isinstance(sel.selector.next_selector, Selector_Son)
   assert isinstance(sel.selector.next_selector.cur_selector, Selector_Element)
   assert sel.selector.next_selector.cur_selector.tag == "b"
-  assert sel.selector.next_selector.cur_selector.attribute_selectors == []
+  assert sel.selector.next_selector.cur_selector.attribute_selectors == ()
   assert isinstance(sel.selector.next_selector.next_selector, Selector_MatchLast)
 
   #...
@@ -265,27 +265,38 @@ def test_parse_selector ():
   assert isinstance(sel.selector, Selector_Son)
   assert isinstance(sel.selector.cur_selector, Selector_Element)
   assert sel.selector.cur_selector.tag == "abc"
-  assert sel.selector.cur_selector.attribute_selectors == []
+  assert sel.selector.cur_selector.attribute_selectors == ()
   assert isinstance(sel.selector.next_selector, Selector_MatchLast)
 
   #...
 
   sel = selector.parse_selector("a,b,c")
   assert isinstance(sel, Selector_Or)
-  assert isinstance(sel.selectors, list)
+  assert isinstance(sel.selectors, tuple)
   assert len(sel.selectors) == 3
   assert isinstance(sel.selectors[0], Selector_MatchAnywhere)
   assert isinstance(sel.selectors[0].selector, Selector_Son)
   assert isinstance(sel.selectors[0].selector.cur_selector, Selector_Element)
   assert sel.selectors[0].selector.cur_selector.tag == "a"
-  assert sel.selectors[0].selector.cur_selector.attribute_selectors == []
+  assert sel.selectors[0].selector.cur_selector.attribute_selectors == ()
   assert isinstance(sel.selectors[1], Selector_MatchAnywhere)
   assert isinstance(sel.selectors[1].selector, Selector_Son)
   assert isinstance(sel.selectors[1].selector.cur_selector, Selector_Element)
   assert sel.selectors[1].selector.cur_selector.tag == "b"
-  assert sel.selectors[1].selector.cur_selector.attribute_selectors == []
+  assert sel.selectors[1].selector.cur_selector.attribute_selectors == ()
   assert isinstance(sel.selectors[2], Selector_MatchAnywhere)
   assert isinstance(sel.selectors[2].selector, Selector_Son)
   assert isinstance(sel.selectors[2].selector.cur_selector, Selector_Element)
   assert sel.selectors[2].selector.cur_selector.tag == "c"
-  assert sel.selectors[2].selector.cur_selector.attribute_selectors == []
+  assert sel.selectors[2].selector.cur_selector.attribute_selectors == ()
+
+  #セレクターリストの各セレクターが前方のセレクターの影響を受けないかを検証します
+
+  sel = selector.parse_selector("a b, c")
+  assert isinstance(sel, Selector_Or)
+  assert len(sel.selectors) == 2
+  assert isinstance(sel.selectors[1], Selector_MatchAnywhere)
+  assert isinstance(sel.selectors[1].selector, Selector_Son)
+  assert sel.selectors[1].selector.cur_selector.tag == "c"
+  assert isinstance(sel.selectors[1].selector.next_selector, Selector_MatchLast)
+  assert sel.match([("b", {}), ("c", {})]) == True
@@ -0,0 +1,30 @@
+import pickle
+import dataclasses
+import pytest
+from cssselector import parse_selector, Selector_Element, Selector_Or, AttributeSelector_Equal
+
+def test_selector_immutable ():
+
+  #リストを与えてもタプルとして保持されます
+
+  sel = Selector_Element("a", [AttributeSelector_Equal("id", "x")])
+  assert sel.attribute_selectors == (AttributeSelector_Equal("id", "x"),)
+  assert Selector_Or([sel]).selectors == (sel,)
+
+  #インスタンスは変更できず、 __dict__ をもちません
+
+  with pytest.raises(dataclasses.FrozenInstanceError):
+    sel.tag = "b"
+  assert not hasattr(sel, "__dict__")
+  assert not hasattr(AttributeSelector_Equal("id", "x"), "__dict__")
+
+  #同じセレクターは同じハッシュ値をもち、辞書のキーとして使えます
+
+  table = {parse_selector("div.x > a[href], p"): 1}
+  assert table[parse_selector("div.x > a[href], p")] == 1
+  assert parse_selector("div.x > a") != parse_selector("div.y > a")
+
+  #pickle で複製できます
+
+  sel = parse_selector("div.x > a[href], p")
+  assert pickle.loads(pickle.dumps(sel)) == sel
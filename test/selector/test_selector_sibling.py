@@ -0,0 +1,20 @@
+import pytest
+from cssselector import parse_selector, Selector_Element, Selector_Son, Selector_NextSibling, Selector_SubsequentSibling, Selector_MatchAnywhere, Selector_MatchLast
+
+def test_parse_sibling ():
+
+  #兄弟結合子は前後の空白の有無によらず読み込まれます
+
+  for source in ["h1 + p ~ a", "h1+p~a", "h1 +p~ a"]:
+    assert parse_selector(source) == Selector_MatchAnywhere(
+      Selector_NextSibling(Selector_Element("h1", ()),
+        Selector_SubsequentSibling(Selector_Element("p", ()),
+          Selector_Son(Selector_Element("a", ()), Selector_MatchLast()))))
+
+def test_selector_sibling_match ():
+
+  #スタックには兄弟要素の情報がないため判定できません
+
+  for source in ["h1 + p", "h1 ~ p", "div > h1 + p"]:
+    with pytest.raises(ValueError):
+      parse_selector(source).match([("div", {}), ("h1", {}), ("p", {})])
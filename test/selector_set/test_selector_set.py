@@ -0,0 +1,76 @@
+
+import random
+import itertools
+import pytest
+from cssselector import SelectorSet, Selector_Element, Selector_Children, UndecidedError, parse_selector
+
+SOURCES = [
+  "a",
+  "a b",
+  "a > b",
+  "*",
+  "* > b",
+  ".x",
+  "a.x b",
+  "#y",
+  "c#y.x",
+  "[href]",
+  "a, b > c",
+  "a b, .x",
+]
+
+def _stacks ():
+  for size in range(0, 4):
+    for tags in itertools.product("abc", repeat=size):
+      for attrs in ({}, {"class": "x z"}, {"id": "y"}, {"href": ""}):
+        yield [(tag, {"class": "x"} if i % 2 else {}) for i, tag in enumerate(tags[:-1])] + [(tag, attrs) for tag in tags[-1:]]
+
+def test_selector_set ():
+
+  #各セレクターの ISelector.match と判定結果が一致するかを検証します
+
+  sels = [parse_selector(source) for source in SOURCES]
+  selector_set = SelectorSet((sel, source) for sel, source in zip(sels, SOURCES))
+  assert len(selector_set) == len(SOURCES)
+  for stack in _stacks():
+    for match_anywhere in (True, False):
+      expected = [source for sel, source in zip(sels, SOURCES) if sel.match(stack, match_anywhere=match_anywhere)]
+      assert selector_set.match(stack, match_anywhere=match_anywhere) == expected, (stack, match_anywhere)
+
+def test_selector_set_unindexed ():
+
+  #展開できない木構造は ISelector.match で判定されます
+
+  selector_set = SelectorSet()
+  selector_set.add(Selector_Children(Selector_Element("a", []), Selector_Element("b", [])), 1)
+  selector_set.add(parse_selector("b"), 2)
+  assert selector_set.match([("a", {}), ("b", {})]) == [1, 2]
+  assert selector_set.match([("b", {})]) == [2]
+  assert selector_set.match([]) == []
+
+def test_selector_set_sibling ():
+
+  #兄弟結合子を含むセレクターは StreamMatcher のビット列で判定されます
+
+  selector_set = SelectorSet([(parse_selector("h1 + p"), "next"), (parse_selector("p"), "p"), (parse_selector("h1 ~ p:last-child"), "last")])
+  matcher = selector_set.sibling_matcher()
+  matcher.push("div", {})
+  matcher.push("h1", {})
+  matcher.pop()
+  matcher.push("p", {})
+  stack = [("div", {}), ("p", {})]
+  with pytest.raises(UndecidedError):
+    selector_set.match(stack, sibling_matcher=matcher)
+  snapshot = matcher.snapshot()
+  matcher.pop()
+  matcher.push("p", {})
+  assert selector_set.match(stack, sibling_matcher=matcher, sibling_snapshot=snapshot) == ["next", "p"]
+  snapshot = matcher.snapshot()
+  matcher.close()
+  assert selector_set.match(stack, sibling_matcher=matcher, sibling_snapshot=snapshot) == ["p", "last"]
+
+  #スタックのみでは判定できないため、 StreamMatcher を指定しなければ拒否されます
+
+  with pytest.raises(ValueError):
+    selector_set.match(stack)
+  assert SelectorSet([(parse_selector("p"), 1)]).sibling_matcher() is None
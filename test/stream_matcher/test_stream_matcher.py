@@ -0,0 +1,72 @@
+
+import zlib
+import random
+import itertools
+import pytest
+from cssselector import StreamMatcher, Selector_Element, Selector_Children, parse_selector
+
+SOURCES = [
+  "a",
+  "a b",
+  "a > b",
+  "a b > c",
+  "a > b c",
+  "a a b",
+  "a > a > b",
+  "* > b",
+  "a.x b",
+  "a, b > c",
+  "a b, c",
+]
+
+def _events (seed:int, count:int):
+  rand = random.Random(seed)
+  depth = 0
+  for _ in range(count):
+    if depth and rand.random() < 0.4:
+      depth -= 1
+      yield None
+    else:
+      depth += 1
+      yield (rand.choice("abc"), {"class": "x"} if rand.random() < 0.5 else {})
+
+def test_stream_matcher ():
+
+  #要素を逐次追加・削除した際の判定結果が ISelector.match と一致するかを検証します
+
+  for source in SOURCES:
+    sel = parse_selector(source)
+    for match_anywhere, match_children in itertools.product([True, False], repeat=2):
+      matcher = StreamMatcher(sel, match_anywhere=match_anywhere, match_children=match_children)
+      stack = []
+      for event in _events(zlib.crc32(source.encode()), 300):
+        if event is None:
+          matcher.pop()
+          stack.pop()
+        else:
+          matcher.push(*event)
+          stack.append(event)
+        expected = sel.match(stack, match_anywhere=match_anywhere, match_children=match_children)
+        assert matcher.matches() == expected, (source, stack, match_anywhere, match_children)
+
+def test_stream_matcher_attrs ():
+
+  #HTMLParser 形式の属性リストを受け取った場合の動作確認です
+
+  matcher = StreamMatcher(parse_selector("input[disabled]"))
+  matcher.push("input", [("disabled", None)])
+  assert matcher.element_stack[-1].attrs == {"disabled": ""}
+  assert matcher.matches() == True
+
+def test_stream_matcher_fallback ():
+
+  #展開できない木構造が与えられた場合は保持しているスタックで判定します
+
+  matcher = StreamMatcher(Selector_Children(Selector_Element("a", []), Selector_Element("b", [])))
+  matcher.push("a", {})
+  assert matcher.matches() == False
+  matcher.push("b", {})
+  assert matcher.matches() == True
+  matcher.reset()
+  assert matcher.element_stack == []
+  assert matcher.matches() == False
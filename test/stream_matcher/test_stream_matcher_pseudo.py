@@ -0,0 +1,119 @@
+import random
+import pytest
+from cssselector import StreamMatcher, Selector_Element, Selector_Son, PseudoClass_NthChild, UndecidedError, flatten_selector, parse_selector, extract, SelectorSet
+
+SOURCES = [
+  "a:first-child",
+  "a:last-child",
+  "b:only-child",
+  "a:nth-child(2n+1) b",
+  "a > b:nth-last-child(-n+2)",
+  "a:last-of-type > b",
+  "c:nth-of-type(2), a:only-of-type c",
+  "a:nth-last-of-type(odd) b:first-child",
+]
+
+class _Node:
+
+  def __init__ (self, tag:str, parent, index:int, type_index:int):
+    self.tag = tag
+    self.parent = parent
+    self.index = index
+    self.type_index = type_index
+    self.siblings = None
+
+def _nth (a:int, b:int, n:int) -> bool:
+  return any(a * k + b == n for k in range(200))
+
+def _match_compound (compound, node:_Node) -> bool:
+  if not Selector_Element(compound.tag, compound.attribute_selectors).match([(node.tag, {})], 0):
+    return False
+  for sel in compound.pseudo_classes:
+    total = len(node.siblings) if not sel.of_type else len([n for n in node.siblings if n.tag == node.tag])
+    index = node.type_index if sel.of_type else node.index
+    n = index if type(sel) is PseudoClass_NthChild else total - index +1
+    if not _nth(sel.a, sel.b, n):
+      return False
+  return True
+
+def _match_chain (chain, i:int, node:_Node) -> bool:
+  if node is None or not _match_compound(chain.compounds[i], node):
+    return False
+  elif i == 0:
+    return True
+  elif chain.combinators[i -1] is Selector_Son:
+    return _match_chain(chain, i -1, node.parent)
+  else:
+    parent = node.parent
+    while parent is not None:
+      if _match_chain(chain, i -1, parent):
+        return True
+      parent = parent.parent
+    return False
+
+def test_stream_matcher_pseudo ():
+
+  #判定できたものは文書全体から求めた結果と一致し、保留したものは文書の終端で判定できます
+
+  for seed, source in enumerate(SOURCES):
+    sel = parse_selector(source)
+    chains = flatten_selector(sel)
+    matcher = StreamMatcher(sel)
+    rand = random.Random(seed)
+    stack = []
+    children = [[]]
+    results = []
+    for _ in range(1000):
+      if stack and rand.random() < 0.45:
+        matcher.pop()
+        stack.pop()
+        children.pop()
+      else:
+        tag = rand.choice("abc")
+        siblings = children[-1]
+        node = _Node(tag, stack[-1] if stack else None, len(siblings) +1, len([n for n in siblings if n.tag == tag]) +1)
+        siblings.append(node)
+        #兄弟要素のリストは共有されるため、文書の終端では全ての兄弟要素を含みます
+        node.siblings = siblings
+        matcher.push(tag, {})
+        stack.append(node)
+        children.append([])
+        try:
+          matched = matcher.matches()
+        except UndecidedError:
+          matched = None
+        results.append((node, tuple(matcher.element_stack), matched))
+    matcher.close()
+    undecided = 0
+    for node, element_stack, matched in results:
+      expected = any(_match_chain(chain, len(chain.compounds) -1, node) for chain in chains)
+      if matched is None:
+        undecided += 1
+        assert sel.match(list(element_stack), match_children=False) == expected, source
+      else:
+        assert matched == expected, source
+    if "last" in source or "only" in source:
+      assert undecided
+    else:
+      assert not undecided
+
+def test_extract_pseudo ():
+
+  #判定を保留したテキストも出現順を保って抽出されます
+
+  html = "<ul><li>1</li><li>2</li><li>3</li></ul><ol><li>4</li></ol><p>x<b>5</b></p>"
+  for selector in [parse_selector("li:last-child, b"), SelectorSet([(parse_selector("li:last-child, b"), "x")])]:
+    assert [e.data for e in extract(selector, html)] == ["3", "4", "5"]
+  assert [e.data for e in extract(parse_selector("li:nth-last-child(n+2)"), html)] == ["1", "2"]
+
+  #保留できる数を超えると UndecidedError が送出されます
+
+  with pytest.raises(UndecidedError):
+    list(extract(parse_selector("li:nth-last-child(odd)"), "<ul>" + "<li>x</li>" * 10 + "</ul>", max_deferred=4))
+
+def test_match_without_position ():
+
+  #位置をもたない要素に対しては疑似クラスを判定できません
+
+  with pytest.raises(UndecidedError):
+    parse_selector("li:first-child").match([("li", {})])
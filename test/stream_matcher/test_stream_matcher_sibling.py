@@ -0,0 +1,140 @@
+import random
+import pytest
+from cssselector import FlatDocument, SelectorSet, StreamMatcher, Selector_Son, Selector_Children, Selector_NextSibling, Selector_SubsequentSibling, flatten_selector, parse_selector, select_all, extract
+
+SOURCES = [
+  "a + b",
+  "a ~ b",
+  "a + a + b",
+  "a ~ b + c",
+  "a > b + c",
+  "a + b > c",
+  "a ~ b c",
+  "a b ~ c",
+  "a.x + b, c ~ a",
+]
+
+class _Node:
+
+  def __init__ (self, tag:str, attrs:dict[str, str], parent, previous:list):
+    self.tag = tag
+    self.attrs = attrs
+    self.parent = parent
+    self.previous = previous
+
+def _match_compound (chain, i:int, node:_Node) -> bool:
+  if node is None or not chain.compounds[i].match([(node.tag, node.attrs)], 0):
+    return False
+  elif i == 0:
+    return True
+  combinator = chain.combinators[i -1]
+  if combinator is Selector_Son:
+    candidates = [node.parent]
+  elif combinator is Selector_Children:
+    candidates = []
+    parent = node.parent
+    while parent is not None:
+      candidates.append(parent)
+      parent = parent.parent
+  elif combinator is Selector_NextSibling:
+    candidates = node.previous[-1:]
+  else:
+    candidates = node.previous
+  return any(_match_compound(chain, i -1, candidate) for candidate in candidates)
+
+def test_stream_matcher_sibling ():
+
+  #木構造を保持して素朴に判定した結果と一致するかを検証します
+
+  for seed, source in enumerate(SOURCES):
+    chains = flatten_selector(parse_selector(source), siblings=True)
+    matcher = StreamMatcher(parse_selector(source))
+    rand = random.Random(seed)
+    #各階層の開いている要素と、それ以前に閉じた兄弟要素のリストです
+    nodes = []
+    siblings = [[]]
+    for _ in range(2000):
+      if nodes and rand.random() < 0.45:
+        matcher.pop()
+        node = nodes.pop()
+        siblings.pop()
+        siblings[-1].append(node)
+      else:
+        tag = rand.choice("abc")
+        attrs = {"class": "x"} if rand.random() < 0.5 else {}
+        node = _Node(tag, attrs, nodes[-1] if nodes else None, list(siblings[-1]))
+        matcher.push(tag, attrs)
+        nodes.append(node)
+        siblings.append([])
+        expected = any(_match_compound(chain, len(chain.compounds) -1, node) for chain in chains)
+        assert matcher.matches() == expected, source
+
+def test_stream_matcher_sibling_reset ():
+
+  #初期状態に戻すと兄弟要素の情報も消去されます
+
+  matcher = StreamMatcher(parse_selector("a + b"))
+  matcher.push("a", {})
+  matcher.pop()
+  matcher.reset()
+  matcher.push("b", {})
+  assert matcher.matches() == False
+
+def test_extract_sibling ():
+
+  #空要素やテキストを挟んでも兄弟要素として扱われます
+
+  html = "<div><h1>t</h1>x<p>1</p><p>2</p><img><span>3</span></div><p>4</p>"
+  assert [e.data for e in extract(parse_selector("h1 + p"), html)] == ["1"]
+  assert [e.data for e in extract(parse_selector("h1 ~ p"), html)] == ["1", "2"]
+  assert [e.data for e in extract(parse_selector("img + span"), html)] == ["3"]
+  assert [e.data for e in extract(parse_selector("div ~ p"), html)] == ["4"]
+
+PSEUDO_SOURCES = [
+  "h1 ~ p:last-child",
+  "a + b:last-child",
+  "a:last-child + b",
+  "a:nth-last-child(2) ~ b",
+  "a:has(c) + b",
+  "a ~ b:only-of-type c",
+  "a:first-child + b, c:last-of-type ~ a",
+  "a:not(:last-child) ~ b:last-child",
+]
+
+def _random_html (rand:random.Random, size:int) -> tuple[str, list[str]]:
+  #各要素の先頭にその要素を識別するテキストを置きます
+  html = []
+  texts = []
+  tags = []
+  for i in range(size):
+    if tags and rand.random() < 0.45:
+      html.append("</{:s}>".format(tags.pop()))
+    else:
+      tag = rand.choice(["a", "b", "c", "h1", "p"])
+      tags.append(tag)
+      texts.append("t{:d}".format(i))
+      html.append("<{:s}>{:s}".format(tag, texts[-1]))
+  html.extend("</{:s}>".format(tag) for tag in reversed(tags))
+  return "".join(html), texts
+
+def test_extract_sibling_pseudo_class ():
+
+  #保留したテキストは保存した状態から判定し直されます
+
+  html = "<div><h1>t</h1><p>1</p><p>2</p></div><p>3</p>"
+  assert [e.data for e in extract(parse_selector("h1 ~ p:last-child"), html)] == ["2"]
+  selector_set = SelectorSet([(parse_selector("h1 + p"), "next"), (parse_selector("h1 ~ p:last-child"), "last")])
+  assert [(e.selector, e.data) for e in extract(selector_set, html)] == [("next", "1"), ("last", "2")]
+
+  #文書全体から判定した FlatDocument と結果が一致するかを検証します
+
+  rand = random.Random(0)
+  for _ in range(50):
+    html, texts = _random_html(rand, 60)
+    document = FlatDocument.from_html(html)
+    for source in PSEUDO_SOURCES:
+      selector = parse_selector(source)
+      expected = [texts[index] for index in select_all(selector, document)]
+      assert [e.data for e in extract(selector, [html])] == expected, (source, html)
+      selector_set = SelectorSet([(selector, source), (parse_selector("p:last-child"), "p")])
+      assert [e.data for e in extract(selector_set, [html]) if e.selector == source] == expected, (source, html)
@@ -0,0 +1,68 @@
+import threading
+from cssselector import SymbolTable, PreparedElement, SelectorInternTable, parse_selector
+
+def test_symbol_table ():
+
+  #名前には登録された順に番号が割り当てられます
+
+  table = SymbolTable()
+  assert [table.symbol(name) for name in ("id", "CLASS", "Href", "src")] == [0, 1, 2, 3]
+  assert table.name(2) == "href"
+
+  #大文字・小文字は登録時に正規化され、同じ名前は同じインスタンスになります
+
+  a = table.intern("DIV")
+  b = table.intern("".join(["d", "i", "v"]))
+  assert a == "div" and a is b
+  assert table.symbol("Div") == table.symbol("div")
+  assert len(table) == 5
+
+def test_symbol_table_selector ():
+
+  #セレクターの要素名と属性名は表の文字列に置き換えられます
+
+  table = SymbolTable()
+  selector = parse_selector("DIV.x > A[HREF^=\"/\"]:not(IMG[SRC]), li:has(> B)", symbol_table=table)
+  assert selector == parse_selector("div.x > a[href^=\"/\"]:not(img[src]), li:has(> b)")
+  element = selector.selectors[0].selector.next_selector.cur_selector
+  assert element.tag is table.intern("a")
+  assert element.attribute_selectors[0].name is table.intern("href")
+  assert element.pseudo_classes[0].selectors[0].tag is table.intern("img")
+  assert selector.selectors[1].selector.cur_selector.pseudo_classes[0].children[0].tag is table.intern("b")
+
+  #置き換える名前がなければ同じインスタンスが返されます
+
+  assert table.intern_selector(selector) is selector
+
+  #SelectorInternTable と併用できます
+
+  intern_table = SelectorInternTable()
+  assert parse_selector("P > A", intern_table=intern_table, symbol_table=table) is parse_selector("p > a", intern_table=intern_table, symbol_table=table)
+
+def test_symbol_table_stack ():
+
+  #作成したスタックは PreparedElement からなり、名前は表の文字列を共有します
+
+  table = SymbolTable()
+  selector = parse_selector("div > a[href]", symbol_table=table)
+  stack = table.stack([("DIV", {"Class": "x y"}), ("a", [("HREF", "/"), ("src", None)])])
+  assert all(type(element) is PreparedElement for element in stack)
+  assert stack[0].tag is table.intern("div")
+  assert stack[0].classes == {"x", "y"}
+  assert stack[1].attrs == {"href": "/", "src": ""}
+  assert next(iter(stack[1].attrs)) is table.intern("href")
+  assert selector.match(stack)
+  assert not selector.match(stack[:1])
+
+def test_symbol_table_threads ():
+
+  #複数のスレッドから同時に登録しても番号は重複しません
+
+  table = SymbolTable()
+  names = ["n{:d}".format(i) for i in range(200)]
+  threads = [threading.Thread(target=lambda: [table.symbol(name.upper()) for name in names]) for _ in range(4)]
+  for thread in threads:
+    thread.start()
+  for thread in threads:
+    thread.join()
+  assert sorted(table.symbol(name) for name in names) == list(range(200))